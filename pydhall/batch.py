@@ -0,0 +1,136 @@
+"""
+Run a command on many dhall files with a pool of worker processes.
+
+Workers are long lived: the imports resolved while processing a file stay
+in the worker's cache and are reused by the next files it gets. Hashed
+imports are stored in the on-disk cache, that is shared by all the workers.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+
+from pydhall import instrument
+from pydhall import parser
+from pydhall.parser import Dhall
+from pydhall.parser.memo import set_memo_policy
+from pydhall.core.base import Term
+from pydhall.core.import_ import base as import_base
+from pydhall.core.import_.base import LocalFile
+from pydhall.core.import_.cache import FSCache
+
+
+def load_src(src, origin, type_check=True):
+    """
+    Parse, resolve and type check `src`. The type check is left to the
+    caller if `type_check` is False.
+    """
+    with instrument.phase("parse"):
+        expr = parser.parse(src)
+    return _load(expr, origin, type_check)
+
+
+def load_cbor(data, origin, type_check=True):
+    "Decode, resolve and type check the binary encoded expression `data`"
+    with instrument.phase("cbor"):
+        expr = Term.from_cbor(data)
+    return _load(expr, origin, type_check)
+
+
+def _load(expr, origin, type_check):
+    with instrument.phase("resolve"):
+        expr = expr.resolve(origin)
+    if type_check:
+        with instrument.phase("type"):
+            expr.type()
+    return expr
+
+
+def normal_form(expr):
+    with instrument.phase("eval"):
+        value = expr.eval()
+    with instrument.phase("quote"):
+        return value.quote(normalize=True)
+
+
+def hash_expr(expr):
+    expr = normal_form(expr)
+    with instrument.phase("cbor"):
+        return expr.sha256()
+
+
+def normalize_expr(expr):
+    return normal_form(expr).dhall()
+
+
+def type_expr(expr):
+    with instrument.phase("type"):
+        type_ = expr.type()
+    with instrument.phase("quote"):
+        return type_.quote(normalize=True).dhall()
+
+
+COMMANDS = {
+    "hash": hash_expr,
+    "normalize": normalize_expr,
+    "type": type_expr,
+}
+# commands that type check the loaded expression themselves
+_TYPE_CHECKING = {"type"}
+
+
+def process_file(command, path, input_format="dhall"):
+    """
+    Run `command` on the file at `path`, dhall source or its binary encoding
+    if `input_format` is "cbor". Return a dict with the file name, the
+    result (or the error) and the time it took in seconds.
+    """
+    start = perf_counter()
+    report = {"file": str(path)}
+    try:
+        origin = LocalFile(Path(path), None, 0)
+        type_check = command not in _TYPE_CHECKING
+        if input_format == "cbor":
+            with open(path, "rb") as f:
+                expr = load_cbor(f.read(), origin, type_check)
+        else:
+            with open(path) as f:
+                expr = load_src(f.read(), origin, type_check)
+        report["result"] = COMMANDS[command](expr)
+    except Exception as e:
+        report["error"] = f"{e.__class__.__name__}: {e}"
+    report["seconds"] = round(perf_counter() - start, 6)
+    return report
+
+
+def _init_worker(cache_class, parse_cache, memo_table):
+    if not isinstance(import_base.CACHE, cache_class):
+        import_base.set_cache_class(cache_class)
+    parser.set_parse_cache(parse_cache)
+    set_memo_policy(memo_table if memo_table is not dict else None)
+
+
+def run(command, paths, jobs=1, cache_class=FSCache, input_format="dhall"):
+    """
+    Yield the report of `command` for each file in `paths`, in order.
+
+    With `jobs` > 1 the files are distributed over that many worker
+    processes, each using a `cache_class` import cache, and the parse cache
+    and memo policy of the calling process.
+    """
+    if command not in COMMANDS:
+        raise ValueError(f"Unknown command: {command}")
+    paths = list(paths)
+    process = partial(process_file, command, input_format=input_format)
+    if jobs <= 1:
+        for path in paths:
+            yield process(path)
+        return
+    # send the files in small batches: they are processed in order by each
+    # worker, which gives it a chance to reuse the imports of the previous
+    # file of the batch.
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(
+            jobs, initializer=_init_worker,
+            initargs=(cache_class, parser.PARSE_CACHE, Dhall.memo_table)) as executor:
+        yield from executor.map(process, paths, chunksize=chunksize)
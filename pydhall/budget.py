@@ -0,0 +1,228 @@
+"""
+Evaluation budgets.
+
+An `EvalBudget` bounds the evaluation done by the current thread: the number
+of steps (evaluated nodes and function applications), the wall time and the
+resident memory of the process. When one of them is exceeded, the evaluation
+is interrupted by a `DhallBudgetExceeded` carrying the statistics of the
+work done so far:
+
+    try:
+        with EvalBudget(steps=10**6, seconds=1.0, memory=512 << 20) as budget:
+            value = expr.eval()
+    except DhallBudgetExceeded as e:
+        print(e.reason, e.stats)
+
+The loops of the builtins (`Natural/fold`, `List/fold`, ...) apply their
+functions with `AppValue.build`, each iteration is a step.
+
+As with the instrumentation, the counters are installed by wrapping the
+relevant methods while a budget is active in some thread: evaluation costs
+nothing more otherwise. The deadline and the memory are checked every
+`check_interval` steps.
+"""
+import os
+import threading
+from functools import wraps
+from time import perf_counter
+from weakref import WeakKeyDictionary
+
+from pydhall.instrument import _subclasses
+
+
+class DhallBudgetExceeded(Exception):
+    def __init__(self, reason, stats):
+        super().__init__(reason, stats)
+        # "steps", "seconds" or "memory"
+        self.reason = reason
+        # statistics of the interrupted evaluation, see `EvalBudget.stats`
+        self.stats = stats
+
+    def __str__(self):
+        return (
+            f"Evaluation budget exceeded ({self.reason}) after "
+            f"{self.stats['steps']} steps and {self.stats['seconds']:.3f}s")
+
+
+def memory_usage():
+    """
+    Return the current resident memory of the process in bytes, or None if
+    it's unknown: /proc or psutil are needed. The peak resident memory
+    (getrusage) never goes down, one evaluation over the limit would make
+    all the later ones fail: it's not used, the memory limit is then not
+    enforced.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+class _Local(threading.local):
+    budget = None
+
+
+_LOCAL = _Local()
+
+
+def active():
+    "Return the budget of the current thread, or None"
+    return _LOCAL.budget
+
+
+class EvalBudget:
+    """
+    Bound the evaluation done by the current thread to `steps` steps,
+    `seconds` of wall time and a resident memory of `memory` bytes. None
+    means no limit. The memory limit is not enforced where the resident
+    memory is unknown (see `memory_usage`).
+    """
+    check_interval = 256
+
+    def __init__(self, steps=None, seconds=None, memory=None):
+        self.max_steps = steps
+        self.max_seconds = seconds
+        self.max_memory = memory
+        self.steps = 0
+        self.applications = 0
+        self.start = None
+        self.memory = None
+        self._step_limit = steps if steps is not None else float("inf")
+        self._next_check = self.check_interval
+
+    def __enter__(self):
+        if _LOCAL.budget is not None:
+            raise RuntimeError("A budget is already active in this thread")
+        _install()
+        self.start = perf_counter()
+        _LOCAL.budget = self
+        return self
+
+    def __exit__(self, *exc):
+        _LOCAL.budget = None
+        _uninstall()
+
+    def step(self):
+        self.steps += 1
+        if self.steps > self._step_limit:
+            self.exceeded("steps")
+        if self.steps >= self._next_check:
+            self._next_check += self.check_interval
+            self.check()
+
+    def check(self):
+        "Raise DhallBudgetExceeded if the deadline or the memory are exceeded"
+        if self.max_seconds is not None and self.elapsed() > self.max_seconds:
+            self.exceeded("seconds")
+        if self.max_memory is not None:
+            self.memory = memory_usage()
+            if self.memory is not None and self.memory > self.max_memory:
+                self.exceeded("memory")
+
+    def elapsed(self):
+        return perf_counter() - self.start if self.start is not None else 0.0
+
+    def stats(self):
+        return {
+            "steps": self.steps,
+            "applications": self.applications,
+            "seconds": self.elapsed(),
+            "memory": self.memory,
+        }
+
+    def exceeded(self, reason):
+        raise DhallBudgetExceeded(reason, self.stats())
+
+
+_LOCK = threading.Lock()
+_USERS = 0
+_PATCHED = []
+# budget wrapper -> wrapped method
+_WRAPPERS = WeakKeyDictionary()
+
+
+def _budget_wrapper(fn):
+    """
+    Return the budget wrapper that `fn` is or wraps (through `__wrapped__`,
+    e.g. a wrapper of a profiler), or None
+    """
+    while fn is not None:
+        fn = getattr(fn, "__func__", fn)
+        if fn in _WRAPPERS:
+            return fn
+        fn = getattr(fn, "__wrapped__", None)
+    return None
+
+
+def _patch(owner, name, wrap):
+    current = owner.__dict__[name]
+    found = _budget_wrapper(current)
+    if found is not None:
+        # a wrapper left in place by a previous budget: it counts the steps
+        # already. Restore it on uninstall if it's still on top.
+        if found is getattr(current, "__func__", current):
+            _PATCHED.append((owner, name, _WRAPPERS[found], current))
+        return
+    wrapper = wrap(current)
+    _WRAPPERS[getattr(wrapper, "__func__", wrapper)] = current
+    _PATCHED.append((owner, name, current, wrapper))
+    setattr(owner, name, wrapper)
+
+
+def _install():
+    global _USERS
+    with _LOCK:
+        _USERS += 1
+        if _USERS > 1:
+            return
+        from pydhall.core.base import Term
+        from pydhall.core.function.app import AppValue
+
+        for cls in [Term] + _subclasses(Term):
+            if "eval" in cls.__dict__:
+                _patch(cls, "eval", _budget_eval)
+        _patch(AppValue, "build", _budget_build)
+
+
+def _uninstall():
+    global _USERS
+    with _LOCK:
+        _USERS -= 1
+        if _USERS:
+            return
+        while _PATCHED:
+            owner, name, orig, wrapper = _PATCHED.pop()
+            # the method may have been wrapped again (e.g. by a profiler),
+            # the wrapper is then left in place: it does nothing without a
+            # budget, and the next budget doesn't wrap it again.
+            if owner.__dict__.get(name) is wrapper:
+                setattr(owner, name, orig)
+
+
+def _budget_eval(orig):
+    @wraps(orig)
+    def eval(self, env=None):
+        budget = _LOCAL.budget
+        if budget is not None:
+            budget.step()
+        return orig(self, env)
+    return eval
+
+
+def _budget_build(orig):
+    build = orig.__func__
+
+    @wraps(build)
+    def budget_build(cls, *args):
+        budget = _LOCAL.budget
+        if budget is not None:
+            budget.applications += 1
+            budget.step()
+        return build(cls, *args)
+    return classmethod(budget_build)
@@ -2,69 +2,351 @@
 import sys
 import os
 import argparse
+import json
+from functools import partial
 from pathlib import Path
 
-from pydhall.parser import Dhall
 from pydhall.core.type_error import DhallTypeError
 from pydhall.core.import_.base import LocalFile
+from pydhall.export import dump_json, dump_yaml
+from pydhall.convert import convert_json, convert_yaml, write_list
+from pydhall.core.list_.base import ListOf
+from pydhall.parser.stream import iter_values
+from pydhall.parser.memo import WindowMemo, memo_report, set_memo_policy
+from pydhall import batch
+from pydhall.instrument import Profiler
+from pydhall.budget import EvalBudget, DhallBudgetExceeded
+from pydhall.parser import parse, set_parse_cache, ParseCache
+from pydhall.core.base import Term
+from pydhall.utils import cbor_dump
+from pydhall.schema.codegen import generate_module
 
 
-def normalize(args):
+def read_input(args, binary=False):
+    "Return the content of the input file (or standard input) and its origin"
     if not args.file:
-        src = sys.stdin.read()
-        module = Dhall.p_parse(src)
+        src = sys.stdin.buffer.read() if binary else sys.stdin.read()
+        origin = LocalFile(Path(os.getcwd()).joinpath("<stdin>"), None, 0)
     else:
-        with open(src) as f:
+        with open(args.file, "rb" if binary else "r") as f:
             src = f.read()
+        origin = LocalFile(Path(args.file), None, 0)
+    return src, origin
+
+
+def load(args, type_check=True):
+    "Parse (or decode), resolve and type check the input expression"
+    if getattr(args, "input_format", "dhall") == "cbor":
+        data, origin = read_input(args, binary=True)
+        return batch.load_cbor(data, origin, type_check)
+    return load_src(*read_input(args), type_check=type_check)
+
+
+def load_src(src, origin, type_check=True):
     try:
-        module.type()
+        module = batch.load_src(src, origin, type_check)
     except DhallTypeError as e:
         raise
         sys.stderr.write("Error: ")
         sys.stderr.write(str(e))
         sys.stderr.write("\n")
         sys.exit(1)
-    print(module.eval().quote(normalize=True).dhall())
+    return module
+
+
+def run_batch(args):
+    "Run the command on each of `args.files`, print a JSON report per file"
+    failed = False
+    if getattr(args, "output_format", "dhall") == "cbor":
+        sys.exit("--output-format cbor can't be used with a list of files")
+    reports = batch.run(
+        args.command, args.files, args.jobs, input_format=args.input_format)
+    for report in reports:
+        failed = failed or "error" in report
+        print(json.dumps(report), flush=True)
+    if failed:
+        sys.exit(1)
+
+
+def normalize(args):
+    if args.stream:
+        return normalize_stream(args)
+    if args.files:
+        return run_batch(args)
+    module = load(args)
+    if args.output_format == "cbor":
+        cbor_dump(batch.normal_form(module).cbor_values(), sys.stdout.buffer)
+    else:
+        print(batch.normalize_expr(module))
 
 
 def hash(args):
+    if args.files:
+        return run_batch(args)
+    module = load(args)
+    print(batch.hash_expr(module))
+
+
+def type_(args):
+    if args.files:
+        return run_batch(args)
+    # type_expr type checks the expression
+    module = load(args, type_check=False)
+    print(batch.type_expr(module))
+
+
+def encode(args):
+    "Write the binary encoding of the input expression, as parsed"
+    src, _ = read_input(args)
+    cbor_dump(parse(src).cbor_values(), sys.stdout.buffer)
+
+
+def decode(args):
+    "Write the dhall source of the binary encoded input expression"
+    data, _ = read_input(args, binary=True)
+    print(Term.from_cbor(data).dhall())
+
+
+def to_json(args):
+    module = load(args)
+    dump_json(
+        module.eval(), sys.stdout,
+        omit_none=args.omit_none,
+        indent=2 if args.pretty else None)
+    sys.stdout.write("\n")
+
+
+def to_yaml(args):
+    module = load(args)
+    dump_yaml(module.eval(), sys.stdout, omit_none=args.omit_none)
+
+
+def schema_gen(args):
+    "Write the python module of the schema classes of the input type"
+    module = load(args)
+    print(generate_module(module.eval(), args.name), end="")
+
+
+def load_type(args):
+    "Return the value of the `--type` expression"
+    origin = LocalFile(Path(os.getcwd()).joinpath("<type>"), None, 0)
+    return load_src(args.type, origin).eval()
+
+
+def _convert(args, convert):
+    type_ = load_type(args)
+    out = sys.stdout.buffer if args.output_format == "cbor" else sys.stdout
     if not args.file:
-        src = sys.stdin.read()
-        module = Dhall.p_parse(src)
-        origin = LocalFile(Path(os.getcwd()).joinpath("<stdin>"), None, 0)
+        convert(sys.stdin, type_, out, args.output_format)
     else:
         with open(args.file) as f:
-            src = f.read()
-        origin = LocalFile(Path(args.file), None, 0)
-    module = Dhall.p_parse(src)
-    module = module.resolve(origin)
+            convert(f, type_, out, args.output_format)
+
+
+def normalize_stream(args):
+    "Normalize the elements of a top-level list literal one at a time"
+    if not args.type:
+        sys.exit("--stream requires the --type of the list elements")
+    if args.input_format != "dhall":
+        sys.exit("--stream reads dhall source only")
+    type_ = load_type(args)
+    out = sys.stdout.buffer if args.output_format == "cbor" else sys.stdout
+
+    def write(f, origin):
+        values = iter_values(f, type_, origin)
+        write_list(values, ListOf(type_), out, args.output_format)
+
+    if not args.file:
+        write(sys.stdin, LocalFile(Path(os.getcwd()).joinpath("<stdin>"), None, 0))
+    else:
+        with open(args.file) as f:
+            write(f, LocalFile(Path(args.file), None, 0))
+
+
+def print_memo_report(args):
+    "Print the memo table statistics of the parse of the input"
+    src, _ = read_input(args)
+    print(memo_report(src).summary(args.top))
+
+
+def from_json(args):
+    _convert(args, convert_json)
+
+
+def from_yaml(args):
+    _convert(args, convert_yaml)
+
+
+def add_file_argument(parser):
+    parser.add_argument(
+        "--file",
+        help="Read expression from a file instead of standard input",
+        default='')
+
+
+def add_batch_arguments(parser):
+    parser.add_argument(
+        "files", nargs="*",
+        help="Process these files and print a JSON report for each of them")
+    parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="Number of worker processes used to process the files")
+
+
+def add_input_format_argument(parser):
+    parser.add_argument(
+        "--input-format", choices=["dhall", "cbor"], default="dhall",
+        help="Read dhall source or its binary encoding")
+
+
+def add_conversion_arguments(parser):
+    add_file_argument(parser)
+    parser.add_argument(
+        "--type", required=True,
+        help="Dhall type of the converted expression")
+    parser.add_argument(
+        "--output-format", choices=["dhall", "cbor"], default="dhall",
+        help="Write normalized dhall source or its CBOR encoding")
+
+
+def run_profiled(args):
+    "Run the command with the instrumentation, and cProfile if asked to"
+    prof = Profiler()
+    profiler = None
+    if args.profile_output:
+        import cProfile
+        profiler = cProfile.Profile()
     try:
-        module.type()
-    except DhallTypeError as e:
-        raise
-        sys.stderr.write("Error: ")
-        sys.stderr.write(str(e))
+        with prof:
+            if profiler is None:
+                args.func(args)
+            else:
+                profiler.runcall(args.func, args)
+    finally:
+        sys.stderr.write(prof.summary())
         sys.stderr.write("\n")
-        sys.exit(1)
-    print(module.eval().quote(normalize=True).sha256())
+        if profiler is not None:
+            profiler.dump_stats(args.profile_output)
 
 
 def main():
     parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Print the time spent in each phase and evaluation counters "
+             "on standard error. Batch workers are not profiled.")
+    parser.add_argument(
+        "--profile-output", default='',
+        help="Write cProfile statistics to this file (implies --profile)")
+    parser.add_argument(
+        "--parse-cache", action="store_true",
+        help="Cache the parsed files in $XDG_CACHE_HOME/pydhall/parse. The "
+             "cache is not pruned.")
+    parser.add_argument(
+        "--memo-window", type=int, default=0,
+        help="Forget the parser memo entries more than this many characters "
+             "behind the parsed position, to bound its memory")
+    parser.add_argument(
+        "--max-steps", type=int, default=None,
+        help="Interrupt the evaluation after this many steps")
+    parser.add_argument(
+        "--max-seconds", type=float, default=None,
+        help="Interrupt the evaluation after this many seconds")
+    parser.add_argument(
+        "--max-memory", type=int, default=None,
+        help="Interrupt the evaluation when the process uses more than this "
+             "many megabytes (needs /proc or psutil)")
     subparsers = parser.add_subparsers()
 
     p_normalize = subparsers.add_parser('normalize')
-    p_normalize.set_defaults(func=normalize)
+    add_file_argument(p_normalize)
+    add_batch_arguments(p_normalize)
+    add_input_format_argument(p_normalize)
+    p_normalize.add_argument(
+        "--output-format", choices=["dhall", "cbor"], default="dhall",
+        help="Write the normalized dhall source or its binary encoding")
+    p_normalize.add_argument(
+        "--stream", action="store_true",
+        help="Read a top-level list literal and normalize its elements one "
+             "at a time, in constant memory")
+    p_normalize.add_argument(
+        "--type", default='',
+        help="Dhall type of the list elements, required by --stream")
+    p_normalize.set_defaults(func=normalize, command="normalize")
 
     p_hash = subparsers.add_parser('hash')
-    p_hash.add_argument(
-        "--file",
-        help="Read expression from a file instead of standard input",
-        default='')
-    p_hash.set_defaults(func=hash)
+    add_file_argument(p_hash)
+    add_batch_arguments(p_hash)
+    add_input_format_argument(p_hash)
+    p_hash.set_defaults(func=hash, command="hash")
+
+    p_type = subparsers.add_parser('type')
+    add_file_argument(p_type)
+    add_batch_arguments(p_type)
+    add_input_format_argument(p_type)
+    p_type.set_defaults(func=type_, command="type")
+
+    p_encode = subparsers.add_parser('encode')
+    add_file_argument(p_encode)
+    p_encode.set_defaults(func=encode)
+
+    p_decode = subparsers.add_parser('decode')
+    add_file_argument(p_decode)
+    p_decode.set_defaults(func=decode)
+
+    p_to_json = subparsers.add_parser('to-json')
+    add_file_argument(p_to_json)
+    p_to_json.add_argument(
+        "--pretty", action="store_true", help="Indent the JSON output")
+    p_to_json.add_argument(
+        "--omit-none", action="store_true",
+        help="Omit record fields whose value is `None`")
+    p_to_json.set_defaults(func=to_json)
+
+    p_to_yaml = subparsers.add_parser('to-yaml')
+    add_file_argument(p_to_yaml)
+    p_to_yaml.add_argument(
+        "--omit-none", action="store_true",
+        help="Omit record fields whose value is `None`")
+    p_to_yaml.set_defaults(func=to_yaml)
+
+    p_from_json = subparsers.add_parser('from-json')
+    add_conversion_arguments(p_from_json)
+    p_from_json.set_defaults(func=from_json)
+
+    p_from_yaml = subparsers.add_parser('from-yaml')
+    add_conversion_arguments(p_from_yaml)
+    p_from_yaml.set_defaults(func=from_yaml)
+
+    p_schema_gen = subparsers.add_parser('schema-gen')
+    add_file_argument(p_schema_gen)
+    p_schema_gen.add_argument(
+        "--name", default="Root",
+        help="Name of the schema of the input type in the generated module")
+    p_schema_gen.set_defaults(func=schema_gen)
+
+    p_memo_report = subparsers.add_parser('memo-report')
+    add_file_argument(p_memo_report)
+    p_memo_report.add_argument(
+        "--top", type=int, default=20, help="Number of rules to show")
+    p_memo_report.set_defaults(func=print_memo_report)
 
     args = parser.parse_args()
-    args.func(args)
+    if args.parse_cache:
+        set_parse_cache(ParseCache())
+    if args.memo_window:
+        set_memo_policy(partial(WindowMemo, args.memo_window))
+    run = run_profiled if args.profile or args.profile_output else args.func
+    if args.max_steps is None and args.max_seconds is None and args.max_memory is None:
+        run(args)
+        return
+    memory = args.max_memory << 20 if args.max_memory is not None else None
+    try:
+        with EvalBudget(args.max_steps, args.max_seconds, memory):
+            run(args)
+    except DhallBudgetExceeded as e:
+        sys.stderr.write(f"{e}\n")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
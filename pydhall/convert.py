@@ -0,0 +1,341 @@
+"""
+Convert JSON or YAML data to dhall values.
+
+The conversion is directed by the expected dhall type: a converter is built
+once for the type and applied to every element of the input, so each
+element becomes a normalized `Value` without going through dhall source,
+the parser or the type checker. Top-level JSON arrays are read and
+converted one element at a time.
+"""
+import json
+import re
+
+from cbor2 import encoder
+
+from pydhall.core.base import BuiltinValue
+from pydhall.core.boolean.base import BoolTypeValue, True_, False_
+from pydhall.core.double.base import DoubleTypeValue, DoubleLitValue
+from pydhall.core.integer.base import IntegerTypeValue, IntegerLitValue
+from pydhall.core.list_.base import EmptyListValue, NonEmptyListValue, ListOf
+from pydhall.core.natural.base import NaturalTypeValue, NaturalLitValue
+from pydhall.core.optional.base import OptionalOf, SomeValue, NoneOf
+from pydhall.core.record.base import RecordLitValue, RecordTypeValue
+from pydhall.core.text.base import PlainTextLitValue, TextTypeValue
+from pydhall.core.union import UnionTypeValue, UnionVal
+
+
+class DhallConversionError(Exception):
+    def __init__(self, message, path=None):
+        super().__init__(message)
+        self.message = message
+        # keys and indexes leading to the offending value, outermost first
+        self.path = path if path is not None else []
+
+    def __str__(self):
+        if not self.path:
+            return self.message
+        path = "".join(
+            f"[{p}]" if isinstance(p, int) else f".{p}" for p in self.path)
+        return f"{path}: {self.message}"
+
+
+def _at(key, convert, obj):
+    "Apply `convert` to `obj`, adding `key` to the path of errors"
+    try:
+        return convert(obj)
+    except DhallConversionError as e:
+        e.path.insert(0, key)
+        raise
+
+
+def _type_name(type_):
+    return type_.quote().dhall()
+
+
+def _error(obj, type_):
+    return DhallConversionError(
+        f"Cannot convert {json.dumps(obj, default=str)} to {_type_name(type_)}")
+
+
+def _text(obj):
+    if not isinstance(obj, str):
+        raise _error(obj, TextTypeValue)
+    return PlainTextLitValue(obj)
+
+
+def _natural(obj):
+    if not isinstance(obj, int) or isinstance(obj, bool) or obj < 0:
+        raise _error(obj, NaturalTypeValue)
+    return NaturalLitValue(obj)
+
+
+def _integer(obj):
+    if not isinstance(obj, int) or isinstance(obj, bool):
+        raise _error(obj, IntegerTypeValue)
+    return IntegerLitValue(obj)
+
+
+def _double(obj):
+    if not isinstance(obj, (int, float)) or isinstance(obj, bool):
+        raise _error(obj, DoubleTypeValue)
+    return DoubleLitValue(float(obj))
+
+
+def _bool(obj):
+    if not isinstance(obj, bool):
+        raise _error(obj, BoolTypeValue)
+    return True_ if obj else False_
+
+
+_BUILTIN_CONVERTERS = {
+    "Text": _text,
+    "Natural": _natural,
+    "Integer": _integer,
+    "Double": _double,
+    "Bool": _bool,
+}
+
+
+def _is_map_type(type_):
+    return (
+        isinstance(type_, RecordTypeValue)
+        and type_.keys() == {"mapKey", "mapValue"}
+        and type_["mapKey"] == TextTypeValue)
+
+
+def _optional_converter(type_):
+    convert = compile_converter(type_.type_)
+    none = NoneOf(type_.type_)
+
+    def _optional(obj):
+        if obj is None:
+            return none
+        return SomeValue(convert(obj))
+    return _optional
+
+
+def _list_converter(type_):
+    convert = compile_converter(type_.type_)
+    is_map = _is_map_type(type_.type_)
+    if is_map:
+        convert_value = compile_converter(type_.type_["mapValue"])
+
+    def _list(obj):
+        if is_map and isinstance(obj, dict):
+            content = [
+                RecordLitValue({
+                    "mapKey": PlainTextLitValue(k),
+                    "mapValue": _at(k, convert_value, v)})
+                for k, v in obj.items()]
+        elif isinstance(obj, list):
+            content = [_at(i, convert, v) for i, v in enumerate(obj)]
+        else:
+            raise _error(obj, type_)
+        if not content:
+            return EmptyListValue(type_)
+        return NonEmptyListValue(content)
+    return _list
+
+
+def _record_converter(type_):
+    fields = {k: compile_converter(v) for k, v in type_.items()}
+    defaults = {
+        k: NoneOf(v.type_) for k, v in type_.items()
+        if isinstance(v, OptionalOf)}
+
+    def _record(obj):
+        if not isinstance(obj, dict):
+            raise _error(obj, type_)
+        for k in obj:
+            if k not in fields:
+                raise DhallConversionError(
+                    f"Unexpected field `{k}` for {_type_name(type_)}")
+        result = {}
+        for k, convert in fields.items():
+            if k in obj:
+                result[k] = _at(k, convert, obj[k])
+            elif k in defaults:
+                result[k] = defaults[k]
+            else:
+                raise DhallConversionError(
+                    f"Missing field `{k}` for {_type_name(type_)}")
+        return RecordLitValue(result)
+    return _record
+
+
+def _union_converter(type_):
+    empty = {k for k, v in type_.items() if v is None}
+    alternatives = [
+        (k, compile_converter(v)) for k, v in type_.items() if v is not None]
+
+    def _union(obj):
+        # an empty alternative is written as its name, otherwise the first
+        # alternative that accepts the value wins
+        if isinstance(obj, str) and obj in empty:
+            return UnionVal(type_, obj)
+        for name, convert in alternatives:
+            try:
+                return UnionVal(type_, name, convert(obj))
+            except DhallConversionError:
+                pass
+        raise _error(obj, type_)
+    return _union
+
+
+def compile_converter(type_):
+    """
+    Return a function converting python objects (as produced by
+    `json.load`) to normalized values of type `type_`.
+    """
+    if isinstance(type_, BuiltinValue) and type_.name in _BUILTIN_CONVERTERS:
+        return _BUILTIN_CONVERTERS[type_.name]
+    if isinstance(type_, OptionalOf):
+        return _optional_converter(type_)
+    if isinstance(type_, ListOf):
+        return _list_converter(type_)
+    if isinstance(type_, RecordTypeValue):
+        return _record_converter(type_)
+    if isinstance(type_, UnionTypeValue):
+        return _union_converter(type_)
+    raise DhallConversionError(f"Cannot convert to {_type_name(type_)}")
+
+
+def from_python(obj, type_):
+    "Convert the python object `obj` to a normalized value of type `type_`"
+    return compile_converter(type_)(obj)
+
+
+_WS = re.compile(r"[ \t\n\r]*")
+
+
+class _JSONReader:
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        "Read the next chunk, return False at end of file"
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self):
+        "Skip whitespace and return the next character ('' at end of file)"
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def decode(self, decoder):
+        self.next_char()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self.fill():
+                    continue
+                raise DhallConversionError(f"Invalid JSON: {e}")
+            # a number ending with the buffer may continue in the next chunk
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_json_array(fp, chunk_size=1 << 16):
+    "Yield the elements of the JSON array read from `fp`, one at a time"
+    decoder = json.JSONDecoder()
+    reader = _JSONReader(fp, chunk_size)
+    if reader.next_char() != "[":
+        raise DhallConversionError("Expected a JSON array")
+    reader.pos += 1
+    if reader.next_char() == "]":
+        reader.pos += 1
+    else:
+        while True:
+            yield reader.decode(decoder)
+            char = reader.next_char()
+            reader.pos += 1
+            if char == "]":
+                break
+            if char != ",":
+                raise DhallConversionError(
+                    f"Expected ',' or ']' in JSON array, got {char!r}")
+    if reader.next_char() != "":
+        raise DhallConversionError("Extra data after the JSON array")
+
+
+def write_value(value, out, output_format="dhall"):
+    """
+    Write `value` in `out`, as dhall source (`out` is a text file) or as
+    CBOR (`out` is a binary file).
+    """
+    if output_format == "cbor":
+        out.write(value.quote().cbor())
+    else:
+        out.write(value.quote().dhall())
+        out.write("\n")
+
+
+def write_list(elements, type_, out, output_format="dhall"):
+    """
+    Write the list of `type_` (a `ListOf`) made of the values yielded by
+    `elements`. Each value is written, or encoded, as soon as it's produced.
+    """
+    if output_format == "cbor":
+        # the CBOR array header holds the number of elements, so the
+        # encoded elements are kept until the end of the input.
+        encoded = [e.quote().cbor() for e in elements]
+        if not encoded:
+            return write_value(EmptyListValue(type_), out, output_format)
+        encoder.CBOREncoder(out, canonical=True).encode_length(4, len(encoded) + 2)
+        out.write(b"\x04\xf6")
+        for e in encoded:
+            out.write(e)
+        return
+    sep = "[ "
+    for e in elements:
+        out.write(sep)
+        out.write(e.quote().dhall())
+        sep = "\n, "
+    if sep == "[ ":
+        return write_value(EmptyListValue(type_), out, output_format)
+    out.write("\n]\n")
+
+
+def load_json(fp, type_):
+    "Read a JSON document from `fp` and convert it to a value of type `type_`"
+    return from_python(json.load(fp), type_)
+
+
+def convert_json(fp, type_, out, output_format="dhall", chunk_size=1 << 16):
+    """
+    Convert the JSON document read from `fp` to `type_` and write it in
+    `out`. If `type_` is a list type, the input array is streamed.
+    """
+    if isinstance(type_, ListOf) and not _is_map_type(type_.type_):
+        convert = compile_converter(type_.type_)
+        elements = (
+            _at(i, convert, obj)
+            for i, obj in enumerate(iter_json_array(fp, chunk_size)))
+        write_list(elements, type_, out, output_format)
+    else:
+        write_value(load_json(fp, type_), out, output_format)
+
+
+def convert_yaml(fp, type_, out, output_format="dhall"):
+    "Convert the YAML document read from `fp` to `type_` and write it in `out`"
+    try:
+        import yaml
+    except ImportError:
+        raise DhallConversionError("YAML conversion requires PyYAML")
+    write_value(from_python(yaml.safe_load(fp), type_), out, output_format)
@@ -2,12 +2,12 @@ from copy import deepcopy
 from functools import reduce
 
 
-from .base import Node, Term, _AtomicLit, Builtin, TypeContext, EvalEnv, Op, Var
+from .base import Node, Term, _AtomicLit, Builtin, TypeContext, EvalEnv, Op, Var, shift_free_vars
 from .type_error import DhallTypeError, TYPE_ERROR_MESSAGE
 from .double.base import DoubleLit
 from .integer import IntegerLit
 from .optional import Some
-from .text.base import Chunk, TextLit, TextTypeValue, PlainTextLitValue
+from .text.base import Chunk, TextLit, TextTypeValue, PlainTextLitValue, TextRopeValue
 from .text.ops import *
 from .record.base import RecordLit, RecordType, RecordTypeValue, RecordLitValue
 from .record.ops import CompleteOp, RecordMergeOp, RightBiasedRecordMergeOp
@@ -158,6 +158,14 @@ class Let(Term):
             setattr(new, k, v)
         return new
 
+    def _collect_free_vars(self):
+        result = self.body.free_vars()
+        for b in reversed(self.bindings):
+            result = shift_free_vars(result, b.variable) | b.value.free_vars()
+            if b.annotation is not None:
+                result = result | b.annotation.free_vars()
+        return result
+
     def eval(self, env=None):
         env = env.copy() if env is not None else EvalEnv()
         for b in self.bindings:
@@ -220,15 +228,15 @@ class Let(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        bindings = []
-        while len(decoded) > 3:
-            var = decoded.pop(0)
-            annot = Term.from_cbor(decoded=decoded.pop(0))
-            val = Term.from_cbor(decoded=decoded.pop(0))
-            bindings.append(Binding(var, annot, val))
-        assert len(decoded) == 1
-        return Let(bindings, Term.from_cbor(decoded=decoded[0]))
+        assert decoded[0] == cls._cbor_idx
+        assert len(decoded) % 3 == 2
+        bindings = [
+            Binding(
+                decoded[i],
+                Term.from_cbor(decoded=decoded[i + 1]),
+                Term.from_cbor(decoded=decoded[i + 2]))
+            for i in range(1, len(decoded) - 1, 3)]
+        return Let(bindings, Term.from_cbor(decoded=decoded[-1]))
 
     # def resolve(self, *ancestors):
     #     bindings = []
@@ -291,11 +299,9 @@ class ToMap(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        decoded = [Term.from_cbor(decoded=i) for i in decoded]
-        if len(decoded) == 1:
-            decoded.append(None)
-        return ToMap(*decoded)
+        assert decoded[0] == cls._cbor_idx
+        annotation = Term.from_cbor(decoded=decoded[2]) if len(decoded) > 2 else None
+        return ToMap(Term.from_cbor(decoded=decoded[1]), annotation)
 
     def eval(self, env=None):
         env = env if env is not None else EvalEnv()
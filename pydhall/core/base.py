@@ -1,13 +1,28 @@
+import re
 from hashlib import sha256
 from functools import reduce
+from weakref import ref
 
-import cbor
 import cbor2
 
+from pydhall import instrument
 from pydhall.utils import hash_all, cbor_dumps
 from pydhall.core.type_error import DhallTypeError, TYPE_ERROR_MESSAGE
 
 
+_SIMPLE_LABEL = re.compile(r"^[A-Za-z_][A-Za-z0-9_/-]*$")
+_KEYWORDS = {
+    "if", "then", "else", "let", "in", "using", "missing", "assert", "as",
+    "Infinity", "NaN", "merge", "Some", "toMap", "forall", "with"}
+
+
+def format_label(label):
+    "Return the dhall source of `label`, quoted with backticks if needed"
+    if _SIMPLE_LABEL.match(label) and label not in _KEYWORDS:
+        return label
+    return f"`{label}`"
+
+
 class QuoteContext(dict):
     def extend(self, name):
         new = QuoteContext(self)
@@ -41,9 +56,71 @@ class EvalEnv(dict):
         self.setdefault(name, []).insert(0, value)
 
 
+# Proved pairs of alpha-equivalent values: (id(a), id(b)) -> weak
+# references to (a, b), that tell if the ids were reused. Values that can't
+# be weakly referenced (e.g. Natural literals) are cheap to compare and are
+# not recorded.
+_ALPHA_PROVED = {}
+ALPHA_PROVED_SIZE = 4096
+# a value gets a fingerprint when it is compared this many times
+_FINGERPRINT_USES = 2
+# records and unions get a fingerprint when they have this many fields
+FINGERPRINT_MIN_FIELDS = 4
+# the closed subterms of the body of a function are memoized when the body
+# is evaluated this many times
+_CLOSED_MEMO_USES = 2
+
+
+def alpha_equivalent(a: "Value", b: "Value", fingerprint: bool = True) -> bool:
+    """
+    Return True if the values `a` and `b` are alpha-equivalent.
+
+    This is `a @ b`. Identical values and pairs already proved equivalent
+    are not compared again, and large compound values (records, unions,
+    function types) compared more than once get the fingerprint of their
+    normal form: two fingerprinted values are compared by fingerprint. A
+    fingerprint costs much more than a structural comparison, smaller
+    values are always compared by structure.
+
+    Evaluation compares values while a function body is quoted, when they
+    may hold the free variables of the quoted binders: fingerprints are
+    not used there (`fingerprint=False`).
+    """
+    if a is b:
+        return True
+    key = (id(a), id(b))
+    proved = _ALPHA_PROVED.get(key)
+    if proved is not None and proved[0]() is a and proved[1]() is b:
+        instrument.cache_lookup("alpha", True)
+        return True
+    instrument.cache_lookup("alpha", False)
+    if fingerprint and a._fingerprinted() and b._fingerprinted():
+        fa = a._fingerprint or a._use_fingerprint()
+        fb = b._fingerprint or b._use_fingerprint()
+    else:
+        fa = fb = None
+    if fa and fb:
+        result = fa == fb
+    else:
+        result = a.alpha_equivalent(b)
+    if result:
+        try:
+            refs = (ref(a), ref(b))
+        except TypeError:
+            return result
+        if len(_ALPHA_PROVED) >= ALPHA_PROVED_SIZE:
+            _ALPHA_PROVED.clear()
+        _ALPHA_PROVED[key] = refs
+    return result
+
+
 class Value:
     _quote = None
     attrs = None
+    # sha256 of the alpha-normal form, or False if the value has no
+    # fingerprint (e.g. it has free variables)
+    _fingerprint = None
+    _alpha_uses = 0
 
     def __str__(self):
         return str(self.as_python())
@@ -56,7 +133,35 @@ class Value:
         raise NotImplementedError(f"{self.__class__.__name__}.alpha_equivalent")
 
     def __matmul__(self, other):
-        return self.alpha_equivalent(other)
+        return alpha_equivalent(self, other)
+
+    def fingerprint(self):
+        """
+        Return the sha256 of the alpha-normal form of the value, or False if
+        the value has free variables or can't be encoded.
+        """
+        if self._fingerprint is None:
+            try:
+                term = self.quote(normalize=True)
+                # free variables of the expression (_FreeVar) are quoted as
+                # variables bound outside of the term
+                self._fingerprint = False if term.free_vars() else term.sha256()
+            except Exception:
+                # the variables of a binder (_QuoteVar) can't be quoted out
+                # of context
+                self._fingerprint = False
+        return self._fingerprint
+
+    def _fingerprinted(self):
+        "Tell whether the value is large enough to get a fingerprint"
+        return False
+
+    def _use_fingerprint(self):
+        "Count a comparison, return the fingerprint once the value is reused"
+        self._alpha_uses += 1
+        if self._alpha_uses >= _FINGERPRINT_USES:
+            return self.fingerprint()
+        return None
 
     def quote(self, ctx: QuoteContext = None, normalize: bool = False) -> "Term":
         if self._quote is None:
@@ -160,6 +265,9 @@ class Term(Node):
     _eval = None
     _cbor_idx = None
     _rebindable = None
+    # True if the term can be formatted as a function argument without
+    # parentheses
+    _primitive_expression = False
 
     _cbor_indexes = {}
 
@@ -204,25 +312,17 @@ class Term(Node):
         if decoded is None:
             if encoded is None:
                 return None
-            decoded = cbor.loads(encoded)
-            if isinstance(decoded, cbor.Tag):
-                decoded = decoded.value
+            # the self-describe tag and big integers are decoded by cbor2
+            decoded = cbor2.loads(encoded)
         if isinstance(decoded, bool):
             return Term._cbor_indexes[-1](decoded)  # BoolLit
         elif isinstance(decoded, int):
             return Term._cbor_indexes[-4]("_", decoded) # Var
         elif isinstance(decoded, list):
-            # TODO: these Tag unwrapings are made solely to
-            # make the tests pass. Check the standard way
-            # to deal with those once all is migrated to cbor2
-            if isinstance(decoded[0], cbor.Tag):
-                decoded[0] = decoded[0].value
             try:
                 term_cls = cls._cbor_indexes[decoded[0]]
             except KeyError:
                 assert isinstance(decoded[0], str)
-                if isinstance(decoded[1], cbor.Tag):
-                    decoded[1] = decoded[1].value
                 return cls._cbor_indexes[-4](*decoded) # Var
             return _decode_from_class(term_cls, decoded)
         elif isinstance(decoded, str):
@@ -260,6 +360,26 @@ class Term(Node):
                 args[attr_name] = attr.rebind(local, level)
         return self.copy(**args)
 
+    def free_vars(self):
+        """
+        Return the frozenset of the (name, index) of the variables of the
+        term that are bound outside of it. It is computed once per term.
+        """
+        try:
+            return self.__dict__["_free_vars"]
+        except KeyError:
+            pass
+        result = self.__dict__["_free_vars"] = self._collect_free_vars()
+        return result
+
+    def _collect_free_vars(self):
+        result = frozenset()
+        for term in _subterms(self):
+            free = term.free_vars()
+            if free:
+                result = result | free
+        return result
+
     def assertType(self, expected, ctx, msg):
         tp = self.type(ctx)
         if not tp @ expected:
@@ -269,6 +389,11 @@ class Term(Node):
     def format_dhall(self):
         raise NotImplementedError(f"{self.__class__.__name__}.format_dhall")
 
+    def format_dhall_operand(self):
+        if self._primitive_expression:
+            return self.format_dhall()
+        return ("(", self.format_dhall(), ")")
+
     def dhall(self):
         format = self.format_dhall()
         # print(format)
@@ -284,7 +409,77 @@ class Term(Node):
         return reduce(reduce_format, format)
 
 
+def _subterms(node):
+    "Return the direct subterms of the term (or Chunk, Binding...) `node`"
+    if isinstance(node, dict):
+        values = node.values()
+    else:
+        values = [getattr(node, name, None) for name in getattr(node, "__slots__", ())]
+    result = []
+    for val in values:
+        if isinstance(val, list):
+            items = val
+        else:
+            items = [val]
+        for item in items:
+            if isinstance(item, Term):
+                result.append(item)
+            elif isinstance(item, Node):
+                result.extend(_subterms(item))
+    return result
+
+
+def shift_free_vars(free, label):
+    "Return the free variables `free` of a body seen from its `label` binder"
+    return frozenset(
+        (name, index - 1 if name == label else index)
+        for name, index in free
+        if name != label or index > 0)
+
+
+def memoize_closed(binder):
+    """
+    Count an evaluation of the body of `binder`, a function or a pi type.
+    When the body is reused, the values of its closed subterms (the
+    subterms without free variables) are memoized: their next evaluations,
+    in this application or in the next ones, return the same value.
+    """
+    d = binder.__dict__
+    uses = d.get("_body_uses", 0)
+    if uses >= _CLOSED_MEMO_USES:
+        return
+    d["_body_uses"] = uses + 1
+    if uses + 1 < _CLOSED_MEMO_USES:
+        return
+    stack = [binder.body]
+    while stack:
+        term = stack.pop()
+        # the binders found here need not be walked again
+        term.__dict__["_body_uses"] = _CLOSED_MEMO_USES
+        subterms = _subterms(term)
+        if term.free_vars():
+            stack.extend(subterms)
+        elif subterms and "eval" not in term.__dict__:
+            # leaves (literals, builtins...) are cheap to evaluate
+            _memoize_eval(term)
+
+
+def _memoize_eval(term):
+    "Make `term`, a closed term, return the value of its first evaluation"
+    value = None
+
+    def eval(env=None):
+        nonlocal value
+        if value is None:
+            value = term.__class__.eval(term)
+        return value
+
+    term.__dict__["eval"] = eval
+
+
 class DictTerm(dict, Term):
+    _primitive_expression = True
+
     def __init__(self, fields, *args, **kwargs):
         Term.__init__(self, *args, **kwargs)
         dict.__init__(self, fields)
@@ -306,8 +501,8 @@ class DictTerm(dict, Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        return cls({k: Term.from_cbor(decoded=v) for k, v in decoded[0].items()})
+        assert decoded[0] == cls._cbor_idx
+        return cls({k: Term.from_cbor(decoded=v) for k, v in decoded[1].items()})
 
 
 class BuiltinMeta(type):
@@ -385,6 +580,7 @@ class BuiltinMeta(type):
 
 class Builtin(Term, metaclass=BuiltinMeta):
     _cbor_idx = None
+    _primitive_expression = True
     _by_name = {}
     _literal_name = None
 
@@ -438,6 +634,7 @@ class Builtin(Term, metaclass=BuiltinMeta):
 class _AtomicLit(Term):
     # attrs = ['value']
     __slots__ = ['value']
+    _primitive_expression = True
 
     def __init__(self, value, **kwargs):
         self.value = value
@@ -453,8 +650,7 @@ class _AtomicLit(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         if decoded is None:
-            1/0
-            decoded = cbor.loads(encoded)
+            return Term.from_cbor(encoded)
         return cls(decoded[1])
 
     def format_dhall(self):
@@ -514,8 +710,7 @@ class Op(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         if decoded is None:
-            1/0
-            decoded = cbor.loads(encoded)
+            return Term.from_cbor(encoded)
         return cls._cbor_op_indexes[decoded[1]](
             *[Term.from_cbor(decoded=i) for i in decoded[2:]])
 
@@ -565,6 +760,7 @@ class Var(Term):
     # attrs = ['name', 'index']
     __slots__ = ['name', 'index']
     _cbor_idx = -4
+    _primitive_expression = True
 
     def __init__(self, name, index, **kwargs):
         self.name = name
@@ -585,6 +781,9 @@ class Var(Term):
     def rebind(self, *args, **kwargs):
         return self
 
+    def _collect_free_vars(self):
+        return frozenset([(self.name, self.index)])
+
     def eval(self, env=None):
         env = env if env is not None else EvalEnv()
         max_idx = len(env.get(self.name, tuple()))
@@ -1,6 +1,6 @@
 from pydhall.core.type_error import DhallTypeError, TYPE_ERROR_MESSAGE
 
-from ..base import _AtomicLit, BuiltinValue, Value, Term, Builtin, EvalEnv, Value, QuoteContext, TypeContext
+from ..base import _AtomicLit, BuiltinValue, Value, Term, Builtin, EvalEnv, Value, QuoteContext, TypeContext, alpha_equivalent
 from ..universe import TypeValue
 
 BoolTypeValue = BuiltinValue("Bool")
@@ -152,7 +152,7 @@ class If(Term):
         f = self.false.eval(env)
         if t == True_ and f == False_:
             return cond
-        if t @ f:
+        if alpha_equivalent(t, f, fingerprint=False):
             return t
         return IfValue(cond, t, f)
 
@@ -1,4 +1,4 @@
-from ..base import Op, Value, OpValue, EvalEnv, QuoteContext
+from ..base import Op, Value, OpValue, EvalEnv, QuoteContext, alpha_equivalent
 from .base import BoolTypeValue, BoolLitValue, True_, False_
 
 
@@ -26,7 +26,7 @@ class OrOp(Op):
             if r:
                 return True_
             return l
-        if l @ r:
+        if alpha_equivalent(l, r, fingerprint=False):
             return l
         return OrOpValue(l, r)
 
@@ -61,7 +61,7 @@ class AndOp(Op):
             if r:
                 return l
             return False_
-        if l @ r:
+        if alpha_equivalent(l, r, fingerprint=False):
             return l
         return AndOpValue(l,r)
 
@@ -88,7 +88,7 @@ class EqOp(Op):
             return r
         if isinstance(r, BoolLitValue) and r:
             return l
-        if l @ r:
+        if alpha_equivalent(l, r, fingerprint=False):
             return True_
         return EqOpValue(l,r)
 
@@ -107,7 +107,7 @@ class NeOp(Op):
             return r
         if isinstance(r, BoolLitValue) and not r:
             return l
-        if l @ r:
+        if alpha_equivalent(l, r, fingerprint=False):
             return False_
         return NeOpValue(l,r)
 
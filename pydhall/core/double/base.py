@@ -52,9 +52,10 @@ class DoubleLitValue(float, Value):
     def alpha_equivalent(self, other, level: int = 0):
         if not isinstance(other, DoubleLitValue):
             return False
-        if math.isnan(self) and math.isnan(other):
-            return True
-        return self == other
+        # as their encodings: NaNs are equal, 0.0 and -0.0 differ
+        if math.isnan(self) or math.isnan(other):
+            return math.isnan(self) and math.isnan(other)
+        return self == other and math.copysign(1, self) == math.copysign(1, other)
 
     def copy(self):
         return self
@@ -78,6 +79,9 @@ class DoubleLit(_AtomicLit):
             return "NaN"
         return str(self.value)
 
+    def format_dhall(self):
+        return (str(self),)
+
     def cbor(self):
         return cbor_dumps(self.value)
 
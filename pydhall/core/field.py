@@ -1,6 +1,6 @@
 from pydhall.core.type_error import DhallTypeError, TYPE_ERROR_MESSAGE
 
-from .base import Term, Value, TypeContext, EvalEnv, QuoteContext
+from .base import Term, Value, TypeContext, EvalEnv, QuoteContext, format_label
 
 from .record.base import RecordTypeValue, RecordLitValue
 from .record.ops import RecordMergeOpValue, RightBiasedRecordMergeOpValue
@@ -136,12 +136,11 @@ class Project(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        record = Term.from_cbor(decoded=decoded.pop(0))
-        proj = decoded[0]
-        if isinstance(proj[0], list):
-            return ProjectType(record, Term.from_cbor(decoded=proj[0]))
-        return cls(record, decoded)
+        assert decoded[0] == cls._cbor_idx
+        record = Term.from_cbor(decoded=decoded[1])
+        if isinstance(decoded[2], list):
+            return ProjectType(record, Term.from_cbor(decoded=decoded[2][0]))
+        return cls(record, decoded[2:])
 
     def eval(self, env=None):
         env = env if env is not None else EvalEnv()
@@ -213,6 +212,7 @@ class Field(Term):
     # attrs = ['record', 'field_name']
     __slots__ = ['record', 'field_name']
     _cbor_idx = 9
+    _primitive_expression = True
 
     def __init__(self, record, field_name, **kwargs):
         self.record = record
@@ -256,8 +256,8 @@ class Field(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        return cls(Term.from_cbor(decoded=decoded[0]), decoded[1])
+        assert decoded[0] == cls._cbor_idx
+        return cls(Term.from_cbor(decoded=decoded[1]), decoded[2])
 
     def eval(self, env=None):
         env = env if env is not None else EvalEnv()
@@ -314,6 +314,9 @@ class Field(Term):
 
         return FieldValue(record, self.field_name)
 
+    def format_dhall(self):
+        return (self.record.format_dhall_operand(), ".", format_label(self.field_name))
+
     def subst(self, name: str, replacement: Term, level: int = 0):
         return Field(self.record.subst(name, replacement, level), self.field_name)
 
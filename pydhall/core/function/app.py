@@ -31,7 +31,9 @@ class AppValue(Value):
     def alpha_equivalent(self, other: Value, level: int = 0) -> bool:
         if not isinstance(other, AppValue):
             return False
-        return self.fn.alpha_equivalent(other.fn, level) and self.arg.alpha_equivalent(other.arg, level)
+        return (
+            (self.fn is other.fn or self.fn.alpha_equivalent(other.fn, level))
+            and (self.arg is other.arg or self.arg.alpha_equivalent(other.arg, level)))
 
     def copy(self):
         return AppValue(self.fn.copy(), self.arg.copy())
@@ -98,8 +100,8 @@ class App(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        return App.build(*[Term.from_cbor(decoded=i) for i in decoded])
+        assert decoded[0] == cls._cbor_idx
+        return App.build(*[Term.from_cbor(decoded=i) for i in decoded[1:]])
 
     def subst(self, name, replacement, level=0):
         return App(
@@ -112,7 +114,11 @@ class App(Term):
             self.arg.rebind(local, level))
 
     def format_dhall(self):
-        return (self.fn.format_dhall(), self.arg.format_dhall())
+        if isinstance(self.fn, App):
+            fn = self.fn.format_dhall()
+        else:
+            fn = self.fn.format_dhall_operand()
+        return (fn, self.arg.format_dhall_operand())
 
     def __str__(self):
         return f"{self.fn} {self.arg}"
@@ -1,6 +1,6 @@
 from copy import deepcopy
 
-from ..base import Term, Value, EvalEnv, TypeContext, QuoteContext, Callable
+from ..base import Term, Value, EvalEnv, TypeContext, QuoteContext, Callable, memoize_closed, shift_free_vars
 
 from .pi import PiValue
 from .var import _QuoteVar
@@ -102,6 +102,7 @@ class Lambda(Term):
         domain = self.type_.eval(env)
 
         def fn(x: Value) -> Value:
+            memoize_closed(self)
             newenv = env.copy()
             newenv.insert(self.label, x)
             result = self.body.eval(newenv)
@@ -118,10 +119,13 @@ class Lambda(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        if len(decoded) == 2:
-            decoded = ["_"] + decoded
-        return cls(decoded[0], Term.from_cbor(decoded=decoded[1]), Term.from_cbor(decoded=decoded[2]))
+        assert decoded[0] == cls._cbor_idx
+        if len(decoded) == 3:
+            return cls("_", Term.from_cbor(decoded=decoded[1]), Term.from_cbor(decoded=decoded[2]))
+        return cls(decoded[1], Term.from_cbor(decoded=decoded[2]), Term.from_cbor(decoded=decoded[3]))
+
+    def _collect_free_vars(self):
+        return self.type_.free_vars() | shift_free_vars(self.body.free_vars(), self.label)
 
     def subst(self, name, replacement, level=0):
         body_level = level + 1 if self.label == name else level
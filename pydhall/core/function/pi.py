@@ -1,4 +1,4 @@
-from ..base import Term, Value, EvalEnv, TypeContext, QuoteContext
+from ..base import Term, Value, EvalEnv, TypeContext, QuoteContext, memoize_closed, shift_free_vars
 from ..universe import UniverseValue, TypeValue
 
 from pydhall.core.type_error import DhallTypeError, TYPE_ERROR_MESSAGE
@@ -14,6 +14,9 @@ class PiValue(Value):
         self.domain = domain
         self.codomain = codomain
 
+    def _fingerprinted(self):
+        return True
+
     def quote(self, ctx=None, normalize=False):
 
         ctx = ctx if ctx is not None else QuoteContext()
@@ -41,7 +44,7 @@ class PiValue(Value):
     def alpha_equivalent(self, other: Value, level: int = 0) -> bool:
         if not isinstance(other, PiValue):
             return False
-        if not self.domain.alpha_equivalent(other.domain, level):
+        if self.domain is not other.domain and not self.domain.alpha_equivalent(other.domain, level):
             return False
         my_codomain = self.codomain(_QuoteVar("_", level))
         other_codomain = other.codomain(_QuoteVar("_", level))
@@ -80,6 +83,9 @@ class Pi(Term):
         return new
 
 
+    def format_dhall(self):
+        return (f"∀({self.label} : {self.type_.dhall()}) →", self.body.format_dhall())
+
     def cbor_values(self):
         if self.label == "_":
             return [self._cbor_idx, self.type_.cbor_values(), self.body.cbor_values()]
@@ -107,6 +113,7 @@ class Pi(Term):
     def eval(self, env=None):
         env = env if env is not None else EvalEnv()
         def codomain(x: Value) -> Value:
+            memoize_closed(self)
             newenv = env.copy()
             newenv.insert(self.label, x)
             return self.body.eval(newenv)
@@ -115,6 +122,9 @@ class Pi(Term):
             self.type_.eval(env),
             codomain)
 
+    def _collect_free_vars(self):
+        return self.type_.free_vars() | shift_free_vars(self.body.free_vars(), self.label)
+
     def subst(self, name, replacement, level=0):
         body_level = level + 1 if self.label == name else level
         return Pi(
@@ -10,7 +10,8 @@ from ..text.base import PlainTextLit, Text
 from ..union import UnionType
 from ..function.app import App
 from ..field import Field
-from .cache import TestFSCache, InMemoryCache, DhallCachePoisoned
+from .cache import FSCache, TestFSCache, InMemoryCache, DhallCachePoisoned
+from pydhall import instrument
 
 
 CACHE = InMemoryCache()
@@ -21,6 +22,14 @@ def set_cache_class(cls):
     CACHE = cls()
 
 
+def get_library_cache_root():
+    "Return the directory of the libraries of the pydhall+schema imports"
+    path = os.environ.get("XDG_CACHE_HOME", None)
+    if path is None:
+        return Path.home().joinpath(".cache/pydhall/library")
+    return Path(path).joinpath("pydhall/library")
+
+
 LOCATION_TYPE = UnionType({
     "Local":       Text(),
     "Remote":      Text(),
@@ -45,7 +54,7 @@ class Import(Term):
     _cbor_idx = 24
 
     def __init__(self, hash, import_mode, **kwargs):
-        if isinstance(hash, bytearray):
+        if isinstance(hash, (bytes, bytearray)):
             hash = hash.hex()
         self.hash = hash
         self.import_mode = import_mode
@@ -87,7 +96,10 @@ class Import(Term):
         except DhallCachePoisoned:
             # TODO: better message
             warn(f"Poisoned cache")
-        content = here.fetch(origin)
+        with instrument.phase("fetch"):
+            content = here.fetch(origin)
+        if isinstance(content, str) and instrument.active() is not None:
+            instrument.count("imported bytes", str(here), len(content.encode()))
         if self.import_mode == Import.Mode.RawText:
             expr = PlainTextLit(content)
         elif isinstance(content, Term):
@@ -145,8 +157,8 @@ class PydhallSchema(Import):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == 24
-        return cls(decoded[3], decoded[4], decoded[0], decoded[1])
+        assert decoded[0] == 24
+        return cls(decoded[4], decoded[5], decoded[1], decoded[2])
 
     def origin(self):
         "Origin returns NullOrigin, since PydhallSchema do not have an origin."
@@ -162,11 +174,46 @@ class PydhallSchema(Import):
         """
         Get a record of all the union types and dhall schemas that define the
         target pydhall schema.
+
+        The record is kept on the schema class. When the imports are cached
+        on disk (FSCache), it's also saved in $XDG_CACHE_HOME/pydhall/library
+        under its `library_key`, that changes with the sources of the
+        schemas and of pydhall.schema: the dhall cache only holds
+        expressions keyed by their semantic hash.
         """
-        from pydhall.schema import get_library
+        from pydhall.schema import get_library, library_key
         from pydhall.core.record.base import RecordLitValue
         mod = import_module(self.module)
-        return RecordLitValue(get_library(getattr(mod, self.cls))).quote()
+        cls = getattr(mod, self.cls)
+        try:
+            return vars(cls)["_pydhall_library_term"]
+        except KeyError:
+            pass
+        path = None
+        if isinstance(CACHE, FSCache):
+            key = library_key(cls)
+            if key is not None:
+                path = get_library_cache_root().joinpath(key)
+        expr = None
+        if path is not None:
+            try:
+                with open(path, "rb") as f:
+                    expr = Term.from_cbor(f.read())
+            except FileNotFoundError:
+                pass
+            except Exception:
+                # a corrupted entry is a miss, it's overwritten below
+                pass
+        if expr is None:
+            expr = RecordLitValue(get_library(cls)).quote()
+            if path is not None:
+                os.makedirs(path.parent, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.{os.getpid()}")
+                with open(tmp, "wb") as f:
+                    f.write(expr.cbor())
+                os.replace(tmp, path)
+        setattr(cls, "_pydhall_library_term", expr)
+        return expr
 
     def chain_onto(self, base):
         return self
@@ -244,14 +291,13 @@ class RemoteFile(Import):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == 24
-        hash = decoded.pop(0)
-        mode = decoded.pop(0)
-        scheme = decoded.pop(0)
-        scheme = "http" if scheme == 0 else "https" 
-        headers = decoded.pop(0)
-        authority = decoded.pop(0)
-        parts = decoded[:-1]
+        assert decoded[0] == 24
+        hash = decoded[1]
+        mode = decoded[2]
+        scheme = "http" if decoded[3] == 0 else "https"
+        # decoded[4] holds the headers
+        authority = decoded[5]
+        parts = decoded[6:-1]
         query = decoded[-1]
         query = query if query is not None else ""
         path = "/" + "/".join(parts).strip("/")
@@ -293,8 +339,8 @@ class EnvVar(Import):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == 24
-        return cls(decoded[3], decoded[0], decoded[1])
+        assert decoded[0] == 24
+        return cls(decoded[4], decoded[1], decoded[2])
 
     def origin(self):
         "Origin returns NullOrigin, since EnvVars do not have an origin."
@@ -427,12 +473,9 @@ class LocalFile(Import):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == 24
-        hash = decoded.pop(0)
-        mode = decoded.pop(0)
-        kind = decoded.pop(0)
-        path = Path(_PATH_KINDS[kind]).joinpath(*decoded)
-        return cls(path, hash, mode)
+        assert decoded[0] == 24
+        path = Path(_PATH_KINDS[decoded[3]]).joinpath(*decoded[4:])
+        return cls(path, decoded[1], decoded[2])
 
 
 _PATH_KINDS = {2: "/", 3: "", 4: "..", 5: "~"}
@@ -460,8 +503,8 @@ class Missing(Import):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == 24
-        return cls(mode=decoded[1])
+        assert decoded[0] == 24
+        return cls(mode=decoded[2])
 
 
 _CBOR_SCHEMES = {
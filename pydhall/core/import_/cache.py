@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 
 from pydhall.core.base import Term
+from pydhall import instrument
 
 
 class DhallCachePoisoned(Exception):
@@ -10,6 +11,15 @@ class DhallCachePoisoned(Exception):
 
 class ExprCache():
     def __getitem__(self, key):
+        try:
+            result = self._lookup(key)
+        except KeyError:
+            instrument.cache_lookup(self.__class__.__name__, False)
+            raise
+        instrument.cache_lookup(self.__class__.__name__, True)
+        return result
+
+    def _lookup(self, key):
         if key.hash is not None:
             try:
                 expr = self.fetch_hash(key.hash)
@@ -89,10 +99,14 @@ class FSCache(ExprCache):
 
     def save_hash(self, key, value, mode=None):
         path = self.root.joinpath(key)
-        if os.path.exists(self.root.joinpath()):
+        if os.path.exists(path):
             return False
-        with open(path, "wb") as f:
-            f.write(value.cbor())
+        # the cache can be shared by concurrent processes: write the entry
+        # under a temporary name so that it never gets read half written.
+        tmp = path.with_name(f".{key}.{os.getpid()}")
+        with open(tmp, "wb") as f:
+            f.write(value)
+        os.replace(tmp, path)
         return True
 
     def save_name(self, key, value, mode=None):
@@ -107,7 +121,7 @@ class TestFSCache(FSCache):
 
     def save_hash(self, key, value, mode=None):
         if super().save_hash(key, value, mode):
-            self.created.append[key]
+            self.created.append(key)
 
     def reset(self):
         for k in self.created:
@@ -47,3 +47,7 @@ class IntegerLit(_AtomicLit):
 
     def eval(self, env=None):
         return IntegerLitValue(self.value)
+
+    def format_dhall(self):
+        sign = "+" if self.value >= 0 else ""
+        return (f"{sign}{self.value}",)
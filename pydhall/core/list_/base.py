@@ -133,6 +133,7 @@ class NonEmptyList(Term):
     # attrs = ['content']
     __slots__ = ['content']
     _cbor_idx = 4
+    _primitive_expression = True
 
     def __init__(self, content, **kwargs):
         self.content = content
@@ -170,12 +171,18 @@ class NonEmptyList(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        if len(decoded) == 1:
-            return EmptyList(App.build(List(), Term.from_cbor(decoded=decoded[0])))
-        content = [Term.from_cbor(decoded=i) for i in decoded[1:]]
+        assert decoded[0] == cls._cbor_idx
+        if len(decoded) == 2:
+            return EmptyList(App.build(List(), Term.from_cbor(decoded=decoded[1])))
+        content = [Term.from_cbor(decoded=i) for i in decoded[2:]]
         return NonEmptyList(content)
 
+    def format_dhall(self):
+        elements = []
+        for e in self.content:
+            elements.extend([",", e.format_dhall()])
+        return ("[",) + tuple(elements[1:]) + ("]",)
+
     def subst(self, name: str, replacement: Term, level: int = 0):
         return NonEmptyList([i.subst(name, replacement, level) for i in self.content])
 
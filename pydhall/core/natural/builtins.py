@@ -1,12 +1,14 @@
-from ..base import Builtin, Value, Callable
+from ..base import Builtin, Value, Callable, alpha_equivalent
 from ..universe import TypeValue
 from .base import NaturalTypeValue, NaturalLitValue
-from .ops import _PlusOp
+from .ops import _PlusOp, _TimesOp
 from ..integer.base import IntegerLitValue
 from ..boolean.base import True_, False_
 from ..text.base import PlainTextLitValue
 from ..function.app import AppValue
 from ..function.lambda_ import LambdaValue
+from ..function.var import _QuoteVar
+from pydhall import budget
 
 
 class NaturalBuild(Builtin):
@@ -31,12 +33,57 @@ class NaturalFold(Builtin):
 
     def __call__(self, n, typ, succ, zero):
         if isinstance(n, NaturalLitValue):
+            if n > 2 and isinstance(zero, NaturalLitValue):
+                result = _closed_form(n, succ, zero)
+                if result is not None:
+                    return result
             result = zero
             for i in range(n):
-                result = AppValue.build(succ, result)
+                new = AppValue.build(succ, result)
+                # the remaining applications would return the same value
+                if new is result or (
+                        isinstance(new, NaturalLitValue)
+                        and isinstance(result, NaturalLitValue)
+                        and new == result):
+                    break
+                result = new
             return result
 
 
+def _closed_form(n, succ, zero):
+    """
+    Return the result of applying `succ` `n` times to the literal `zero` if
+    `succ` is `λ(x) → x + k` or `λ(x) → x * k`, else None.
+
+    The shape of `succ` is found by applying it to a fresh variable. The
+    power of `λ(x) → x * k` can be arbitrarily large: it's not computed
+    while an evaluation budget is active, the loop then counts its steps.
+    """
+    probe = _QuoteVar("_", -1)
+    body = AppValue.build(succ, probe)
+    if body is probe:
+        return zero
+    if isinstance(body, (_PlusOp, _TimesOp)):
+        if body.l is probe:
+            k = body.r
+        elif body.r is probe:
+            k = body.l
+        else:
+            return None
+        if not isinstance(k, NaturalLitValue):
+            return None
+        if isinstance(body, _PlusOp):
+            return NaturalLitValue(int(zero) + int(n) * int(k))
+        if zero == 0 or k == 0:
+            return NaturalLitValue(0)
+        if k == 1:
+            return zero
+        if budget.active() is not None:
+            return None
+        return NaturalLitValue(int(zero) * int(k) ** int(n))
+    return None
+
+
 class NaturalIsZero(Builtin):
     _literal_name = "Natural/isZero"
     _type = "Natural -> Bool"
@@ -97,6 +144,6 @@ class NaturalSubtract(Builtin):
         if isinstance(y, NaturalLitValue):
             if y == 0:
                 return y
-        if x @ y:
+        if alpha_equivalent(x, y, fingerprint=False):
             return NaturalLitValue(0)
         return None
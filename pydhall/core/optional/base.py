@@ -86,13 +86,16 @@ class Some(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        return cls(Term.from_cbor(decoded = decoded[1]))
+        assert decoded[0] == cls._cbor_idx
+        return cls(Term.from_cbor(decoded=decoded[2]))
 
     def eval(self, env=None):
         env = env if env is not None else EvalEnv()
         return SomeValue(self.val.eval(env))
 
+    def format_dhall(self):
+        return ("Some", self.val.format_dhall_operand())
+
     def subst(self, name: str, replacement: Term, level: int =0):
         return Some(self.val.subst(name, replacement, level))
 
@@ -3,11 +3,15 @@ from copy import deepcopy
 from pydhall.utils import hash_all
 from pydhall.core.type_error import DhallTypeError, TYPE_ERROR_MESSAGE
 
-from ..base import Term, Value, QuoteContext, EvalEnv, TypeContext, DictTerm
+from ..base import Term, Value, QuoteContext, EvalEnv, TypeContext, DictTerm, format_label
+from ..base import FINGERPRINT_MIN_FIELDS
 from ..universe import UniverseValue, TypeValue
 
 
 class RecordLitValue(dict, Value):
+    def _fingerprinted(self):
+        return len(self) >= FINGERPRINT_MIN_FIELDS
+
     def quote(self, ctx=None, normalize=False):
         ctx = ctx if ctx is not None else QuoteContext()
         return RecordLit({k: v.quote(ctx, normalize) for k, v in self.items()})
@@ -30,7 +34,7 @@ class RecordLitValue(dict, Value):
             return False
         for k, v in self.items():
             vo = other.get(k)
-            if vo is None or not v.alpha_equivalent(vo, level):
+            if vo is None or (v is not vo and not v.alpha_equivalent(vo, level)):
                 return False
         return True
 
@@ -62,6 +66,14 @@ class RecordLit(DictTerm):
     def rebind(self, local: Term, level: int = 0):
         return RecordLit({k:v.rebind(local, level) for k, v in self.items()})
 
+    def format_dhall(self):
+        if len(self) == 0:
+            return ("{=}",)
+        fields = []
+        for k, v in self.items():
+            fields.extend([",", format_label(k), "=", v.format_dhall()])
+        return ("{",) + tuple(fields[1:]) + ("}",)
+
     def __str__(self):
         if len(self) == 0:
             return "{=}"
@@ -75,6 +87,9 @@ class RecordLit(DictTerm):
 
 
 class RecordTypeValue(dict, Value):
+    def _fingerprinted(self):
+        return len(self) >= FINGERPRINT_MIN_FIELDS
+
     def quote(self, ctx=None, normalize=False):
         ctx = ctx if ctx is not None else QuoteContext()
         return RecordType({k: v.quote(ctx, normalize) for k, v in self.items()})
@@ -89,7 +104,7 @@ class RecordTypeValue(dict, Value):
             return False
         for k, v in self.items():
             vo = other.get(k)
-            if vo is None or not v.alpha_equivalent(vo, level):
+            if vo is None or (v is not vo and not v.alpha_equivalent(vo, level)):
                 return False
         return True
 
@@ -143,6 +158,14 @@ class RecordType(DictTerm):
                 universe = field_universe
         return universe
 
+    def format_dhall(self):
+        if len(self) == 0:
+            return ("{}",)
+        fields = []
+        for k, v in self.items():
+            fields.extend([",", format_label(k), ":", v.format_dhall()])
+        return ("{",) + tuple(fields[1:]) + ("}",)
+
     def __str__(self):
         if len(self) == 0:
             return "{}"
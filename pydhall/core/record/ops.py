@@ -1,6 +1,6 @@
 from pydhall.core.type_error import DhallTypeError, TYPE_ERROR_MESSAGE
 
-from ..base import Op, OpValue, TypeContext, EvalEnv
+from ..base import Op, OpValue, TypeContext, EvalEnv, alpha_equivalent
 
 from .base import RecordLitValue, RecordTypeValue
 
@@ -28,7 +28,7 @@ class RightBiasedRecordMergeOp(Op):
                 result = RecordLitValue({k: v for k,v in l.items()})
                 result.update(r)
                 return result
-        if l @ r:
+        if alpha_equivalent(l, r, fingerprint=False):
             return l
         return RightBiasedRecordMergeOpValue(l, r)
 
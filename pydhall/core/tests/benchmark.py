@@ -0,0 +1,96 @@
+#! /usr/bin/env python
+import gc
+from timeit import repeat
+
+from pydhall.parser import Dhall
+from pydhall.core import NonEmptyListValue, PlainTextLitValue, TextRopeValue
+from pydhall.core.function.app import AppValue
+
+
+def benchit(fn, name, size=None):
+    NUMBER = 1
+    REPEAT = 3
+    gc.collect()
+    total_seconds = min(repeat(fn,
+                               lambda: gc.enable(),
+                               repeat=REPEAT,
+                               number=NUMBER))
+    seconds_each = total_seconds / NUMBER
+    if size is None:
+        print('%s: Took %.3fs' % (name, seconds_each))
+    else:
+        mb = size / (1024.0 * 1024.0)
+        print('%s: Took %.3fs to produce %.1fMB: %.1fMB/s' % (
+            name, seconds_each, mb, mb / seconds_each))
+    return seconds_each
+
+
+RENDER_LINES = r"""
+λ(lines : List Text) →
+  List/fold Text lines Text (λ(line : Text) → λ(acc : Text) → "${line}\n${acc}") ""
+"""
+
+
+def bench_render_text(size=10 * 1024 * 1024):
+    "Render a `size` bytes text file, one line at a time, with List/fold"
+    line = PlainTextLitValue("x" * 99)
+    lines = NonEmptyListValue([line] * (size // 100))
+    render = Dhall.p_parse(RENDER_LINES).eval()
+
+    def run():
+        result = AppValue.build(render, lines)
+        if isinstance(result, TextRopeValue):
+            result = result.flatten()
+        assert len(result) == size // 100 * 100
+
+    return benchit(run, "List/fold text rendering", size)
+
+
+def bench_cbor_roundtrip(size=1024 * 1024):
+    "Load a `size` bytes expression from dhall source and from its encoding"
+    from pydhall.core.base import Term
+    from pydhall.parser.tests.benchmark import generate_records
+
+    src = generate_records(size)
+    term = Dhall.p_parse(src)
+    encoded = term.cbor()
+    assert Term.from_cbor(encoded) == term
+    print('source: %.1fMB, encoded: %.1fMB' % (
+        len(src) / (1024.0 * 1024.0), len(encoded) / (1024.0 * 1024.0)))
+    benchit(lambda: Dhall.p_parse(src), "parse source", len(src))
+    benchit(lambda: Term.from_cbor(encoded), "decode binary", len(encoded))
+    benchit(lambda: term.cbor(), "encode binary", len(encoded))
+
+
+def bench_cbor_decode_cache():
+    "Decode every expression of the import cache, e.g. a cached Prelude"
+    from pydhall.core.base import Term
+    from pydhall.core.import_.cache import FSCache
+
+    root = FSCache().root
+    blobs = [p.read_bytes() for p in root.glob("1220*")]
+    if not blobs:
+        print(f"decode cache: no cached expression in {root}")
+        return
+    size = sum(len(b) for b in blobs)
+    print('cache: %d expressions, %.1fMB' % (len(blobs), size / (1024.0 * 1024.0)))
+    benchit(lambda: [Term.from_cbor(b) for b in blobs], "decode cache", size)
+
+
+def bench_natural_fold(n=1000000):
+    "Natural/fold with closed-form and fixed-point successors"
+    for name, size, succ in [
+            ("x + k", n, r"λ(x : Natural) → x + 3"),
+            ("x * k", n, r"λ(x : Natural) → x * 2"),
+            ("fixed point", n, r"λ(x : Natural) → Natural/subtract 1 x"),
+            # no shortcut: every application is evaluated
+            ("generic", n // 100, r"λ(x : Natural) → if Natural/even x then x + 1 else x + 3")]:
+        expr = Dhall.p_parse(f"Natural/fold {size} Natural ({succ}) 1")
+        benchit(expr.eval, f"Natural/fold {size} ({name})")
+
+
+if __name__ == "__main__":
+    bench_render_text()
+    bench_cbor_roundtrip()
+    bench_cbor_decode_cache()
+    bench_natural_fold()
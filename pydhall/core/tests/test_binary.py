@@ -3,6 +3,7 @@ import pytest
 from pydhall import loads
 from pydhall.core import Term
 from pydhall.core import NaturalLit
+from pydhall.parser import Dhall
 
 # this is more of an integration test as the sha256 values
 # are the results of dahll-haskell's hash command.
@@ -37,3 +38,22 @@ def test_sha256(input, expected):
 def test_encode_decode(input):
     result = Term.from_cbor(input.cbor())
     assert result == input
+
+
+@pytest.mark.parametrize("src", [
+    "let a = 1 let b : Natural = 2 in a + b",
+    '"a${"b"}c${"d"}"',
+    "merge { A = 1 } < A | B >.A : Natural",
+    "toMap { a = 1 } : List { mapKey : Text, mapValue : Natural }",
+    "{ a = 1, b = 2 }.{ a }",
+    "{ a = 1, b = 2 }.({ a : Natural })",
+    "[] : List Natural",
+    "Some [ 1, 2 ]",
+    "https://example.com/a/b.dhall?q=1",
+    "./a/b.dhall as Text",
+    "env:HOME",
+    "missing",
+])
+def test_decode_source(src):
+    term = Dhall.p_parse(src)
+    assert Term.from_cbor(term.cbor()) == term
@@ -1,6 +1,9 @@
 import pytest
 
 from pydhall.parser import Dhall
+from pydhall.core import TextLit, PlainTextLitValue, TextRopeValue
+from pydhall.core.function.app import AppValue
+from pydhall.core.natural.base import NaturalLitValue
 
 
 @pytest.mark.parametrize("input,expected", [
@@ -17,3 +20,55 @@ def test_let(input, expected):
 ])
 def test_if(input, expected):
     assert Dhall.p_parse(input).eval() == expected
+
+
+def test_text_append_fold():
+    src = r'List/fold Text ["a", "b", "c"] Text (λ(x : Text) → λ(acc : Text) → x ++ acc) ""'
+    assert Dhall.p_parse(src).eval() == "abc"
+
+
+def test_large_text_append_is_lazy():
+    lines = ", ".join(['"%s"' % (str(i) * 100) for i in range(10)])
+    src = r'List/fold Text [%s] Text (λ(x : Text) → λ(acc : Text) → "${x}\n${acc}") ""' % lines
+    result = Dhall.p_parse(src).eval()
+    assert isinstance(result, TextRopeValue)
+    expected = "".join([(str(i) * 100) + "\n" for i in range(10)])
+    assert result.flatten() == expected
+    assert result.quote() == TextLit([], expected)
+    assert result @ PlainTextLitValue(expected)
+
+
+@pytest.mark.parametrize("input,expected", [
+    (r"Natural/fold 1000000 Natural (λ(x : Natural) → x + 3) 2", 3000002),
+    (r"Natural/fold 1000000 Natural (λ(x : Natural) → 3 + x) 0", 3000000),
+    (r"Natural/fold 10 Natural (λ(x : Natural) → x * 2) 3", 3072),
+    (r"Natural/fold 100000000 Natural (λ(x : Natural) → x) 3", 3),
+    (r"Natural/fold 100000000 Natural (λ(x : Natural) → 7) 3", 7),
+    (r"Natural/fold 100000000 Natural (λ(x : Natural) → Natural/subtract 1 x) 3", 0),
+    (r"Natural/fold 10 Natural (λ(x : Natural) → x + x) 1", 1024),
+    (r"Natural/fold 3 Natural (λ(x : Natural) → x + 1) 0", 3),
+])
+def test_natural_fold(input, expected):
+    assert Dhall.p_parse(input).eval() == expected
+
+
+def test_natural_fold_not_literal():
+    src = r"λ(z : Natural) → Natural/fold 3 Natural (λ(x : Natural) → x + 1) z"
+    assert Dhall.p_parse(src).eval().quote().dhall() == Dhall.p_parse(
+        r"λ(z : Natural) → z + 1 + 1 + 1").eval().quote().dhall()
+
+
+def test_free_vars():
+    term = Dhall.p_parse(r"λ(x : Natural) → let y = x + z in λ(x : Natural) → x@1 + y + w@1")
+    assert term.free_vars() == {("z", 0), ("w", 1)}
+
+
+def test_closed_subterms_are_memoized():
+    fn = Dhall.p_parse(r"λ(x : Natural) → { a = x, b = [ 1, 2, 3 ], c = 1 + 2 }").eval()
+    r1 = AppValue.build(fn, NaturalLitValue(1))
+    r2 = AppValue.build(fn, NaturalLitValue(2))
+    r3 = AppValue.build(fn, NaturalLitValue(3))
+    assert r2["b"] is r3["b"]
+    assert r3["a"] == 3
+    assert r3["c"] == 3
+    assert r1.quote() == Dhall.p_parse("{ a = 1, b = [ 1, 2, 3 ], c = 3 }")
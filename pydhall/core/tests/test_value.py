@@ -41,3 +41,63 @@ def test_double_lit():
     assert str(d) == "0.1"
     assert DoubleLitValue(0.1) == DoubleLitValue(0.1)
     assert DoubleLitValue(0.1) != DoubleLitValue(0.2)
+
+
+def test_alpha_equivalent_fingerprint():
+    a = Dhall.p_parse("forall (x : Type) -> { a : x, b : List Natural }").eval()
+    b = Dhall.p_parse("forall (y : Type) -> { a : y, b : List Natural }").eval()
+    c = Dhall.p_parse("forall (y : Type) -> { a : y, b : List Bool }").eval()
+    # compared by structure first, then by fingerprint
+    for _ in range(3):
+        assert a @ b
+        assert not a @ c
+    assert a.fingerprint() == b.fingerprint()
+    assert a.fingerprint() != c.fingerprint()
+
+
+def test_signed_zeros():
+    def record(a):
+        return Dhall.p_parse(f"{{ a = {a}, b = 1, c = 2, d = 3 }}").eval()
+
+    zero, minus_zero, nan = record("0.0"), record("-0.0"), record("NaN")
+    # the same answer before and after fingerprinting
+    for _ in range(3):
+        assert not zero @ minus_zero
+        assert not zero["a"] @ minus_zero["a"]
+        assert nan @ record("NaN")
+    assert zero.fingerprint() and minus_zero.fingerprint()
+    assert zero._fingerprint != minus_zero._fingerprint
+
+
+def test_small_values_have_no_fingerprint():
+    a = Dhall.p_parse("{ a : Natural }").eval()
+    b = Dhall.p_parse("{ a : Natural }").eval()
+    for _ in range(3):
+        assert a @ b
+    assert a._fingerprint is None
+
+
+def test_list_element_types():
+    src = "[" + ", ".join(["{ a = 1, b = [ True ] }"] * 100) + "]"
+    expected = Dhall.p_parse("List { a : Natural, b : List Bool }").eval()
+    assert Dhall.p_parse(src).type() @ expected
+
+
+def test_free_variables_have_no_fingerprint():
+    assert Dhall.p_parse("x").eval().fingerprint() is False
+    assert Dhall.p_parse("{ a : x }").eval().fingerprint() is False
+    assert Dhall.p_parse("λ(x : Type) → { a : x }").eval().fingerprint()
+
+
+def test_proved_values_are_not_retained():
+    import gc
+    import weakref
+
+    a = Dhall.p_parse("{ a : Natural }").eval()
+    b = Dhall.p_parse("{ a : Natural }").eval()
+    assert a @ b
+    assert a @ b
+    ref = weakref.ref(a)
+    del a
+    gc.collect()
+    assert ref() is None
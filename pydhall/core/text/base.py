@@ -1,6 +1,4 @@
-from io import StringIO
-
-from ..base import Value, Node, Term, Builtin, BuiltinValue, EvalEnv, TypeContext
+from ..base import Value, Node, Term, Builtin, BuiltinValue, EvalEnv, TypeContext, QuoteContext
 from ..universe import TypeValue
 
 from pydhall.core.type_error import TYPE_ERROR_MESSAGE
@@ -8,6 +6,9 @@ from pydhall.core.type_error import TYPE_ERROR_MESSAGE
 
 TextTypeValue = BuiltinValue("Text")
 
+# Plain texts longer than this are concatenated lazily (see TextRopeValue)
+ROPE_THRESHOLD = 512
+
 
 class Text(Builtin):
     _type = TypeValue
@@ -57,13 +58,99 @@ class PlainTextLitValue(str, Value):
         return PlainTextLit(self)
 
     def alpha_equivalent(self, other, level=0):
+        if isinstance(other, TextRopeValue):
+            other = other.flatten()
         return self.__class__ == other.__class__ and self == other
 
+    def as_python(self):
+        return str(self)
+
     def copy(self):
         # TODO : return self ?
         return self
 
 
+class TextRopeValue(Value):
+    """
+    A plain text made of the concatenation of `parts` (strings or other
+    ropes). Concatenating ropes costs O(number of parts) instead of
+    O(length of the text), so that building a text by repeated appends
+    (typically in a `List/fold`) stays linear. The actual string is built
+    once, by `flatten()`, when the text is quoted or inspected.
+    """
+    __slots__ = ["_parts", "_len", "_flat"]
+
+    def __init__(self, parts):
+        self._parts = parts
+        self._len = sum(len(p) for p in parts)
+        self._flat = None
+
+    def __len__(self):
+        return self._len
+
+    def flatten(self):
+        if self._flat is None:
+            out = []
+            # ropes can be very deep, don't recurse
+            stack = list(reversed(self._parts))
+            while stack:
+                part = stack.pop()
+                if isinstance(part, str):
+                    out.append(part)
+                elif part._flat is not None:
+                    out.append(part._flat)
+                else:
+                    stack.extend(reversed(part._parts))
+            self._flat = PlainTextLitValue("".join(out))
+            # the parts are not needed anymore, let them go.
+            self._parts = None
+        return self._flat
+
+    def quote(self, ctx=None, normalize=False):
+        return PlainTextLit(self.flatten())
+
+    def alpha_equivalent(self, other, level=0):
+        return self.flatten().alpha_equivalent(other, level)
+
+    def as_python(self):
+        return str(self.flatten())
+
+    def __str__(self):
+        return self.flatten()
+
+    def __repr__(self):
+        return f"TextRopeValue({self._len} chars)"
+
+    def copy(self):
+        return self
+
+
+def _join_text(parts):
+    return "".join(
+        p.flatten() if isinstance(p, TextRopeValue) else p for p in parts)
+
+
+def concat_text(parts):
+    """
+    Concatenate plain texts (`str`, `PlainTextLitValue` or `TextRopeValue`)
+    into a text value. Short results are joined right away, long ones are
+    returned as a `TextRopeValue`.
+    """
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return PlainTextLitValue("")
+    if len(parts) == 1:
+        if isinstance(parts[0], (PlainTextLitValue, TextRopeValue)):
+            return parts[0]
+        return PlainTextLitValue(parts[0])
+    if sum(len(p) for p in parts) > ROPE_THRESHOLD:
+        return TextRopeValue(parts)
+    for p in parts:
+        if isinstance(p, TextRopeValue):
+            return TextRopeValue(parts)
+    return PlainTextLitValue("".join(parts))
+
+
 class TextLitValue(Value):
     def __init__(self, chunks, suffix):
         self.chunks = chunks
@@ -96,6 +183,7 @@ class TextLit(Term):
     # attrs = ['chunks', 'suffix']
     __slots__ = ['chunks', 'suffix']
     _cbor_idx = 18
+    _primitive_expression = True
 
     def __init__(self, chunks, suffix, **kwargs):
         self.chunks = chunks
@@ -126,51 +214,55 @@ class TextLit(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        suffix = decoded.pop()
-        chunks = []
-        while decoded:
-            chunks.append(
-                Chunk(
-                    decoded.pop(0),
-                    Term.from_cbor(decoded=decoded.pop(0))))
-        return TextLit(chunks, suffix)
+        assert decoded[0] == cls._cbor_idx
+        chunks = [
+            Chunk(decoded[i], Term.from_cbor(decoded=decoded[i + 1]))
+            for i in range(1, len(decoded) - 1, 2)]
+        return TextLit(chunks, decoded[-1])
 
     def eval(self, env=None):
         env = env if env is not None else EvalEnv()
-        str_ = StringIO()
+        # plain text parts since the last non-text chunk. They are joined
+        # lazily, so that interpolating a large text doesn't copy it.
+        text = []
         new_chunks = []
         for chk in self.chunks:
-            str_.write(chk.prefix)
+            text.append(chk.prefix)
             norm_expr = chk.expr.eval(env)
-            if isinstance(norm_expr, PlainTextLitValue):
-                str_.write(norm_expr)
+            if isinstance(norm_expr, (PlainTextLitValue, TextRopeValue)):
+                text.append(norm_expr)
             elif isinstance(norm_expr, TextLitValue):
-                str_.write(norm_expr.chunks[0].prefix)
-                new_chunks.append(Chunk(str_.getvalue(), norm_expr.chunks[0].expr))
+                text.append(norm_expr.chunks[0].prefix)
+                new_chunks.append(Chunk(_join_text(text), norm_expr.chunks[0].expr))
                 new_chunks.extend(norm_expr.chunks[1:])
-                str_.seek(0)
-                str_.truncate()
-                str_.write(norm_expr.suffix)
+                text = [norm_expr.suffix]
             else:
-                new_chunks.append(Chunk(str_.getvalue(), norm_expr))
-                str_.seek(0)
-                str_.truncate()
+                new_chunks.append(Chunk(_join_text(text), norm_expr))
+                text = []
 
-        str_.write(self.suffix)
+        text.append(self.suffix)
+
+        # Special case: no chunks -> PlainTextLit
+        if len(new_chunks) == 0:
+            return concat_text(text)
 
-        new_suffix = str_.getvalue()
+        new_suffix = _join_text(text)
 
         # Special case: "${<expr>}" → <expr>
         if len(new_chunks) == 1 and new_chunks[0].prefix == "" and new_suffix == "":
             return new_chunks[0].expr
 
-        # Special case: no chunks -> PlainTextLit
-        if len(new_chunks) == 0:
-            return PlainTextLitValue(new_suffix)
-
         return TextLitValue(new_chunks, new_suffix)
 
+    def format_dhall(self):
+        out = ['"']
+        for c in self.chunks:
+            out.append(escape_text(c.prefix))
+            out.append("${" + c.expr.dhall() + "}")
+        out.append(escape_text(self.suffix))
+        out.append('"')
+        return ("".join(out),)
+
     def subst(self, name: str, replacement: Term, level: int = 0):
         if not self.chunks:
             return self
@@ -186,5 +278,30 @@ class TextLit(Term):
             self.suffix)
 
 
+_ESCAPES = {
+    '"': r'\"',
+    '$': r'\u0024',
+    '\\': r'\\',
+    '\b': r'\b',
+    '\f': r'\f',
+    '\n': r'\n',
+    '\r': r'\r',
+    '\t': r'\t',
+}
+
+
+def escape_text(txt):
+    "Escape `txt` for use in a double quoted dhall text literal"
+    out = []
+    for char in txt:
+        ch = _ESCAPES.get(char)
+        if ch is None:
+            ch = char
+            if ord(ch) < 0x20:
+                ch = r'\u{:04x}'.format(ord(ch))
+        out.append(ch)
+    return "".join(out)
+
+
 def PlainTextLit(txt):
     return TextLit([], txt)
@@ -1,11 +1,10 @@
 from copy import deepcopy
 
-import cbor
-
 from pydhall.core.type_error import DhallTypeError, TYPE_ERROR_MESSAGE
 from pydhall.utils import cbor_dict
 
-from .base import Term, Value, TypeContext, EvalEnv, QuoteContext, Callable, DictTerm
+from .base import Term, Value, TypeContext, EvalEnv, QuoteContext, Callable, DictTerm, format_label
+from .base import FINGERPRINT_MIN_FIELDS
 from .universe import TypeValue, UniverseValue, SortValue, KindValue
 from .record.base import RecordTypeValue, RecordLitValue
 from .optional import OptionalOf, SomeValue, NoneOf
@@ -15,6 +14,8 @@ from .function.app import App, AppValue
 
 
 class UnionTypeValue(dict, Value):
+    def _fingerprinted(self):
+        return len(self) >= FINGERPRINT_MIN_FIELDS
 
     def quote(self, ctx=None, normalize=False):
         ctx = ctx if ctx is not None else QuoteContext()
@@ -39,7 +40,8 @@ class UnionTypeValue(dict, Value):
                 if other[k] is not None:
                     return False
                 continue
-            if not v.alpha_equivalent(other[k], level):
+            vo = other[k]
+            if v is not vo and not v.alpha_equivalent(vo, level):
                 return False
         return True
 
@@ -119,6 +121,16 @@ class UnionType(DictTerm):
                 result[k] = v.copy()
         return UnionType(result)
 
+    def format_dhall(self):
+        if len(self) == 0:
+            return ("<>",)
+        alternatives = []
+        for k, v in self.items():
+            alternatives.extend(["|", format_label(k)])
+            if v is not None:
+                alternatives.extend([":", v.format_dhall()])
+        return ("<",) + tuple(alternatives[1:]) + (">",)
+
 
 class UnionConstructor(Callable):
     def __init__(self, type_, alternative):
@@ -234,10 +246,12 @@ class Merge(Term):
     @classmethod
     def from_cbor(cls, encoded=None, decoded=None):
         assert encoded is None
-        assert decoded.pop(0) == cls._cbor_idx
-        if len(decoded) == 2:
-            decoded.append(None)
-        return Merge(*[Term.from_cbor(decoded=i) for i in decoded])
+        assert decoded[0] == cls._cbor_idx
+        annotation = Term.from_cbor(decoded=decoded[3]) if len(decoded) > 3 else None
+        return Merge(
+            Term.from_cbor(decoded=decoded[1]),
+            Term.from_cbor(decoded=decoded[2]),
+            annotation)
 
     def subst(self, name: str, replacement: Term, level: int = 0):
         h = self.handler.subst(name, replacement, level)
@@ -1,4 +1,4 @@
-import cbor
+from pydhall.utils import cbor_dumps
 
 from .base import Value, Builtin, Term
 
@@ -57,7 +57,7 @@ class Universe(Builtin):
         Term.__init__(self, *args, **kwargs)
 
     def cbor(self):
-        return cbor.dumps(self.__class__.__name__)
+        return cbor_dumps(self.__class__.__name__)
 
     @classmethod
     def from_name(cls, name):
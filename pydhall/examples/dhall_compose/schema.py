@@ -1,6 +1,5 @@
 from pydhall.schema import *
-from pydhall.schema.render import render
-from yaml import safe_dump
+from pydhall.schema.render import render_yaml
 
 # misc
 
@@ -211,6 +210,4 @@ if __name__ == "__main__":
         compose_file = "./docker-compose.dhall"
     with open(compose_file) as f:
         cfg = load_src(Compose, f.read())
-    # print(render(cfg))
-    # import ipdb; ipdb.set_trace()
-    safe_dump(render(cfg),sys.stdout)
+    render_yaml(cfg, sys.stdout)
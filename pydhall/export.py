@@ -0,0 +1,290 @@
+"""
+Render normalized dhall values as JSON or YAML.
+
+The values are walked and written to the output file as they are visited,
+so rendering a large configuration never builds an intermediate python
+object.
+"""
+import math
+import re
+from json.encoder import encode_basestring_ascii
+
+from pydhall.core.base import Value
+from pydhall.core.boolean.base import BoolLitValue
+from pydhall.core.double.base import DoubleLitValue
+from pydhall.core.integer.base import IntegerLitValue
+from pydhall.core.list_.base import EmptyListValue, NonEmptyListValue, ListOf
+from pydhall.core.natural.base import NaturalLitValue
+from pydhall.core.optional.base import SomeValue, NoneOf
+from pydhall.core.record.base import RecordLitValue, RecordTypeValue
+from pydhall.core.text.base import PlainTextLitValue, TextRopeValue, TextTypeValue
+from pydhall.core.union import UnionVal
+
+
+class DhallExportError(Exception):
+    pass
+
+
+_MAP_KEYS = {"mapKey", "mapValue"}
+
+
+def _is_map_entry(value):
+    return (
+        isinstance(value, RecordLitValue)
+        and value.keys() == _MAP_KEYS
+        and isinstance(value["mapKey"], (PlainTextLitValue, TextRopeValue)))
+
+
+def _is_map_type(type_):
+    return (
+        isinstance(type_, ListOf)
+        and isinstance(type_.type_, RecordTypeValue)
+        and type_.type_.keys() == _MAP_KEYS
+        and type_.type_["mapKey"] == TextTypeValue)
+
+
+def _items(value, omit_none):
+    "yield the (key, value) pairs of a record or of a `toMap`-style list"
+    if isinstance(value, RecordLitValue):
+        items = value.items()
+    else:
+        items = ((str(i["mapKey"]), i["mapValue"]) for i in value.content)
+    for k, v in items:
+        if omit_none and isinstance(v, NoneOf):
+            continue
+        yield k, v
+
+
+def _unwrap(value):
+    """
+    Remove the layers that are not rendered: `Some x` is rendered as `x`
+    and a union alternative as its value (or its name, if it has no value).
+    """
+    while True:
+        if isinstance(value, SomeValue):
+            value = value.value
+        elif isinstance(value, UnionVal):
+            if value.val is None:
+                return PlainTextLitValue(value.alternative)
+            value = value.val
+        else:
+            return value
+
+
+def _scalar(value):
+    "Return the python scalar for `value`, or raise DhallExportError"
+    if isinstance(value, TextRopeValue):
+        return str(value.flatten())
+    if isinstance(value, PlainTextLitValue):
+        return str(value)
+    if isinstance(value, BoolLitValue):
+        return value.as_python()
+    if isinstance(value, (NaturalLitValue, IntegerLitValue)):
+        return int(value)
+    if isinstance(value, DoubleLitValue):
+        return float(value)
+    if isinstance(value, NoneOf):
+        return None
+    if isinstance(value, Value):
+        raise DhallExportError(
+            f"Cannot render {value.quote().dhall()} as JSON or YAML")
+    raise DhallExportError(f"Cannot render {value!r} as JSON or YAML")
+
+
+class _Writer:
+    def __init__(self, fp, omit_none=False):
+        self.fp = fp
+        self.omit_none = omit_none
+
+    def is_object(self, value):
+        if isinstance(value, RecordLitValue):
+            return True
+        if isinstance(value, NonEmptyListValue):
+            return all(_is_map_entry(i) for i in value.content)
+        if isinstance(value, EmptyListValue):
+            return _is_map_type(value.type_)
+        return False
+
+    def is_array(self, value):
+        return isinstance(value, (NonEmptyListValue, EmptyListValue))
+
+    def items(self, value):
+        if isinstance(value, EmptyListValue):
+            return iter(())
+        return _items(value, self.omit_none)
+
+    def elements(self, value):
+        if isinstance(value, EmptyListValue):
+            return iter(())
+        return iter(value.content)
+
+
+class JSONWriter(_Writer):
+    def __init__(self, fp, omit_none=False, indent=None):
+        super().__init__(fp, omit_none)
+        self.indent = indent
+
+    def _newline(self, level):
+        if self.indent is not None:
+            self.fp.write("\n" + " " * (self.indent * level))
+
+    def write(self, value, level=0):
+        write = self.fp.write
+        value = _unwrap(value)
+        if self.is_object(value):
+            write("{")
+            first = True
+            for k, v in self.items(value):
+                if not first:
+                    write(",")
+                first = False
+                self._newline(level + 1)
+                write(json_scalar(k))
+                write(": " if self.indent is not None else ":")
+                self.write(v, level + 1)
+            if not first:
+                self._newline(level)
+            write("}")
+        elif self.is_array(value):
+            write("[")
+            first = True
+            for v in self.elements(value):
+                if not first:
+                    write(",")
+                first = False
+                self._newline(level + 1)
+                self.write(v, level + 1)
+            if not first:
+                self._newline(level)
+            write("]")
+        else:
+            write(json_scalar(_scalar(value)))
+
+
+# strings that are read back as strings when written unquoted
+_YAML_PLAIN = re.compile(r"[A-Za-z_][A-Za-z0-9_./-]*\Z")
+_YAML_RESERVED = {
+    "y", "yes", "n", "no", "true", "false", "on", "off", "null", "~"}
+
+
+def _float(value, inf, nan):
+    if value != value:
+        return nan
+    if value in (math.inf, -math.inf):
+        return inf if value > 0 else "-" + inf
+    return float.__repr__(value)
+
+
+def json_scalar(value):
+    "Return the JSON of the python scalar `value` (None, bool, int, float or str)"
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if isinstance(value, int):
+        return int.__repr__(value)
+    return _float(value, "Infinity", "NaN")
+
+
+def yaml_scalar(value):
+    "Return the YAML of the python scalar `value`, strings are quoted if needed"
+    if isinstance(value, str):
+        if _YAML_PLAIN.match(value) and value.lower() not in _YAML_RESERVED:
+            return value
+        return encode_basestring_ascii(value)
+    if isinstance(value, float):
+        return _float(value, ".inf", ".nan")
+    return json_scalar(value)
+
+
+class YAMLWriter(_Writer):
+    def __init__(self, fp, omit_none=False, indent=2):
+        super().__init__(fp, omit_none)
+        self.indent = indent
+
+    def _entries(self, value):
+        """
+        Return `(is_object, entries)` for a non-empty collection, where
+        entries is an iterator on its items or elements. Return
+        `(False, None)` for scalars and empty collections, that are
+        written in flow style.
+        """
+        if self.is_object(value):
+            is_object, entries = True, self.items(value)
+        elif self.is_array(value):
+            is_object, entries = False, self.elements(value)
+        else:
+            return False, None
+        first = next(entries, _END)
+        if first is _END:
+            return False, None
+        return is_object, _chain(first, entries)
+
+    def _flow(self, value):
+        if self.is_object(value):
+            return "{}"
+        if self.is_array(value):
+            return "[]"
+        return yaml_scalar(_scalar(value))
+
+    def write(self, value, level=0, inline=True):
+        """
+        Write `value` at indentation `level`. If `inline` is True, the
+        first line is written at the current position of the output.
+        """
+        value = _unwrap(value)
+        is_object, entries = self._entries(value)
+        if entries is None:
+            self.fp.write(self._flow(value) + "\n")
+        else:
+            self._write_entries(is_object, entries, level, inline)
+
+    def _write_entries(self, is_object, entries, level, inline):
+        write = self.fp.write
+        pad = " " * (self.indent * level)
+        for i, entry in enumerate(entries):
+            if i or not inline:
+                write(pad)
+            if is_object:
+                k, v = entry
+                write(yaml_scalar(k) + ":")
+                self._write_child(v, level + 1, after_key=True)
+            else:
+                write("-")
+                self._write_child(entry, level + 1, after_key=False)
+
+    def _write_child(self, value, level, after_key):
+        # non-empty collections start on the next line after a key, and
+        # on the same line after a dash.
+        value = _unwrap(value)
+        is_object, entries = self._entries(value)
+        if entries is None:
+            self.fp.write(" " + self._flow(value) + "\n")
+        elif after_key:
+            self.fp.write("\n")
+            self._write_entries(is_object, entries, level, False)
+        else:
+            self.fp.write(" ")
+            self._write_entries(is_object, entries, level, True)
+
+
+_END = object()
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+def dump_json(value, fp, omit_none=False, indent=None):
+    "Write the normalized dhall `value` as JSON in the file object `fp`"
+    JSONWriter(fp, omit_none, indent).write(value)
+
+
+def dump_yaml(value, fp, omit_none=False):
+    "Write the normalized dhall `value` as YAML in the file object `fp`"
+    YAMLWriter(fp, omit_none).write(value)
@@ -0,0 +1,177 @@
+"""
+Instrumentation of the dhall pipeline.
+
+A `Profiler` records the wall time spent in each phase (parse, resolve,
+type, eval, quote, cbor, fetch) and counts evaluated nodes, beta
+reductions, builtin calls, cache hits and misses and imported bytes:
+
+    with Profiler() as prof:
+        expr = Dhall.p_parse(src)
+        ...
+    print(prof.summary())
+
+Node, beta reduction and builtin counters are installed by wrapping the
+relevant methods while a profiler is active, so they cost nothing
+otherwise.
+"""
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from time import perf_counter
+
+
+_ACTIVE = None
+
+
+def active():
+    "Return the active profiler, or None"
+    return _ACTIVE
+
+
+def phase(name):
+    """
+    Return a context manager timing the phase `name` on the active
+    profiler. Nested runs of the same phase are counted once.
+    """
+    if _ACTIVE is None:
+        return _NULL_CONTEXT
+    return _ACTIVE.phase(name)
+
+
+def count(counter, key, n=1):
+    "Add `n` to the `key` entry of `counter` on the active profiler"
+    if _ACTIVE is not None:
+        _ACTIVE.counters[counter][key] += n
+
+
+def cache_lookup(cache, hit):
+    "Record a lookup in the cache named `cache`"
+    if _ACTIVE is not None:
+        _ACTIVE.counters["cache hits" if hit else "cache misses"][cache] += 1
+
+
+_NULL_CONTEXT = nullcontext()
+
+
+def _subclasses(cls):
+    "Return all the subclasses of `cls`"
+    result = {}
+    stack = [cls]
+    while stack:
+        for sub in stack.pop().__subclasses__():
+            if sub not in result:
+                result[sub] = None
+                stack.append(sub)
+    return list(result)
+
+
+class Profiler:
+    def __init__(self):
+        self.phases = defaultdict(float)
+        self.phase_calls = Counter()
+        self.counters = defaultdict(Counter)
+        self._running = Counter()
+        self._patched = []
+
+    @contextmanager
+    def phase(self, name):
+        self._running[name] += 1
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._running[name] -= 1
+            if not self._running[name]:
+                self.phases[name] += perf_counter() - start
+                self.phase_calls[name] += 1
+
+    def __enter__(self):
+        global _ACTIVE
+        if _ACTIVE is not None:
+            raise RuntimeError("A profiler is already active")
+        _ACTIVE = self
+        self._install()
+        return self
+
+    def __exit__(self, *exc):
+        global _ACTIVE
+        self._uninstall()
+        _ACTIVE = None
+
+    def _patch(self, owner, name, wrapper):
+        self._patched.append((owner, name, owner.__dict__[name]))
+        setattr(owner, name, wrapper)
+
+    def _install(self):
+        from pydhall.core.base import Term, Builtin
+        from pydhall.core.function.app import AppValue
+        from pydhall.core.function.lambda_ import LambdaValue
+
+        nodes = self.counters["evaluated nodes"]
+        for cls in [Term] + _subclasses(Term):
+            if "eval" in cls.__dict__:
+                self._patch(cls, "eval", _counting_eval(cls.__dict__["eval"], nodes))
+
+        beta = self.counters["beta reductions"]
+        build = AppValue.__dict__["build"].__func__
+
+        @wraps(build)
+        def counting_build(cls, *args):
+            if len(args) > 1 and isinstance(args[0], LambdaValue):
+                beta["lambda"] += 1
+            return build(cls, *args)
+        self._patch(AppValue, "build", classmethod(counting_build))
+
+        builtins = self.counters["builtin calls"]
+        for cls in _subclasses(Builtin):
+            # builtin functions evaluate to an instance of a class of their
+            # own, that calls `_call` once all the arguments are applied
+            value = cls.__dict__.get("_eval")
+            if not hasattr(value, "_call"):
+                continue
+            fn_class = type(value)
+            self._patch(
+                fn_class, "__call__",
+                _counting_call(fn_class.__dict__["__call__"], builtins, cls._cbor_idx))
+
+    def _uninstall(self):
+        while self._patched:
+            owner, name, orig = self._patched.pop()
+            setattr(owner, name, orig)
+
+    def as_dict(self):
+        return {
+            "phases": {
+                k: {"seconds": v, "calls": self.phase_calls[k]}
+                for k, v in self.phases.items()},
+            "counters": {k: dict(v) for k, v in self.counters.items()},
+        }
+
+    def summary(self, top=10):
+        "Return a human readable report"
+        lines = ["phase            calls    seconds"]
+        for name, seconds in sorted(self.phases.items(), key=lambda i: -i[1]):
+            lines.append(f"{name:<16} {self.phase_calls[name]:>5} {seconds:>10.4f}")
+        for counter, values in sorted(self.counters.items()):
+            lines.append("")
+            lines.append(f"{counter} (total {sum(values.values())})")
+            for key, n in values.most_common(top):
+                lines.append(f"  {key:<30} {n:>10}")
+        return "\n".join(lines)
+
+
+def _counting_eval(orig, counter):
+    @wraps(orig)
+    def eval(self, env=None):
+        counter[self.__class__.__name__] += 1
+        return orig(self, env)
+    return eval
+
+
+def _counting_call(orig, counter, name):
+    @wraps(orig)
+    def __call__(self, x):
+        if len(self.args) + 1 >= self.arrity:
+            counter[name] += 1
+        return orig(self, x)
+    return __call__
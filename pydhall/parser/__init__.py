@@ -1,15 +1,35 @@
 import pydhall.core.builtins
 from .base import Dhall
+from .cache import ParseCache
 from .exceptions import DhallParseError
+from .spans import SpanTable, parse_with_spans
 
 from fastidious.parser_base import ParserError
 
+
+PARSE_CACHE = None
+
+
+def set_parse_cache(cache):
+    "Cache the parse results in `cache` (a ParseCache), or disable it with None"
+    global PARSE_CACHE
+    PARSE_CACHE = cache
+
+
 def parse(src):
+    cache = PARSE_CACHE
+    if cache is not None:
+        term = cache.get(src)
+        if term is not None:
+            return term
     try:
-        return Dhall.p_parse(src)
+        term = Dhall.p_parse(src)
     except ParserError as e:
         e.__class__ = DhallParseError
         raise e
+    if cache is not None:
+        cache.put(src, term)
+    return term
 
 
 def parse_file(path):
@@ -2,6 +2,7 @@ from pathlib import Path
 from urllib.parse import urlparse
 from ipaddress import IPv6Address
 from io import StringIO
+import re
 import unicodedata
 
 from fastidious import Parser
@@ -53,6 +54,22 @@ from pydhall.core import (
 )
 
 
+# Character ranges of ValidNonAscii, for use in the regular expressions of
+# the grammar that consume runs of characters in one step.
+_NON_ASCII_RANGES = (
+    r"\\u0080-\\uD7FF\\uE000-\\uFFFD"
+    + "".join(
+        r"\\U000{0:X}0000-\\U000{0:X}FFFD".format(plane) for plane in range(1, 16)))
+
+
+def _common_prefix(a, b):
+    i = 0
+    n = min(len(a), len(b))
+    while i < n and a[i] == b[i]:
+        i += 1
+    return a[:i]
+
+
 class Dhall(Parser):
     # p_compiler = FastidiousCompiler(gen_code=False)
     __grammar__ = r"""
@@ -80,16 +97,25 @@ class Dhall(Parser):
         / "\t"
         / EOL
 
+    # a run of BlockCommentChar
+    BlockCommentChars <-
+        ~"(?:[\\x20-\\x2c\\x2e-\\x7a\\x7c-\\x7f\\t\\nNON_ASCII]|\\r\\n|-(?!\\})|\\{(?!-))+"
+
     BlockCommentContinue <-
           "-}"
         / BlockComment BlockCommentContinue
-        / BlockCommentChar+ BlockCommentContinue
+        / BlockCommentChars BlockCommentContinue
 
     NotEOL <- [\x20-\x7f\t] / ValidNonAscii
 
-    LineComment <- "--" content:(NotEOL*) EOL
+    # a run of NotEOL
+    NotEOLs <- ~"[\\x20-\\x7f\\tNON_ASCII]*"
 
-    WhitespaceChunk <- " " / "\t" / EOL / LineComment / BlockComment
+    LineComment <- "--" content:NotEOLs EOL
+
+    Blanks <- ~"(?:[ \\t\\n]|\\r\\n)+"
+
+    WhitespaceChunk <- Blanks / LineComment / BlockComment
 
     _ <- WhitespaceChunk*
 
@@ -102,13 +128,13 @@ class Dhall(Parser):
     SimpleLabelFirstChar <- [A-Za-z_]
     SimpleLabelNextChar <- [A-Za-z0-9_/-]
 
+    # SimpleLabelFirstChar SimpleLabelNextChar*, but not a Keyword. A label
+    # may start with a keyword (e.g. `iffy`)
     SimpleLabel <-
-        Keyword SimpleLabelNextChar+
-        / !Keyword SimpleLabelFirstChar SimpleLabelNextChar*
-        { p_flatten }
+        ~"(?!(?:if|then|else|let|in|using|missing|assert|as|Infinity|NaN|merge|Some|toMap|forall|with)(?![A-Za-z0-9_/-]))[A-Za-z_][A-Za-z0-9_/-]*"
 
     QuotedLabelChar <- ~"[\\x20-\\x5f\\x61-\\x7e]"
-    QuotedLabel <- QuotedLabelChar* { p_flatten }
+    QuotedLabel <- ~"[\\x20-\\x5f\\x61-\\x7e]*"
 
     Label <- "`" label:QuotedLabel "`" / label:SimpleLabel { @label }
 
@@ -124,6 +150,7 @@ class Dhall(Parser):
     DoubleQuoteChunk <-
          e:Interpolation
        / '\\' e:DoubleQuoteEscaped
+       / e:DoubleQuoteChars
        / e:DoubleQuoteChar
        { @e }
 
@@ -149,6 +176,10 @@ class Dhall(Parser):
        / ~"[\\x5d-\\x7f]"
        / ValidNonAscii
 
+    # a run of DoubleQuoteChar that stops before interpolations
+    DoubleQuoteChars <-
+        ~"(?:[\\x20-\\x21\\x23\\x25-\\x5b\\x5d-\\x7fNON_ASCII]|\\$(?!\\{))+"
+
 
     DoubleQuoteLiteral ← '"' chunks:DoubleQuoteChunk* '"' { on_DoubleQuoteLiteral }
 
@@ -157,6 +188,7 @@ class Dhall(Parser):
         / EscapedQuotePair SingleQuoteContinue
         / EscapedInterpolation SingleQuoteContinue
         / "''"
+        / SingleQuoteChars SingleQuoteContinue
         / SingleQuoteChar SingleQuoteContinue
 
     EscapedQuotePair <- "'''" { ;"''" }
@@ -169,6 +201,11 @@ class Dhall(Parser):
        / EOL
        / ValidNonAscii
 
+    # a run of SingleQuoteChar that stops before interpolations and quote
+    # pairs
+    SingleQuoteChars <-
+        ~"(?:[\\x20-\\x23\\x25-\\x26\\x28-\\x7f\\t\\nNON_ASCII]|\\r\\n|\\$(?!\\{)|'(?!'))+"
+
     SingleQuoteLiteral ← "''" EOL content:SingleQuoteContinue { on_SingleQuoteLiteral }
 
     Interpolation ← "${" e:CompleteExpression "}" { @e }
@@ -251,7 +288,7 @@ class Dhall(Parser):
 
     Exponent ← "e"i [+-]? Digit+
 
-    NumericDoubleLiteral ← [+-]? Digit+ ( "." Digit+ Exponent? / Exponent)
+    NumericDoubleLiteral ← ~"[+-]?[0-9]+(?:\\.[0-9]+(?:[eE][+-]?[0-9]+)?|[eE][+-]?[0-9]+)"
 
     DoubleLiteral ← num:NumericDoubleLiteral
       / minf:("-" Infinity)
@@ -259,9 +296,9 @@ class Dhall(Parser):
       / nan:NaN { on_DoubleLiteral }
 
     NaturalLiteral ← HexLiteral / DecLiteral / BannedDecLiteral / Zero
-    HexLiteral <- "0x" v:(HexDig+)
-    DecLiteral <- [1-9] Digit*
-    BannedDecLiteral <- '0' Digit+
+    HexLiteral <- "0x" v:~"[0-9a-fA-F]+"
+    DecLiteral <- ~"[1-9][0-9]*"
+    BannedDecLiteral <- ~"0[0-9]+"
     Zero <- '0'
 
     IntegerLiteral ←
@@ -292,9 +329,13 @@ class Dhall(Parser):
        / ~"[\x30-\x7f]"
        / ValidNonAscii
 
-    UnquotedPathComponent <- PathCharacter+ { p_flatten }
+    # PathCharacter+
+    UnquotedPathComponent <-
+        ~"[\\x21\\x24-\\x27\\x2a-\\x2b\\x2d-\\x2e\\x30-\\x3b\\x3d\\x40-\\x5a\\x5e-\\x7a\\x7c\\x7e]+"
 
-    QuotedPathComponent <- QuotedPathCharacter+ { on_QuotedPathComponent }
+    # QuotedPathCharacter+
+    QuotedPathComponent <-
+        ~"[\\x20-\\x21\\x23-\\x2e\\x30-\\x7fNON_ASCII]+" { on_QuotedPathComponent }
 
     PathComponent <- '/' c:UnquotedPathComponent
                   / '/' '"' c:QuotedPathComponent '"' { @c }
@@ -527,11 +568,16 @@ class Dhall(Parser):
     PythonClassPath <- mod:PythonModule "::" obj:PythonIdentifier
     PythonModule <- PythonIdentifier ("." PythonIdentifier)* { p_flatten }
     PythonIdentifier <- [_a-zA-Z][_a-zA-Z0-9]* { p_flatten }
-    """
+    """.replace("NON_ASCII", _NON_ASCII_RANGES)
+
+    # returns the packrat memo table of a new parser, see pydhall.parser.memo
+    memo_table = dict
 
     def __init__(self, *args, name="<string>", **kwargs):
         self.name = name
         super().__init__(*args, **kwargs)
+        if self.memo_table is not dict:
+            self._p_memoized = self.memo_table()
 
     def emit(self, node, *args):
         return node(*args)
@@ -595,6 +641,9 @@ class Dhall(Parser):
     def on_EscapedInterpolation(self, _):
         return "${"
 
+    def on_SingleQuoteChars(self, value):
+        return value.replace("\r\n", "\n")
+
     def on_IfExpression(self, _, cond, t, f):
         return self.emit(If, cond, t, f)
 
@@ -647,48 +696,67 @@ class Dhall(Parser):
         chunks, suffix = self.built_text_literal(chunks)
         return self.emit(TextLit, [Chunk(*c) for c in chunks], suffix)
 
+    _leading_whitespace = re.compile(r"[ \t]*")
+
     def _flatten_single_quote(self, lst):
-        lst = self.p_flatten_list(lst)
-        string = ""
-        for item in lst:
+        """
+        Return the indentation of a single quote literal and its content as
+        a list alternating strings and interpolated terms.
+
+        The indentation is the longest common prefix of the leading
+        whitespace of the lines, ignoring the empty lines but not the last
+        one. The content is read once, so this is linear in the size of the
+        literal.
+        """
+        items = []
+        text = []
+        # the last item is the closing "''"
+        for item in self.p_flatten_list(lst)[:-1]:
             if isinstance(item, str):
-                string += item
+                text.append(item)
             else:
-                string += "|"
-        lines = string.splitlines()
-
-        def get_line_indent(l):
-            li = ""
-            for c in l:
-                if c in " \t":
-                    li += c
-                else:
+                items.append("".join(text))
+                items.append(item)
+                text = []
+        items.append("".join(text))
+
+        indent = None
+        prefix = ""  # leading whitespace of the current line
+        leading = True  # still in the leading whitespace of the line
+        empty = True
+        for item in items:
+            if not isinstance(item, str):
+                leading = empty = False
+                continue
+            pos = 0
+            while True:
+                eol = item.find("\n", pos)
+                end = len(item) if eol == -1 else eol
+                if leading and pos < end:
+                    ws_end = self._leading_whitespace.match(item, pos, end).end()
+                    prefix += item[pos:ws_end]
+                    empty = False
+                    leading = ws_end == end
+                if eol == -1:
                     break
-            return li
-
-        indent = get_line_indent(lines[-1])
-        for l in lines:
-            li = get_line_indent(l)
-            if li and indent.startswith(li):
-                indent = li
-        return indent, lst[:-1]
+                if not empty:
+                    indent = prefix if indent is None else _common_prefix(indent, prefix)
+                prefix, leading, empty = "", True, True
+                pos = eol + 1
+        indent = prefix if indent is None else _common_prefix(indent, prefix)
+        return indent, items
 
     def on_SingleQuoteLiteral(self, _, content):
-        indent, content = self._flatten_single_quote(content)
-        chunks, suffix = self.built_text_literal(content)
-        if chunks:
-            if chunks[0][0].startswith(indent):
-                chunks[0] = (chunks[0][0].replace(indent, "", 1), chunks[0][1])
-        else:
-            if suffix.startswith(indent):
-                suffix = suffix.replace(indent, "", 1)
-        # print(chunks, suffix)
+        indent, items = self._flatten_single_quote(content)
         if indent:
-            chunks = [Chunk(c[0].replace("\n"+indent, "\n"), c[1]) for c in chunks]
-            suffix = suffix.replace("\n"+indent, "\n")
-        else:
-            chunks = [Chunk(*c) for c in chunks]
-        return self.emit(TextLit, chunks, suffix)
+            # every non-empty line starts with the indentation
+            if items[0].startswith(indent):
+                items[0] = items[0][len(indent):]
+            newline_indent = "\n" + indent
+            for i in range(0, len(items), 2):
+                items[i] = items[i].replace(newline_indent, "\n")
+        chunks = [Chunk(items[i], items[i + 1]) for i in range(0, len(items) - 1, 2)]
+        return self.emit(TextLit, chunks, items[-1])
 
     def on_NumericDoubleLiteral(self, val):
         val = float(self.p_flatten(val))
@@ -812,8 +880,7 @@ class Dhall(Parser):
     def on_ApplicationExpression(self, _, f, rest):
         if not rest:
             return f
-        node = App.build(f, *[r[1] for r in rest])
-        return node
+        return self.emit(App.build, f, *[r[1] for r in rest])
 
     def on_NonEmptyList(self, _, first, rest):
         return self.emit(NonEmptyList, [first] + rest)
@@ -836,14 +903,14 @@ class Dhall(Parser):
         return self.emit(RecordType, content)
 
     def on_NonEmptyRecordLiteral(self, _, first, rest):
-        content = first
+        content = dict(first)
         for f in rest:
             for k, v in f.items():
                 if k in content:
                     content[k] = RecordMergeOp(content[k], v)
                 else:
                     content[k] = v
-        return content
+        return self.emit(RecordLit, content)
 
     def on_RecordLiteralEntry(self, _, name, val):
         if isinstance(val, str) and val == "":
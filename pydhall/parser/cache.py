@@ -0,0 +1,115 @@
+"""
+On-disk cache of parsed expressions.
+
+Entries are keyed by the SHA-256 of the source text and of the parser
+module, and hold the binary encoding of the parsed, unresolved,
+expression. Changing the grammar or its actions invalidates every entry.
+
+The spans of the terms parsed by `parse_with_spans` are kept next to the
+entry, in a `.spans` file.
+
+Sources with a `using` clause are not cached: the binary encoding of an
+unresolved remote import doesn't hold its headers.
+"""
+import os
+import re
+from hashlib import sha256
+from pathlib import Path
+
+import cbor2
+
+from pydhall.core.base import Term
+from pydhall import instrument
+
+
+_PARSER_VERSION = None
+
+
+def parser_version():
+    "Return a hash of the parser source"
+    global _PARSER_VERSION
+    if _PARSER_VERSION is None:
+        source = Path(__file__).with_name("base.py").read_bytes()
+        _PARSER_VERSION = sha256(source).hexdigest()
+    return _PARSER_VERSION
+
+
+_USING = re.compile(r"\busing\b")
+
+
+def get_cache_root():
+    path = os.environ.get("XDG_CACHE_HOME", None)
+    if path is None:
+        return Path.home().joinpath(".cache/pydhall/parse")
+    return Path(path).joinpath("pydhall/parse")
+
+
+class ParseCache():
+    def __init__(self, root=None):
+        self.root = Path(root) if root is not None else get_cache_root()
+
+    def key(self, src):
+        h = sha256(parser_version().encode("ascii"))
+        h.update(src.encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, src):
+        "Return the parsed expression of `src`, or None if it's not cached"
+        path = self.root.joinpath(self.key(src))
+        try:
+            with open(path, "rb") as f:
+                term = Term.from_cbor(f.read())
+        except FileNotFoundError:
+            term = None
+        except Exception:
+            # a corrupted entry is a miss, it's overwritten by `put`
+            term = None
+        instrument.cache_lookup(self.__class__.__name__, term is not None)
+        return term
+
+    def get_with_spans(self, src):
+        """
+        Return the parsed expression of `src` and its SpanTable, or None if
+        they are not cached.
+        """
+        from .spans import SpanTable
+        term = self.get(src)
+        if term is None:
+            return None
+        try:
+            entries = cbor2.loads(
+                self.root.joinpath(self.key(src) + ".spans").read_bytes())
+        except Exception:
+            return None
+        table = SpanTable.from_entries(src, term, entries)
+        if table is None:
+            return None
+        return term, table
+
+    def put(self, src, term, spans=None):
+        """
+        Cache `term`, the parsed expression of `src`, and its SpanTable
+        `spans` if given. Return False if it can't be cached.
+        """
+        if _USING.search(src):
+            return False
+        try:
+            encoded = term.cbor()
+            if spans is not None:
+                encoded_spans = cbor2.dumps(spans.entries(term))
+        except Exception:
+            # not every term has a binary encoding yet
+            return False
+        key = self.key(src)
+        self._write(key, encoded)
+        if spans is not None:
+            self._write(key + ".spans", encoded_spans)
+        return True
+
+    def _write(self, name, data):
+        path = self.root.joinpath(name)
+        os.makedirs(self.root, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
@@ -0,0 +1,211 @@
+"""
+Incremental parsing of dhall documents, for editors.
+
+A `Document` splits its source into segments: the top level `let`
+bindings, and the entries of the top level record literal (or the whole
+body if it's not a record literal). An edit that falls inside a single
+segment only reparses that segment, and the terms of the other segments
+are reused in the new document:
+
+    doc = Document(src)
+    doc = doc.edit(start, end, "replacement")
+    doc.term
+
+Other edits, and edits that change the extent of their segment, reparse
+the whole document.
+
+The spans of the terms of each segment are recorded when it's parsed, and
+`doc.spans` is the SpanTable of the whole document.
+"""
+from pydhall.core import Let, RecordLit, RecordMergeOp
+from .base import Dhall
+from .spans import SpanTable, _preorder, _track_spans, parse_with_spans
+
+
+class Segment():
+    """
+    A span of the source, [start, end), parsed by the parser rule `rule`.
+    `spans` holds the (term, start, end) of the terms of the segment, with
+    offsets relative to its start.
+    """
+    __slots__ = ["rule", "start", "end", "term", "spans"]
+
+    def __init__(self, rule, start, end, term, spans=()):
+        self.rule = rule
+        self.start = start
+        self.end = end
+        self.term = term
+        self.spans = spans
+
+    def shift(self, delta):
+        if not delta:
+            return self
+        return Segment(
+            self.rule, self.start + delta, self.end + delta, self.term, self.spans)
+
+    def __repr__(self):
+        return f"Segment({self.rule}, {self.start}, {self.end})"
+
+
+def _parser(src):
+    "Return a parser of `src` recording the spans of its terms"
+    parser = Dhall(src)
+    table = SpanTable(src)
+    _track_spans(parser, table)
+    return parser, table
+
+
+def _segment(table, rule, start, end, term):
+    "Return the segment of `term`, with its spans found in `table`"
+    spans = []
+    for node in _preorder(term):
+        span = table.get(node)
+        if span is not None:
+            spans.append((node, span[0] - start, span[1] - start))
+    return Segment(rule, start, end, term, spans)
+
+
+def _match(parser, rule):
+    "Run `rule` at the parser position, restore the position on failure"
+    start = parser.pos
+    result = getattr(parser, rule)()
+    if result is parser.NoMatch:
+        parser.pos = start
+    return result
+
+
+def _record_entries(src, start):
+    """
+    Return the segments of the entries of the record literal at `start`, if
+    it's the whole remaining expression. Otherwise, return None.
+    """
+    if not src.startswith("{", start):
+        return None
+    parser, table = _parser(src)
+    parser.pos = start + 1
+    parser._()
+    if src.startswith(",", parser.pos):
+        parser.pos += 1
+        parser._()
+    entries = []
+    while True:
+        start = parser.pos
+        entry = _match(parser, "RecordLiteralEntry")
+        if entry is parser.NoMatch:
+            break
+        entries.append(_segment(table, "RecordLiteralEntry", start, parser.pos, entry))
+        parser._()
+        if not src.startswith(",", parser.pos):
+            break
+        parser.pos += 1
+        parser._()
+    if not entries or not src.startswith("}", parser.pos):
+        return None
+    parser.pos += 1
+    parser._()
+    if parser.pos != len(src):
+        return None
+    return entries
+
+
+class Document():
+    def __init__(self, src, _segments=None):
+        self.src = src
+        if _segments is None:
+            _segments = self._parse_segments(src)
+        # top level let bindings, then the body, or the body entries if the
+        # body is a record literal
+        self.segments = _segments
+        self.term = self._build_term()
+
+    def _parse_segments(self, src):
+        parser, table = _parser(src)
+        parser._()
+        segments = []
+        while True:
+            start = parser.pos
+            binding = _match(parser, "LetBinding")
+            if binding is parser.NoMatch:
+                break
+            segments.append(_segment(table, "LetBinding", start, parser.pos, binding))
+        if segments and (
+                _match(parser, "In") is parser.NoMatch
+                or _match(parser, "_1") is parser.NoMatch):
+            return self._single_segment(src)
+        start = parser.pos
+        entries = _record_entries(src, start)
+        if entries is not None:
+            return segments + entries
+        body = _match(parser, "Expression")
+        end = parser.pos
+        parser._()
+        if body is parser.NoMatch or parser.pos != len(src):
+            return self._single_segment(src)
+        segments.append(_segment(table, "Expression", start, end, body))
+        return segments
+
+    def _single_segment(self, src):
+        # raises the parse error if the source is invalid
+        term, table = parse_with_spans(src)
+        return [_segment(table, "DhallFile", 0, len(src), term)]
+
+    def _build_term(self):
+        bindings = [s.term for s in self.segments if s.rule == "LetBinding"]
+        body = [s for s in self.segments if s.rule != "LetBinding"]
+        if body[0].rule != "RecordLiteralEntry":
+            term = body[0].term
+        else:
+            # same as Dhall.on_NonEmptyRecordLiteral
+            content = {}
+            for entry in body:
+                for k, v in entry.term.items():
+                    if k in content:
+                        content[k] = RecordMergeOp(content[k], v)
+                    else:
+                        content[k] = v
+            term = RecordLit(content)
+        if bindings:
+            term = Let(bindings, term)
+        return term
+
+    @property
+    def spans(self):
+        "Return the SpanTable of the terms of the document"
+        table = SpanTable(self.src)
+        for segment in self.segments:
+            for term, start, end in segment.spans:
+                table.add(term, segment.start + start, segment.start + end)
+        # the top level let or record literal is built from the segments
+        table.add(self.term, self.segments[0].start, self.segments[-1].end)
+        return table
+
+    def segment_at(self, offset):
+        "Return the segment containing the source offset, or None"
+        for segment in self.segments:
+            if segment.start <= offset < segment.end:
+                return segment
+        return None
+
+    def edit(self, start, end, replacement):
+        """
+        Return a new document, where the source between the offsets `start`
+        and `end` is replaced by `replacement`.
+        """
+        src = self.src[:start] + replacement + self.src[end:]
+        delta = len(replacement) - (end - start)
+        for i, segment in enumerate(self.segments):
+            # the end of the previous segment may depend on the first
+            # characters of this one, so its start must be left unchanged
+            if segment.start < start and end <= segment.end:
+                break
+        else:
+            return Document(src)
+        parser, table = _parser(src)
+        parser.pos = segment.start
+        term = _match(parser, segment.rule)
+        if term is parser.NoMatch or parser.pos != segment.end + delta:
+            return Document(src)
+        segments = self.segments[:i]
+        segments.append(_segment(table, segment.rule, segment.start, parser.pos, term))
+        segments.extend(s.shift(delta) for s in self.segments[i + 1:])
+        return Document(src, segments)
@@ -0,0 +1,163 @@
+"""
+Memoization policies of the packrat parser.
+
+The generated parser memoizes the result of every rule call in
+`parser._p_memoized`, a dict keyed by `(hash(rule name), position)`. On
+large inputs this table holds an entry for every rule tried at every
+position. The tables defined here replace it:
+
+- `SelectiveMemo(rules)` only memoizes the named rules, e.g. the ones that
+  are tried more than once at the same position (see `backtracking_rules`)
+- `WindowMemo(window)` forgets the entries more than `window` characters
+  behind the furthest position reached: the parser rarely backtracks that
+  far, and when it does the rule is parsed again.
+- `MemoStats()` memoizes everything and counts lookups and hits per rule.
+
+Forgetting an entry never changes the result of a parse, only its speed.
+
+    set_memo_policy(partial(WindowMemo, 1 << 16))
+    Dhall.p_parse(src)
+
+    print(memo_report(src).summary())
+"""
+import sys
+from collections import Counter
+from inspect import isfunction
+
+from .base import Dhall
+
+
+_RULE_KEYS = None
+
+
+def _rule_names():
+    "Return the rule names, indexed by their memo key"
+    global _RULE_KEYS
+    if _RULE_KEYS is None:
+        _RULE_KEYS = {
+            hash(name): name for name in dir(Dhall)
+            if name[0].isupper() and isfunction(getattr(Dhall, name, None))}
+    return _RULE_KEYS
+
+
+class SelectiveMemo(dict):
+    "Only memoize the results of `rules`"
+
+    def __init__(self, rules):
+        super().__init__()
+        self.rule_keys = frozenset(hash(name) for name in rules)
+
+    def __setitem__(self, key, value):
+        if key[0] in self.rule_keys:
+            dict.__setitem__(self, key, value)
+
+
+class WindowMemo(dict):
+    "Forget the entries more than `window` characters behind the parser"
+
+    def __init__(self, window=1 << 16):
+        super().__init__()
+        self.window = window
+        self.high = 0
+        self.evicted = 0
+        # position -> keys of the entries at that position
+        self._keys = {}
+        # the entries before this position are forgotten
+        self._low = 0
+
+    def __setitem__(self, key, value):
+        pos = key[1]
+        if pos < self._low:
+            # already behind the window
+            self.evicted += 1
+            return
+        if key not in self:
+            self._keys.setdefault(pos, []).append(key)
+        dict.__setitem__(self, key, value)
+        if pos > self.high:
+            self.high = pos
+            self.purge()
+
+    def purge(self):
+        "Remove the entries behind the window"
+        limit = self.high - self.window
+        keys = self._keys
+        # positions are scanned once: purging is linear in the input size
+        while self._low < limit:
+            for key in keys.pop(self._low, ()):
+                del self[key]
+                self.evicted += 1
+            self._low += 1
+
+
+class MemoStats(dict):
+    "Memoize everything, count lookups and hits per rule"
+
+    def __init__(self):
+        super().__init__()
+        self.lookups = Counter()
+        self.hits = Counter()
+
+    def __contains__(self, key):
+        self.lookups[key[0]] += 1
+        return dict.__contains__(self, key)
+
+    def __getitem__(self, key):
+        self.hits[key[0]] += 1
+        return dict.__getitem__(self, key)
+
+    def report(self):
+        """
+        Return a list of dicts with the rule name, lookups, hits and entries
+        of each rule, most entries first.
+        """
+        names = _rule_names()
+        entries = Counter(key[0] for key in self)
+        result = []
+        for key, lookups in self.lookups.items():
+            result.append({
+                "rule": names.get(key, str(key)),
+                "lookups": lookups,
+                "hits": self.hits[key],
+                "entries": entries[key],
+            })
+        result.sort(key=lambda r: (-r["entries"], r["rule"]))
+        return result
+
+    def summary(self, top=20):
+        "Return a human readable report"
+        report = self.report()
+        lookups = sum(r["lookups"] for r in report)
+        hits = sum(r["hits"] for r in report)
+        lines = [
+            f"memo entries: {len(self)} ({sys.getsizeof(self)} bytes for the "
+            f"table), hit rate: {hits / lookups if lookups else 0:.1%}",
+            "rule                              entries    lookups       hits",
+        ]
+        for r in report[:top]:
+            lines.append(
+                f"{r['rule']:<30} {r['entries']:>10} {r['lookups']:>10} {r['hits']:>10}")
+        return "\n".join(lines)
+
+
+def backtracking_rules(table):
+    "Return the names of the rules with memo hits in `table`, a MemoStats"
+    return sorted(r["rule"] for r in table.report() if r["hits"])
+
+
+def set_memo_policy(factory):
+    """
+    Use the tables returned by `factory()` as the memo table of the new
+    parsers. With None, memoize everything (the default).
+    """
+    Dhall.memo_table = staticmethod(factory) if factory is not None else dict
+
+
+def memo_report(src):
+    "Parse `src` and return the MemoStats of the parse"
+    parser = Dhall(src)
+    table = parser._p_memoized = MemoStats()
+    if parser.DhallFile() is parser.NoMatch:
+        # raise the parse error
+        Dhall.p_parse(src)
+    return table
@@ -0,0 +1,255 @@
+"""
+Source spans of parsed terms.
+
+Spans are only tracked when asked for, by `parse_with_spans`. They are kept
+in a `SpanTable` next to the expression, not in the terms: they don't take
+part in the equality, the hash or the binary encoding of the terms, and the
+default parser pays nothing for them.
+
+    term, spans = parse_with_spans(src)
+    spans.get(term.body)                # (start, end) offsets
+    spans.line_col(start)               # (line, column), 1-based
+"""
+from bisect import bisect_right
+from inspect import isfunction
+
+from fastidious.parser_base import ParserError
+
+from pydhall.core.base import Node, Op
+from .base import Dhall
+from .exceptions import DhallParseError
+
+
+class SpanTable():
+    "Map terms to the [start, end) offsets of their source"
+
+    def __init__(self, src):
+        self.src = src
+        # id(term) -> (term, start, end). The term is kept alive so that its
+        # id is not reused.
+        self._spans = {}
+        self._line_starts = None
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __contains__(self, term):
+        return id(term) in self._spans
+
+    def add(self, term, start, end):
+        # the first span wins for terms that are emitted more than once
+        self._spans.setdefault(id(term), (term, start, end))
+
+    def get(self, term):
+        "Return the (start, end) offsets of `term`, or None"
+        entry = self._spans.get(id(term))
+        if entry is None:
+            return None
+        return entry[1], entry[2]
+
+    def text(self, term):
+        "Return the source text of `term`, or None"
+        span = self.get(term)
+        if span is None:
+            return None
+        return self.src[span[0]:span[1]]
+
+    def line_col(self, offset):
+        "Return the 1-based line and column of the source offset"
+        if self._line_starts is None:
+            starts = [0]
+            pos = self.src.find("\n")
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = self.src.find("\n", pos + 1)
+            self._line_starts = starts
+        line = bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1] + 1
+
+    def transfer(self, old, new):
+        """
+        Give the terms of `new` the spans of the matching terms of `old`.
+
+        `new` is a copy of `old` with some subterms replaced, as returned by
+        `old.resolve()`: a replaced subterm (e.g. a resolved import) gets the
+        span of the term it replaces, its own subterms get none.
+        """
+        stack = [(old, new)]
+        while stack:
+            old, new = stack.pop()
+            entry = self._spans.get(id(old))
+            if entry is not None and old is not new:
+                self.add(new, entry[1], entry[2])
+            if old.__class__ is not new.__class__:
+                continue
+            old_children = _children(old)
+            new_children = _children(new)
+            if len(old_children) == len(new_children):
+                stack.extend(zip(old_children, new_children))
+
+    def error_term(self, exc):
+        """
+        Return the innermost term with a span whose `type` method was running
+        when `exc` was raised, or None.
+
+        Type checking substitutes the variables of binders, which copies the
+        bodies of `let`s and functions: an error under a binder is located
+        at the binder.
+        """
+        found = None
+        tb = exc.__traceback__
+        while tb is not None:
+            frame = tb.tb_frame
+            if frame.f_code.co_name == "type":
+                term = frame.f_locals.get("self")
+                if term is not None and id(term) in self._spans:
+                    found = term
+            tb = tb.tb_next
+        return found
+
+    def entries(self, term):
+        """
+        Return the spans of the nodes of `term` as a list of
+        [class name, start, end] (or [class name] without a span), in
+        preorder.
+        """
+        result = []
+        for node in _preorder(term):
+            entry = self._spans.get(id(node))
+            if entry is None:
+                result.append([node.__class__.__name__])
+            else:
+                result.append([node.__class__.__name__, entry[1], entry[2]])
+        return result
+
+    @classmethod
+    def from_entries(cls, src, term, entries):
+        """
+        Return the SpanTable of `term`, a copy of the term whose spans are
+        `entries`, or None if `term` doesn't match the entries.
+        """
+        table = cls(src)
+        nodes = list(_preorder(term))
+        if len(nodes) != len(entries):
+            return None
+        for node, entry in zip(nodes, entries):
+            if node.__class__.__name__ != entry[0]:
+                return None
+            if len(entry) == 3:
+                table.add(node, entry[1], entry[2])
+        return table
+
+    def locate(self, exc, name="<string>"):
+        "Return 'name:line:column' of the term that raised `exc`, or None"
+        term = self.error_term(exc)
+        if term is None:
+            return None
+        line, col = self.line_col(self.get(term)[0])
+        return f"{name}:{line}:{col}"
+
+
+def _children(term):
+    if isinstance(term, dict):
+        values = term.values()
+    else:
+        values = [getattr(term, name) for name in getattr(term, "__slots__", ())]
+    result = []
+    for val in values:
+        if isinstance(val, Node):
+            result.append(val)
+        elif isinstance(val, list):
+            result.extend(i for i in val if isinstance(i, Node))
+    return result
+
+
+def _preorder(term):
+    "Yield the nodes of `term`, the fields of records in the order of their labels"
+    stack = [term]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, dict):
+            # the binary encoding sorts the fields
+            children = _children({k: node[k] for k in sorted(node)})
+        else:
+            children = _children(node)
+        stack.extend(reversed(children))
+
+
+_RULES = None
+
+
+def _rule_names():
+    global _RULES
+    if _RULES is None:
+        _RULES = [
+            name for name in dir(Dhall)
+            if name[0].isupper() and isfunction(getattr(Dhall, name, None))]
+    return _RULES
+
+
+def _track_spans(parser, table):
+    """
+    Make `parser` record the span of the terms its actions emit.
+
+    Each rule is wrapped in an instance attribute that pushes the position
+    where the rule starts: when an action emits a term, the top of the stack
+    is the start of the term.
+    """
+    starts = []
+    spans = table._spans
+    src = table.src
+
+    def wrap(rule):
+        def wrapper():
+            starts.append(parser.pos)
+            try:
+                return rule()
+            finally:
+                starts.pop()
+        return wrapper
+
+    for name in _rule_names():
+        setattr(parser, name, wrap(getattr(parser, name)))
+
+    def emit(node, *args):
+        term = node(*args)
+        start = starts[-1]
+        end = parser.pos
+        if isinstance(term, Op) and id(term.r) in spans:
+            # the operators of a chain are all emitted at the end of the
+            # chain
+            end = spans[id(term.r)][2]
+        while end > start and src[end - 1] in " \t\r\n":
+            end -= 1
+        table.add(term, start, end)
+        return term
+
+    parser.emit = emit
+
+
+def parse_with_spans(src):
+    """
+    Parse `src`, return the expression and its SpanTable. The parse cache is
+    used if the spans of the cached expression are cached too.
+    """
+    from pydhall import parser as _parser
+    cache = _parser.PARSE_CACHE
+    if cache is not None:
+        cached = cache.get_with_spans(src)
+        if cached is not None:
+            return cached
+    table = SpanTable(src)
+    parser = Dhall(src)
+    _track_spans(parser, table)
+    term = parser.DhallFile()
+    if term is parser.NoMatch:
+        # let the default parser raise the error
+        try:
+            term = Dhall.p_parse(src)
+        except ParserError as e:
+            e.__class__ = DhallParseError
+            raise e
+    if cache is not None:
+        cache.put(src, term, table)
+    return term, table
@@ -0,0 +1,286 @@
+"""
+Stream the elements of a huge top-level list or record literal.
+
+The source is read from a file object in chunks. A light scanner, that only
+knows about brackets, strings, comments and URL imports, finds the top-level
+separators and each element is parsed on its own: the memory used depends on
+the size of the largest element, not on the size of the file.
+
+    with open("data.dhall") as f:
+        for term in iter_list(f):
+            ...
+
+The top-level expression must be the list (or record) literal itself,
+surrounded by whitespace and comments only: an annotation or an operator
+applied to the literal can't be streamed.
+"""
+import re
+
+from fastidious.parser_base import ParserError
+
+from pydhall.core import Annot, RecordLit
+from .base import Dhall
+
+
+class DhallStreamError(Exception):
+    def __init__(self, message, index=None):
+        super().__init__(message)
+        self.message = message
+        # index of the offending element
+        self.index = index
+
+    def __str__(self):
+        if self.index is None:
+            return self.message
+        return f"element {self.index}: {self.message}"
+
+
+_WS = re.compile(r"[ \t\r\n]*")
+_CODE = re.compile(r"[^\[\]{}()\"'`,\-h]*")
+# a URL import runs to the next whitespace: its path and query may contain
+# commas, parentheses, quotes and dashes
+_URL = re.compile(r"https?://")
+_URL_END = re.compile(r"\s")
+_DOUBLE_QUOTE = re.compile(r'[^"\\$]*')
+_SINGLE_QUOTE = re.compile(r"[^'$]*")
+_BLOCK_COMMENT = re.compile(r"[^{\-]*")
+_SKIP = {'"': _DOUBLE_QUOTE, "''": _SINGLE_QUOTE, "{-": _BLOCK_COMMENT}
+_BLANK = re.compile(r"(?:\s+|--[^\n]*(?:\n|\Z)|\{-.*?-\})*\Z", re.S)
+
+_CLOSERS = {"[": "]", "{": "}", "(": ")"}
+
+
+class _Scanner():
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        # start of the element being scanned, the buffer is kept from there
+        self.mark = 0
+        self.eof = False
+
+    def fill(self):
+        "Read the next chunk, return False at end of file"
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.mark:] + chunk
+        self.pos -= self.mark
+        self.mark = 0
+        return True
+
+    def ensure(self, n):
+        "Try to have at least `n` characters after the position in the buffer"
+        while len(self.buf) - self.pos < n and not self.eof:
+            self.fill()
+
+    def skip_blank(self):
+        "Skip whitespace and comments, return the next character ('' at end of file)"
+        depth = 0
+        while True:
+            self.mark = self.pos
+            self.ensure(2)
+            buf, pos = self.buf, self.pos
+            if pos >= len(buf):
+                return ""
+            if depth:
+                end = _BLOCK_COMMENT.match(buf, pos).end()
+                if end > pos:
+                    self.pos = end
+                elif buf.startswith("{-", pos):
+                    depth += 1
+                    self.pos += 2
+                elif buf.startswith("-}", pos):
+                    depth -= 1
+                    self.pos += 2
+                else:
+                    self.pos += 1
+                continue
+            end = _WS.match(buf, pos).end()
+            if end > pos:
+                self.pos = end
+            elif buf.startswith("--", pos):
+                end = buf.find("\n", pos)
+                while end == -1:
+                    # the rest of the buffer is in the comment
+                    self.pos = self.mark = len(self.buf)
+                    if not self.fill():
+                        return ""
+                    end = self.buf.find("\n")
+                self.pos = end + 1
+            elif buf.startswith("{-", pos):
+                depth = 1
+                self.pos += 2
+            else:
+                return buf[pos]
+
+    def next_element(self, closer):
+        """
+        Return the source of the next element and the top-level character
+        that ends it: ',' or `closer`.
+        """
+        self.mark = self.pos
+        stack = []
+        while True:
+            buf = self.buf
+            top = stack[-1] if stack else None
+            pos = _SKIP.get(top, _CODE).match(buf, self.pos).end()
+            # the longest token is "https://"
+            if len(buf) - pos < 8 and not self.eof:
+                self.pos = pos
+                self.fill()
+                continue
+            if pos >= len(buf):
+                raise DhallStreamError(f"Unexpected end of file, expected '{closer}'")
+            c = buf[pos]
+            if top == '"':
+                if c == "\\":
+                    pos += 2
+                elif c == '"':
+                    stack.pop()
+                    pos += 1
+                elif buf.startswith("${", pos):
+                    stack.append("${")
+                    pos += 2
+                else:
+                    pos += 1
+            elif top == "''":
+                if buf.startswith("'''", pos):
+                    pos += 3
+                elif buf.startswith("''${", pos):
+                    pos += 4
+                elif buf.startswith("''", pos):
+                    stack.pop()
+                    pos += 2
+                elif buf.startswith("${", pos):
+                    stack.append("${")
+                    pos += 2
+                else:
+                    pos += 1
+            elif top == "{-":
+                if buf.startswith("{-", pos):
+                    stack.append("{-")
+                    pos += 2
+                elif buf.startswith("-}", pos):
+                    stack.pop()
+                    pos += 2
+                else:
+                    pos += 1
+            elif not stack and c in (",", closer):
+                self.pos = pos
+                return buf[self.mark:pos], c
+            elif c == "h" and _URL.match(buf, pos):
+                end = _URL_END.search(buf, pos)
+                if end is None:
+                    # wait for the end of the URL
+                    self.pos = pos
+                    if not self.fill():
+                        raise DhallStreamError(
+                            f"Unexpected end of file, expected '{closer}'")
+                    continue
+                pos = end.start()
+            elif buf.startswith("--", pos):
+                end = buf.find("\n", pos)
+                if end == -1:
+                    # wait for the end of the comment
+                    self.pos = pos
+                    if not self.fill():
+                        raise DhallStreamError(
+                            f"Unexpected end of file, expected '{closer}'")
+                    continue
+                pos = end + 1
+            elif c == "`":
+                end = buf.find("`", pos + 1)
+                if end == -1:
+                    self.pos = pos
+                    if not self.fill():
+                        raise DhallStreamError("Unterminated quoted label")
+                    continue
+                pos = end + 1
+            elif buf.startswith("{-", pos):
+                stack.append("{-")
+                pos += 2
+            elif c in _CLOSERS:
+                stack.append(_CLOSERS[c])
+                pos += 1
+            elif c in "]})":
+                if not stack or (c != top and not (c == "}" and top == "${")):
+                    raise DhallStreamError(f"Unbalanced '{c}'")
+                stack.pop()
+                pos += 1
+            elif c == '"':
+                stack.append('"')
+                pos += 1
+            elif buf.startswith("''", pos):
+                stack.append("''")
+                pos += 2
+            else:
+                pos += 1
+            self.pos = pos
+
+
+def _parse(src, index):
+    try:
+        return Dhall.p_parse(src)
+    except ParserError as e:
+        raise DhallStreamError(str(e), index) from e
+
+
+def _iter_sources(scanner, opener):
+    "Yield the source of the elements of the literal opened by `opener`"
+    if scanner.skip_blank() != opener:
+        raise DhallStreamError(f"Expected a literal starting with '{opener}'")
+    closer = _CLOSERS[opener]
+    scanner.pos += 1
+    index = 0
+    while True:
+        src, sep = scanner.next_element(closer)
+        scanner.pos += 1
+        # leading and trailing commas leave blank elements
+        if not _BLANK.match(src) or (sep == "," and index):
+            yield src
+            index += 1
+        if sep == closer:
+            break
+    if scanner.skip_blank() != "":
+        raise DhallStreamError(
+            f"Extra data after the '{closer}' of the top-level literal")
+
+
+def iter_list(fp, chunk_size=1 << 16):
+    "Yield the elements of the list literal read from `fp`, as terms"
+    scanner = _Scanner(fp, chunk_size)
+    for index, src in enumerate(_iter_sources(scanner, "[")):
+        yield _parse(src, index)
+
+
+def iter_record(fp, chunk_size=1 << 16):
+    """
+    Yield the (key, term) pairs of the record literal read from `fp`.
+
+    The entries are yielded as they are written: a key set more than once
+    (e.g. by `a.b = 1, a.c = 2`) is yielded once per entry.
+    """
+    scanner = _Scanner(fp, chunk_size)
+    for index, src in enumerate(_iter_sources(scanner, "{")):
+        record = _parse("{ " + src + " }", index)
+        if not isinstance(record, RecordLit):
+            raise DhallStreamError("Not a record literal entry", index)
+        yield from record.items()
+
+
+def iter_values(fp, type_, origin, chunk_size=1 << 16):
+    """
+    Yield the values of the elements of the list literal read from `fp`.
+
+    Each element is resolved relative to `origin`, type checked against
+    `type_` (the value of the element type) and evaluated before the next
+    one is read.
+    """
+    annotation = type_.quote()
+    for term in iter_list(fp, chunk_size):
+        term = term.resolve(origin)
+        Annot(term, annotation).type()
+        yield term.eval()
@@ -1,9 +1,11 @@
 #! /usr/bin/env python
 import gc
+import io
 import sys
 from timeit import repeat
 
 from pydhall.parser import Dhall
+from pydhall.parser.stream import iter_list
 
 def benchit(src, filename):
     NUMBER = 1
@@ -15,18 +17,67 @@ def benchit(src, filename):
                                number=NUMBER))
     seconds_each = total_seconds / NUMBER
 
-    kb = len(src) / 1024.0
+    mb = len(src) / (1024.0 * 1024.0)
 
-    print('%s: Took %.3fs to parse %.1fKB: %.0fKB/s' % (
-        filename, seconds_each, kb, kb / seconds_each))
+    print('%s: Took %.3fs to parse %.2fMB: %.2fMB/s' % (
+        filename, seconds_each, mb, mb / seconds_each))
     return seconds_each
 
+def benchstream(src, filename):
+    "Same as benchit, with the streaming list parser"
+    REPEAT = 5
+    gc.collect()
+    seconds = min(repeat(lambda: sum(1 for _ in iter_list(io.StringIO(src))),
+                         lambda: gc.enable(),
+                         repeat=REPEAT,
+                         number=1))
+    mb = len(src) / (1024.0 * 1024.0)
+    print('%s (streamed): Took %.3fs to parse %.2fMB: %.2fMB/s' % (
+        filename, seconds, mb, mb / seconds))
+    return seconds
+
 def _(input, expected):
     "dhall-lang/tests/parser/success/largeExpressionA.dhall"
     with open(input) as f:
         termA = Dhall.p_parse(f.read())
 
+
+GENERATED_RECORD = """\
+  , { -- generated entry {i}
+      name = "service-{i} with a rather long description, \\"quoted\\""
+    , port = {i}
+    , ratio = {i}.25e-3
+    , enabled = True
+    , path = ./services/service-{i}/config.dhall
+    , script =
+        ''
+        #!/bin/sh
+        echo "starting service {i}"
+        exec /usr/bin/service-{i} --port {i}
+        ''
+    }
+"""
+
+
+def generate_records(size):
+    "Generate a list of records of about `size` bytes"
+    entries = []
+    total = 0
+    i = 1
+    while total < size:
+        entry = GENERATED_RECORD.replace("{i}", str(i))
+        entries.append(entry)
+        total += len(entry)
+        i += 1
+    entries[0] = "[" + entries[0][3:]
+    return "{- generated -}\n" + "".join(entries) + "]\n"
+
+
 if __name__ == "__main__":
+    src = generate_records(1024 * 1024)
+    benchit(src, "generated records")
+    benchstream(src, "generated records")
+
     input = "dhall-lang/tests/parser/success/largeExpressionA.dhall"
     with open(input) as f:
         benchit(f.read(), input)
@@ -0,0 +1,71 @@
+import pytest
+
+from pydhall.parser import Dhall, ParseCache, parse, parse_with_spans, set_parse_cache
+
+
+SRC = r"""
+let f = \(x : Natural) -> { a = x, b = "${Natural/show x}" }
+in  f 1 // { c = ./other.dhall sha256:2b7b5b0e8b8d4d7c6e1d2c3f5a1e9c8b7a6f5e4d3c2b1a0f9e8d7c6b5a4f3e2d }
+"""
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ParseCache(tmp_path)
+    set_parse_cache(cache)
+    yield cache
+    set_parse_cache(None)
+
+
+def test_parse_cache(cache, monkeypatch):
+    expected = Dhall.p_parse(SRC)
+    assert cache.get(SRC) is None
+    assert parse(SRC).cbor() == expected.cbor()
+
+    def fail(src):
+        raise AssertionError("parsed again")
+    monkeypatch.setattr(Dhall, "p_parse", fail)
+    result = parse(SRC)
+    assert result.cbor() == expected.cbor()
+    assert result.sha256() == expected.sha256()
+
+
+def test_parse_cache_key(cache):
+    assert cache.key(SRC) == cache.key(SRC)
+    assert cache.key(SRC) != cache.key(SRC + " ")
+
+
+def test_corrupted_entry(cache):
+    cache.root.joinpath(cache.key("1")).write_bytes(b"\xff")
+    assert cache.get("1") is None
+    assert parse("1") == Dhall.p_parse("1")
+    assert cache.get("1") == Dhall.p_parse("1")
+
+
+def test_unencodable_term_is_not_cached(cache, monkeypatch):
+    term = Dhall.p_parse("1")
+
+    def fail():
+        raise ValueError("no encoding")
+    monkeypatch.setattr(term, "cbor", fail)
+    assert not cache.put("1", term)
+    assert cache.get("1") is None
+
+
+def test_using_is_not_cached(cache):
+    src = "https://example.com/a.dhall using ./headers.dhall"
+    assert not cache.put(src, Dhall.p_parse("1"))
+
+
+def test_spans_are_cached(cache, monkeypatch):
+    src = "let x = 1 + 2\nin  { a = x, b = [ True, False ] }\n"
+    term, spans = parse_with_spans(src)
+
+    def fail(src):
+        raise AssertionError("parsed again")
+    monkeypatch.setattr(Dhall, "DhallFile", fail)
+    cached, cached_spans = parse_with_spans(src)
+    assert cached == term
+    assert cached is not term
+    assert cached_spans.text(cached.body["b"]) == "[ True, False ]"
+    assert cached_spans.text(cached.bindings[0].value) == "1 + 2"
@@ -0,0 +1,94 @@
+import pytest
+
+from pydhall.parser import Dhall
+from pydhall.parser.exceptions import DhallParseError
+from pydhall.parser.incremental import Document
+
+
+LET_SRC = """\
+let a = 1
+let b = [ 1, 2, 3 ]
+let c = "c"
+in  { a, b, c }
+"""
+
+RECORD_SRC = """\
+{ a = 1
+, b = { x = True, y = False }
+, c = "text"
+}
+"""
+
+
+def _edit(src, old, new):
+    start = src.index(old)
+    return start, start + len(old), new
+
+
+def test_let_document():
+    doc = Document(LET_SRC)
+    assert [s.rule for s in doc.segments] == [
+        "LetBinding", "LetBinding", "LetBinding",
+        "RecordLiteralEntry", "RecordLiteralEntry", "RecordLiteralEntry"]
+    assert doc.term == Dhall.p_parse(LET_SRC)
+
+
+def test_edit_let_binding():
+    doc = Document(LET_SRC)
+    start, end, new = _edit(LET_SRC, "2, 3", "20, 30, 40")
+    new_doc = doc.edit(start, end, new)
+    assert new_doc.term == Dhall.p_parse(new_doc.src)
+    # only the edited binding was parsed again
+    assert new_doc.segments[0].term is doc.segments[0].term
+    assert new_doc.segments[1].term is not doc.segments[1].term
+    assert new_doc.segments[2].term is doc.segments[2].term
+    assert new_doc.segments[2].start == doc.segments[2].start + len(new) - 4
+
+
+def test_edit_record_entry():
+    doc = Document(RECORD_SRC)
+    assert [s.rule for s in doc.segments] == ["RecordLiteralEntry"] * 3
+    start, end, new = _edit(RECORD_SRC, "False", "True")
+    new_doc = doc.edit(start, end, new)
+    assert new_doc.term == Dhall.p_parse(new_doc.src)
+    assert new_doc.segments[0].term is doc.segments[0].term
+    assert new_doc.segments[2].term is doc.segments[2].term
+
+
+def test_duplicate_record_entries():
+    src = "{ a.b = 1, a.c = 2 }"
+    assert Document(src).term == Dhall.p_parse(src)
+
+
+@pytest.mark.parametrize("old,new", [
+    # changes the extent of the binding
+    ('= "c"', '= "c" let d = 1'),
+    # crosses two segments
+    ("3 ]\nlet c", "3 ] let d"),
+    # the body is not a record literal anymore
+    ("{ a, b, c }", "a"),
+])
+def test_full_reparse(old, new):
+    doc = Document(LET_SRC)
+    start, end, new = _edit(LET_SRC, old, new)
+    new_doc = doc.edit(start, end, new)
+    assert new_doc.term == Dhall.p_parse(new_doc.src)
+
+
+def test_spans():
+    doc = Document(RECORD_SRC)
+    start, end, new = _edit(RECORD_SRC, "False", "True")
+    new_doc = doc.edit(start, end, new)
+    spans = new_doc.spans
+    b = new_doc.term["b"]
+    assert spans.text(b) == "{ x = True, y = True }"
+    # the spans of the reused segments are shifted
+    assert spans.text(new_doc.term["c"]) == '"text"'
+    assert spans.line_col(spans.get(new_doc.term["c"])[0]) == (3, 7)
+
+
+def test_parse_error():
+    doc = Document(RECORD_SRC)
+    start, end, new = _edit(RECORD_SRC, "True", "True,")
+    with pytest.raises(DhallParseError):
+        doc.edit(start, end, new)
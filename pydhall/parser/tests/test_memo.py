@@ -0,0 +1,62 @@
+from functools import partial
+
+import pytest
+
+from pydhall.parser import Dhall
+from pydhall.parser.memo import (
+    MemoStats,
+    SelectiveMemo,
+    WindowMemo,
+    backtracking_rules,
+    memo_report,
+    set_memo_policy,
+)
+from pydhall.parser.tests.benchmark import generate_records
+
+
+SRC = generate_records(20000)
+
+
+@pytest.fixture
+def policy():
+    yield set_memo_policy
+    set_memo_policy(None)
+
+
+def test_default_policy():
+    assert type(Dhall(SRC)._p_memoized) is dict
+
+
+@pytest.mark.parametrize("factory", [
+    partial(WindowMemo, 256),
+    partial(SelectiveMemo, ["Expression", "OperatorExpression"]),
+    partial(SelectiveMemo, []),
+    MemoStats,
+])
+def test_same_result(policy, factory):
+    expected = Dhall.p_parse(SRC)
+    policy(factory)
+    assert isinstance(Dhall(SRC)._p_memoized, factory().__class__)
+    assert Dhall.p_parse(SRC) == expected
+
+
+def test_window_memo():
+    table = WindowMemo(100)
+    for pos in range(5000):
+        table[(0, pos)] = None
+    assert len(table) == 101
+    assert min(pos for _, pos in table) == 4999 - 100
+    assert table.evicted == 5000 - len(table)
+    # behind the window
+    table[(1, 10)] = None
+    assert (1, 10) not in table
+    assert table.evicted == 5000 - len(table) + 1
+
+
+def test_memo_report():
+    table = memo_report(SRC)
+    report = {r["rule"]: r for r in table.report()}
+    assert report["Expression"]["lookups"] > 0
+    assert sum(r["entries"] for r in report.values()) == len(table)
+    assert "Expression" in table.summary()
+    assert set(backtracking_rules(table)) <= set(report)
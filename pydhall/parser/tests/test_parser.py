@@ -162,6 +162,27 @@ def test_double_quote_text():
     # TODO: add interpolations test
 
 
+@pytest.mark.parametrize("input,expected", [
+    ("''\n  foo\n    bar\n  ''", "foo\n  bar\n"),
+    ("''\n  foo\n\n  bar\n  ''", "foo\n\nbar\n"),
+    ("''\n  foo\n  bar\n''", "  foo\n  bar\n"),
+    ("''\n\tfoo\n  bar\n''", "\tfoo\n  bar\n"),
+    ("''\r\n  foo\r\n  ''", "foo\n"),
+    ("''\n  a''' b ''${c}\n  ''", "a'' b ${c}\n"),
+])
+def test_single_quote_text(input, expected):
+    p = Dhall(input)
+    result = p.SingleQuoteLiteral()
+    assert result == TextLit(chunks=[], suffix=expected)
+
+
+def test_large_single_quote_text():
+    line = "  " + "x" * 98 + "\n"
+    p = Dhall("''\n" + line * 20000 + "  ''")
+    result = p.SingleQuoteLiteral()
+    assert result.suffix == line[2:] * 20000
+
+
 @pytest.mark.parametrize("input,expected", [
     ("let a = 42 in a",
      Let(
@@ -0,0 +1,38 @@
+import pytest
+
+from pydhall.core.type_error import DhallTypeError
+from pydhall.parser import Dhall, parse_with_spans
+
+
+SRC = """\
+let x = 1 + 2
+in  { a = x, b = [ True, False ] }
+"""
+
+
+def test_same_term():
+    term, _ = parse_with_spans(SRC)
+    assert term == Dhall.p_parse(SRC)
+
+
+def test_spans():
+    term, spans = parse_with_spans(SRC)
+    binding = term.bindings[0]
+    assert spans.text(binding.value) == "1 + 2"
+    assert spans.text(binding.value.r) == "2"
+    assert spans.text(term.body["b"]) == "[ True, False ]"
+    start, _ = spans.get(term.body["b"])
+    assert spans.line_col(start) == (2, 18)
+
+
+def test_no_spans_by_default():
+    # the default parser doesn't track anything
+    assert "emit" not in vars(Dhall(SRC))
+
+
+def test_locate_type_error():
+    src = "{ a = 1\n, b = 2 + True\n}"
+    term, spans = parse_with_spans(src)
+    with pytest.raises(DhallTypeError) as exc:
+        term.type()
+    assert spans.locate(exc.value) == "<string>:2:7"
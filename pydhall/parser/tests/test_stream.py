@@ -0,0 +1,87 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from pydhall.core import NaturalLit
+from pydhall.core.natural.base import NaturalTypeValue
+from pydhall.core.type_error import DhallTypeError
+from pydhall.core.import_.base import LocalFile
+from pydhall.parser import Dhall
+from pydhall.parser.stream import (
+    DhallStreamError, iter_list, iter_record, iter_values, _Scanner,
+    _iter_sources)
+from pydhall.parser.tests.benchmark import generate_records
+
+
+LIST_SRC = """\
+-- a list, with commas in comments
+[ , "a, b ${ "c, ]" }"
+, ''
+  d, ''' ] ''${ }
+  ''
+, { e = [ 1, 2 ], `f,g` = (3) } -- ]
+, {- , {- ] -} -} 4
+,
+]
+"""
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_iter_list(chunk_size):
+    elements = list(iter_list(io.StringIO(LIST_SRC), chunk_size))
+    assert elements == Dhall.p_parse(LIST_SRC).content
+
+
+def test_iter_list_records():
+    src = generate_records(20000)
+    elements = list(iter_list(io.StringIO(src), 1000))
+    assert elements == Dhall.p_parse(src).content
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_url_imports(chunk_size):
+    src = (
+        "[ https://host/a,b.dhall , http://host/f(x).dhall?q=1,2\n"
+        ", https://host/it''s--a.dhall ]")
+    scanner = _Scanner(io.StringIO(src), chunk_size)
+    assert [s.strip() for s in _iter_sources(scanner, "[")] == [
+        "https://host/a,b.dhall",
+        "http://host/f(x).dhall?q=1,2",
+        "https://host/it''s--a.dhall",
+    ]
+    src = "[ https://host/a--b.dhall , https://host/c.dhall ]"
+    elements = list(iter_list(io.StringIO(src), chunk_size))
+    assert elements == Dhall.p_parse(src).content
+
+
+def test_iter_empty_list():
+    assert list(iter_list(io.StringIO("[ ] "))) == []
+
+
+def test_iter_record():
+    src = "{ a = 1, b.c = { d = 2 }, e }"
+    assert list(iter_record(io.StringIO(src), 2)) == list(
+        Dhall.p_parse(src).items())
+
+
+@pytest.mark.parametrize("src", [
+    "[ 1, 2 ] : List Natural",
+    "[ 1, (2 ]",
+    "[ 1, 2",
+    "{ a = 1 }",
+    "[ 1, , 2 ]",
+])
+def test_iter_list_error(src):
+    with pytest.raises(DhallStreamError):
+        list(iter_list(io.StringIO(src)))
+
+
+def test_iter_values():
+    origin = LocalFile(Path("/tmp/list.dhall"), None, 0)
+    values = iter_values(io.StringIO("[ 1 + 1, 3 ]"), NaturalTypeValue, origin)
+    assert [v.quote() for v in values] == [NaturalLit(2), NaturalLit(3)]
+    values = iter_values(io.StringIO("[ 1, True ]"), NaturalTypeValue, origin)
+    assert next(values).quote() == NaturalLit(1)
+    with pytest.raises(DhallTypeError):
+        next(values)
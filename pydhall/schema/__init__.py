@@ -1,6 +1,14 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from hashlib import sha256
+from pathlib import Path
+
+from pydhall.core.base import Term, alpha_equivalent
+from pydhall.core.type_error import DhallTypeError, TYPE_ERROR_MESSAGE
 from pydhall.parser import parse
 
-from ._base import Schema
+from ._base import Schema, get_decoder
 from .list_ import List, ListOf, MapOf
 from .optional import Optional
 from .primitive import Natural, Text, Bool, Primitive
@@ -22,13 +30,56 @@ from .union import Union, Alt
 from .utils import SchemaVisitor, visitor
 
 
+def check_type(cls, term):
+    """
+    Type check `term` and raise a DhallTypeError if its type is not the type
+    of the schema `cls`.
+
+    The inferred type is new for each term: it is compared structurally,
+    fingerprinting it would cost more than the comparison.
+    """
+    type_ = term.type()
+    expected = cls._pydhall_type
+    if not alpha_equivalent(type_, expected, fingerprint=False):
+        raise DhallTypeError(
+            TYPE_ERROR_MESSAGE.ANNOT_MISMATCH % (expected.quote(), type_.quote()))
+
+
 def load_src(cls, src):
     term = parse(src).resolve()
-    # import ipdb; ipdb.set_trace()
-    # print(term)
-    assert term.type() @ cls._pydhall_type
-    value = term.eval()
-    return cls(value)
+    check_type(cls, term)
+    return get_decoder(cls)(term.eval())
+
+
+def _normal_form_cbor(cls, src):
+    term = parse(src).resolve()
+    check_type(cls, term)
+    return term.eval().quote(normalize=True).cbor()
+
+
+def load_many(cls, sources, jobs=1):
+    """
+    Return the list of the schema objects loaded from the dhall `sources`.
+
+    The decoder of the schema is prepared once for all the sources. With
+    `jobs` > 1 the sources are parsed, resolved, type checked and normalized
+    in that many worker processes, that send back the binary encoding of the
+    normal forms: `cls` must then be importable by the workers.
+    """
+    decode = get_decoder(cls)
+    if jobs <= 1:
+        result = []
+        for src in sources:
+            term = parse(src).resolve()
+            check_type(cls, term)
+            result.append(decode(term.eval()))
+        return result
+    sources = list(sources)
+    chunksize = max(1, len(sources) // (jobs * 4))
+    with ProcessPoolExecutor(jobs) as executor:
+        encoded = executor.map(
+            partial(_normal_form_cbor, cls), sources, chunksize=chunksize)
+        return [decode(Term.from_cbor(data).eval()) for data in encoded]
 
 
 class GetLibraryVisitor(SchemaVisitor):
@@ -76,7 +127,17 @@ class GetLibraryVisitor(SchemaVisitor):
 
 
 def get_library(cls):
-    return GetLibraryVisitor()(cls)
+    """
+    Return the dict of the types (and record schemas) defining the schema
+    `cls`. It is computed once, and kept on the class: a class that is
+    redefined (e.g. by a module reload) gets its library computed again.
+    """
+    try:
+        library = vars(cls)["_pydhall_library"]
+    except KeyError:
+        library = GetLibraryVisitor()(cls)
+        setattr(cls, "_pydhall_library", library)
+    return dict(library)
 
 
 class GetTypesVisitor(SchemaVisitor):
@@ -101,6 +162,62 @@ class GetTypesVisitor(SchemaVisitor):
 def get_types(cls):
     return GetTypesVisitor()(cls)
 
+
+class GetModulesVisitor(SchemaVisitor):
+    def __init__(self):
+        self.modules = set()
+
+    def __call__(self, sh):
+        self.visit(sh)
+        return self.modules
+
+    @visitor(Record)
+    def visit_record(self, r):
+        self.modules.add(r.__module__)
+        super().visit_record(r)
+
+    @visitor(Union)
+    def visit_union(self, u):
+        self.modules.add(u.__class__.__module__)
+        super().visit_union(u)
+
+
+_LIBRARY_VERSION = None
+
+
+def library_version():
+    "Return a hash of the version of pydhall and of the sources of pydhall.schema"
+    global _LIBRARY_VERSION
+    if _LIBRARY_VERSION is None:
+        from pydhall import __version__
+        h = sha256(f"{__version__}\0".encode())
+        for path in sorted(Path(__file__).parent.glob("*.py")):
+            h.update(f"{path.name}\0".encode())
+            h.update(path.read_bytes())
+        _LIBRARY_VERSION = h.hexdigest()
+    return _LIBRARY_VERSION
+
+
+def library_key(cls):
+    """
+    Return the key of the library of `cls` in a persistent cache: the hash of
+    the name of the class, of the sources of all the modules defining the
+    schemas it uses and of the `library_version`. None if one of these
+    modules has no source file.
+    """
+    h = sha256(f"{library_version()}\0{cls.__module__}::{cls.__qualname__}\0".encode())
+    for name in sorted(GetModulesVisitor()(cls)):
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if path is None:
+            return None
+        try:
+            source = Path(path).read_bytes()
+        except OSError:
+            return None
+        h.update(f"{name}\0".encode())
+        h.update(sha256(source).digest())
+    return h.hexdigest()
+
 __all__ = [
     "Alt",
     "Bool",
@@ -126,7 +243,11 @@ __all__ = [
     "TextField",
     "Union",
     "UnionField",
+    "check_type",
+    "get_decoder",
     "get_library",
     "get_types",
+    "library_key",
+    "load_many",
     "load_src",
 ]
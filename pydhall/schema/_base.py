@@ -1,2 +1,21 @@
 class Schema:
     pass
+
+
+def get_decoder(schema):
+    """
+    Return the decoder of `schema`, a function turning the dhall values of
+    the schema into python objects.
+
+    `schema` is a schema instance or a Record class. The decoder is compiled
+    once, by `schema._pydhall_compile()`, and kept on the schema.
+    """
+    try:
+        return vars(schema)["_pydhall_decode"]
+    except KeyError:
+        pass
+    compile_ = getattr(schema, "_pydhall_compile", None)
+    # other callables decode the values themselves
+    decode = compile_() if compile_ is not None else schema
+    setattr(schema, "_pydhall_decode", decode)
+    return decode
@@ -0,0 +1,259 @@
+"""
+Generate the schema classes of a dhall type.
+
+`generate_module(type_)` returns the source of a python module defining the
+Record and Union classes of the dhall type `type_` (a type value, e.g.
+`parse(src).resolve().eval()`), and `Root`, the schema of `type_` itself:
+
+    module = schema_module(parse(src).resolve().eval())
+    cfg = load_src(module.Root, config_src)
+
+The modules returned by `schema_module` are cached by the semantic hash of
+the type and a hash of this module's source, in memory and in
+$XDG_CACHE_HOME/pydhall/schema. Their decoders are compiled when they are
+imported.
+"""
+import importlib.util
+import keyword
+import os
+import re
+import sys
+from hashlib import sha256
+from pathlib import Path
+
+from pydhall.core.base import BuiltinValue
+from pydhall.core.list_.base import ListOf
+from pydhall.core.optional.base import OptionalOf
+from pydhall.core.record.base import RecordTypeValue
+from pydhall.core.union import UnionTypeValue
+
+
+_PRIMITIVES = {
+    "Natural": ("_schema.Natural", "_schema.NaturalField"),
+    "Text": ("_schema.Text", "_schema.TextField"),
+    "Bool": ("_schema.Bool", "_schema.BoolField"),
+    "Integer": ("_schema.primitive.Integer", None),
+    "Double": ("_schema.primitive.Double", None),
+}
+
+
+def _is_map_type(type_):
+    return (
+        isinstance(type_, RecordTypeValue)
+        and set(type_) == {"mapKey", "mapValue"}
+        and isinstance(type_["mapKey"], BuiltinValue)
+        and type_["mapKey"].name == "Text")
+
+
+def _identifier(label):
+    "Return a python identifier close to `label`"
+    name = re.sub(r"\W", "_", label)
+    if not name or name[0].isdigit() or name[0] == "_":
+        name = "f_" + name
+    if keyword.iskeyword(name):
+        name += "_"
+    return name
+
+
+def _camel(label):
+    return "".join(part[:1].upper() + part[1:] for part in re.split(r"\W|_", label))
+
+
+class _Generator():
+    def __init__(self):
+        # class definitions, dependencies first
+        self.definitions = []
+        # fingerprint of the type -> class name
+        self.classes = {}
+        self.names = set()
+
+    def class_name(self, hint):
+        name = _camel(hint) or "Anon"
+        if name[0].isdigit():
+            name = "T" + name
+        candidate = name
+        i = 1
+        while candidate in self.names or keyword.iskeyword(candidate):
+            i += 1
+            candidate = f"{name}{i}"
+        self.names.add(candidate)
+        return candidate
+
+    def schema(self, type_, hint):
+        "Return the python expression of the schema of `type_`"
+        if isinstance(type_, BuiltinValue) and type_.name in _PRIMITIVES:
+            return _PRIMITIVES[type_.name][0]
+        if isinstance(type_, RecordTypeValue):
+            return self.record(type_, hint)
+        if isinstance(type_, UnionTypeValue):
+            return self.union(type_, hint) + "()"
+        if isinstance(type_, ListOf):
+            if _is_map_type(type_.type_):
+                item = self.schema(type_.type_["mapValue"], hint + "Value")
+                return f'_schema.MapOf("_anonMap", {item})()'
+            item = self.schema(type_.type_, hint + "Item")
+            return f'_schema.ListOf("_anonList", {item})()'
+        if isinstance(type_, OptionalOf):
+            return f"_schema.Optional({self.schema(type_.type_, hint)})"
+        raise ValueError(f"Can't generate a schema for {type_.quote().dhall()}")
+
+    def field(self, type_, hint, kwargs):
+        "Return the python expression of a record field of type `type_`"
+        if isinstance(type_, OptionalOf) and not isinstance(type_.type_, OptionalOf):
+            return self.field(type_.type_, hint, kwargs + ["optional=True"])
+        args = ", ".join(kwargs)
+        if isinstance(type_, BuiltinValue) and type_.name in _PRIMITIVES:
+            field_class = _PRIMITIVES[type_.name][1]
+            if field_class is not None:
+                return f"{field_class}({args})"
+        elif isinstance(type_, RecordTypeValue):
+            return f"_schema.RecordField({', '.join([self.record(type_, hint)] + kwargs)})"
+        elif isinstance(type_, UnionTypeValue):
+            return f"_schema.UnionField({', '.join([self.union(type_, hint)] + kwargs)})"
+        elif isinstance(type_, ListOf):
+            if _is_map_type(type_.type_):
+                item = self.schema(type_.type_["mapValue"], hint + "Value")
+                return f"_schema.MapOfField({', '.join([item] + kwargs)})"
+            item = self.schema(type_.type_, hint + "Item")
+            return f"_schema.ListOfField({', '.join([item] + kwargs)})"
+        return f"_schema.Field({', '.join([self.schema(type_, hint)] + kwargs)})"
+
+    def define(self, type_, hint, base, members):
+        """
+        Define the class of the record or union type `type_`, return its
+        name. `members` returns the (label, attribute, expression) of the
+        class members.
+        """
+        fingerprint = type_.fingerprint()
+        if fingerprint in self.classes:
+            return self.classes[fingerprint]
+        name = self.class_name(hint)
+        self.classes[fingerprint] = name
+        attrs = members(name)
+        # class members are defined in the class body scope: they could
+        # shadow the classes used by the other members
+        if any(attr in self.names or attr.startswith("_") for _, attr, _ in attrs):
+            lines = [f"{name} = type({name!r}, (_schema.{base},), {{"]
+            lines.extend(f"    {label!r}: {expr}," for label, _, expr in attrs)
+            lines.append("})")
+        else:
+            lines = [f"class {name}(_schema.{base}):"]
+            lines.extend(f"    {attr} = {expr}" for _, attr, expr in attrs)
+            if not attrs:
+                lines.append("    pass")
+        self.definitions.append("\n".join(lines))
+        return name
+
+    def record(self, type_, hint):
+        def members(name):
+            result = []
+            for label in sorted(type_):
+                attr = label
+                kwargs = []
+                if not label.isidentifier() or keyword.iskeyword(label) or label.startswith("_"):
+                    attr = _identifier(label)
+                    kwargs.append(f"name={label!r}")
+                result.append((attr, attr, self.field(type_[label], name + _camel(attr), kwargs)))
+            return result
+        return self.define(type_, hint, "Record", members)
+
+    def union(self, type_, hint):
+        def members(name):
+            result = []
+            for label in sorted(type_):
+                alt = type_[label]
+                expr = "_schema.Alt()" if alt is None else (
+                    f"_schema.Alt({self.schema(alt, name + _camel(label))})")
+                attr = label if label.isidentifier() and not keyword.iskeyword(label) else "_"
+                result.append((label, attr, expr))
+            return result
+        return self.define(type_, hint, "Union", members)
+
+
+def generate_module(type_, name="Root"):
+    "Return the source of the python module of the schema classes of `type_`"
+    fingerprint = type_.fingerprint()
+    if not fingerprint:
+        raise ValueError("Can't generate a schema for a type with free variables")
+    gen = _Generator()
+    if isinstance(type_, RecordTypeValue):
+        root = gen.record(type_, name)
+    else:
+        gen.names.add(name)
+        root = gen.schema(type_, name)
+    lines = [
+        f"# Generated by pydhall.schema.codegen, semantic hash {fingerprint}",
+        "#",
+        "# Schema classes of the dhall type:",
+        "#",
+        *["#     " + line for line in type_.quote().dhall().splitlines()],
+        "",
+        "import pydhall.schema as _schema",
+    ]
+    for definition in gen.definitions:
+        lines.extend(["", "", definition])
+    if root != name:
+        lines.extend(["", "", f"{name} = {root}"])
+    lines.extend([
+        "",
+        "",
+        "# compile the decoders now",
+        f"_schema.get_decoder({name})",
+        ""])
+    return "\n".join(lines)
+
+
+_MODULES = {}
+_GENERATOR_VERSION = None
+
+
+def generator_version():
+    "Return a hash of the source of the generator"
+    global _GENERATOR_VERSION
+    if _GENERATOR_VERSION is None:
+        source = Path(__file__).read_bytes()
+        _GENERATOR_VERSION = sha256(source).hexdigest()
+    return _GENERATOR_VERSION
+
+
+def get_cache_root():
+    path = os.environ.get("XDG_CACHE_HOME", None)
+    if path is None:
+        return Path.home().joinpath(".cache/pydhall/schema")
+    return Path(path).joinpath("pydhall/schema")
+
+
+def schema_module(type_, name="Root", cache_dir=None):
+    """
+    Return the module of the schema classes of `type_`, generated by
+    `generate_module` or found in the cache.
+    """
+    fingerprint = type_.fingerprint()
+    if not fingerprint:
+        raise ValueError("Can't generate a schema for a type with free variables")
+    # modules generated by another version of the generator are not reused
+    version = generator_version()[:16]
+    module_name = f"pydhall_schema_{fingerprint[7:23]}_{version}_{name}"
+    try:
+        return _MODULES[module_name]
+    except KeyError:
+        pass
+    cache_dir = Path(cache_dir) if cache_dir is not None else get_cache_root()
+    path = cache_dir.joinpath(f"{fingerprint[7:]}_{version}_{name}.py")
+    if not path.exists():
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}")
+        with open(tmp, "w") as f:
+            f.write(generate_module(type_, name))
+        os.replace(tmp, path)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    # registered before it runs, the classes can be pickled by reference
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    _MODULES[module_name] = module
+    return module
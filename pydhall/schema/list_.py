@@ -1,6 +1,6 @@
 from pydhall.core.list_.base import ListOf as ListOfValue, EmptyListValue, NonEmptyListValue
 
-from ._base import Schema
+from ._base import Schema, get_decoder
 from .record import Record, Field
 
 class List(Schema):
@@ -15,13 +15,18 @@ class List(Schema):
         cls._pydhall_type = ListOfValue(type_._pydhall_type)
 
     def __call__(self, value):
-        if isinstance(value, EmptyListValue):
-            content = []
-        elif isinstance(value, NonEmptyListValue):
-            content = value.content
-        else:
+        return get_decoder(self)(value)
+
+    def _pydhall_compile(self):
+        decode_item = get_decoder(self._pydhall_item_type)
+
+        def decode(value):
+            if isinstance(value, NonEmptyListValue):
+                return [decode_item(val) for val in value.content]
+            if isinstance(value, EmptyListValue):
+                return []
             raise ValueError(value)
-        return [self._pydhall_item_type(val) for val in content]
+        return decode
 
     def _pydhall_as_value(self, val):
         if not len(val):
@@ -34,8 +39,22 @@ def ListOf(name: str, type_: Schema):
 
 
 class Map(List):
-    def __call__(self, value):
-        return {item.mapKey: item.mapValue for item in super().__call__(value)}
+    def _pydhall_compile(self):
+        # decode the entries straight to the dict, without the mapKey /
+        # mapValue records
+        fields = self._pydhall_item_type._pydhall_field_table()
+        decode_key = fields["mapKey"][1]
+        decode_value = fields["mapValue"][1]
+
+        def decode(value):
+            if isinstance(value, NonEmptyListValue):
+                return {
+                    decode_key(item["mapKey"]): decode_value(item["mapValue"])
+                    for item in value.content}
+            if isinstance(value, EmptyListValue):
+                return {}
+            raise ValueError(value)
+        return decode
 
     def _pydhall_as_value(self, val):
         if isinstance(val, dict):
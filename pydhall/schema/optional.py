@@ -1,6 +1,6 @@
 from pydhall.core.optional.base import OptionalOf, SomeValue, NoneOf
 
-from ._base import Schema
+from ._base import Schema, get_decoder
 
 
 class Optional(Schema):
@@ -9,11 +9,18 @@ class Optional(Schema):
         self._pydhall_type = OptionalOf(type._pydhall_type)
 
     def __call__(self, value):
-        if isinstance(value, NoneOf):
-            return None
-        if isinstance(value, SomeValue):
-            return self.type(value.value)
-        raise ValueError(value)
+        return get_decoder(self)(value)
+
+    def _pydhall_compile(self):
+        decode_some = get_decoder(self.type)
+
+        def decode(value):
+            if isinstance(value, SomeValue):
+                return decode_some(value.value)
+            if isinstance(value, NoneOf):
+                return None
+            raise ValueError(value)
+        return decode
 
     def _pydhall_as_value(self, val):
         if val is None:
@@ -1,7 +1,7 @@
 from pydhall.core.natural.base import NaturalLitValue, NaturalTypeValue
 from pydhall.core.integer.base import IntegerLitValue, IntegerTypeValue
 from pydhall.core.double.base import DoubleLitValue, DoubleTypeValue
-from pydhall.core.text.base import PlainTextLitValue, TextTypeValue
+from pydhall.core.text.base import PlainTextLitValue, TextRopeValue, TextTypeValue
 from pydhall.core.boolean.base import BoolTypeValue, BoolLitValue
 
 from ._base import Schema
@@ -17,12 +17,36 @@ class Primitive(Schema):
     def _pydhall_as_value(self, val):
         return self._pydhall_dhall_type(val)
 
+    def _pydhall_compile(self):
+        dhall_type = self._pydhall_dhall_type
+        python_type = self._pydhall_python_type
+
+        def decode(value):
+            if not isinstance(value, dhall_type):
+                raise TypeError(value)
+            return python_type(value)
+        return decode
+
 
 class _Text(Primitive):
     _pydhall_type = TextTypeValue
     _pydhall_dhall_type = PlainTextLitValue
     _pydhall_python_type = str
 
+    def __call__(self, value):
+        if isinstance(value, TextRopeValue):
+            value = value.flatten()
+        return super().__call__(value)
+
+    def _pydhall_compile(self):
+        decode_plain = super()._pydhall_compile()
+
+        def decode(value):
+            if isinstance(value, TextRopeValue):
+                value = value.flatten()
+            return decode_plain(value)
+        return decode
+
 
 Text = _Text()
 
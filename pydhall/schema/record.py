@@ -1,6 +1,6 @@
 from pydhall.core.record.base import RecordTypeValue, RecordLitValue
 
-from ._base import Schema
+from ._base import Schema, get_decoder
 from .optional import Optional
 
 
@@ -8,6 +8,13 @@ _NoDefault = object()
 
 
 class Field:
+    """
+    A field of a Record.
+
+    The decoded values are stored on the record instances, under the name of
+    the attribute: once set, reading the field is a plain attribute read and
+    this descriptor is only consulted for unset fields.
+    """
     type = None
     NoDefault = _NoDefault
 
@@ -30,25 +37,27 @@ class Field:
             self.type = Optional(self.type)
         self.optional = optional
         self.default = default
-        self.values = {}
         self.name = name
         self.attr_name = name
 
     def __get__(self, instance, owner=None):
         if instance is None:
             return self
+        values = instance.__dict__
         try:
-            return self.values[instance]
+            return values[self.attr_name]
         except KeyError:
             if self.default is not _NoDefault:
-                self.values[instance] = self.default
+                values[self.attr_name] = self.default
                 return self.default
             raise ValueError(self.name)
 
-    def __set__(self, instance, value):
-        if instance in self.values:
+    def set_value(self, instance, value):
+        "Decode `value` and store it on `instance`"
+        values = instance.__dict__
+        if self.attr_name in values:
             raise ValueError(value)
-        self.values[instance] = self.type(value)
+        values[self.attr_name] = get_decoder(self.type)(value)
 
     def __set_name__(self, owner, name):
         if self.name is None:
@@ -82,11 +91,52 @@ class Record(Schema):
     def __dir__(self):
         return [f.attr_name for f in self._pydhall_fields]
 
+    def __setattr__(self, name, value):
+        field = getattr(self.__class__, name, None)
+        if isinstance(field, Field):
+            field.set_value(self, value)
+        else:
+            super().__setattr__(name, value)
+
     def __init__(self, value):
+        self._pydhall_fill(value)
+
+    def _pydhall_fill(self, value):
         if not isinstance(value, RecordLitValue):
             raise ValueError(value)
+        fields = self._pydhall_field_table()
+        values = self.__dict__
         for k, v in value.items():
-            _get_field(self, k).__set__(self, v)
+            try:
+                attr_name, decode = fields[k]
+            except KeyError:
+                raise AttributeError(f"{self.__class__.__name__}.{k}") from None
+            values[attr_name] = decode(v)
+
+    @classmethod
+    def _pydhall_field_table(cls):
+        "Return the attribute name and the decoder of the fields, by dhall name"
+        try:
+            return vars(cls)["_pydhall_fields_by_name"]
+        except KeyError:
+            pass
+        cls._pydhall_fields_by_name = {
+            f.name: (f.attr_name, get_decoder(f.type))
+            for f in cls._pydhall_fields}
+        return cls._pydhall_fields_by_name
+
+    @classmethod
+    def _pydhall_compile(cls):
+        if cls.__init__ is not Record.__init__:
+            return cls
+        new = object.__new__
+        fill = cls._pydhall_fill
+
+        def decode(value):
+            record = new(cls)
+            fill(record, value)
+            return record
+        return decode
 
     @classmethod
     def _pydhall_as_value(cls, val):
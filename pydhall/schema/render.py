@@ -1,8 +1,11 @@
+from io import StringIO
+
+from pydhall.export import json_scalar, yaml_scalar
 from .utils import SchemaVisitor, visitor
 from .record import Record, Field
 from .list_ import List
 from .union import Union, UnionAlternative
-from .field import UnionField
+from .field import Nested, SimpleRenderer, UnionField
 
 
 class RenderVisitor(SchemaVisitor):
@@ -99,3 +102,209 @@ class RenderVisitor(SchemaVisitor):
 
 def render(sh):
     return RenderVisitor()(sh)
+
+
+# Single pass rendering to JSON and YAML.
+#
+# The rendering is written out while the schema objects are walked, without
+# building the python structure returned by `render`. The fields are
+# rendered by the same rules: fields with `optional="omitNone"` are omitted
+# when None, union fields are laid out by their SimpleRenderer or Nested
+# renderer. Other renderers work on the rendered dicts: the value of their
+# field is rendered by `render` first.
+
+class _Mapping:
+    "A mapping given by its (key, value) pairs"
+    __slots__ = ["pairs"]
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+
+
+def _renders_none(value):
+    while isinstance(value, UnionAlternative):
+        value = value.value
+    return value is None
+
+
+def _nested_pairs(pairs, alt_field, alt_name):
+    "Add (or replace) the `alt_field` key to the pairs, like `Nested` does"
+    found = False
+    for k, v in pairs:
+        if k == alt_field:
+            found = True
+            v = alt_name
+        yield k, v
+    if not found:
+        yield alt_field, alt_name
+
+
+def _union_value(renderer, alt):
+    cls = renderer.__class__
+    if cls is SimpleRenderer:
+        return alt.name if _renders_none(alt.value) else alt.value
+    if cls is Nested:
+        if renderer.value_field is not None:
+            return _Mapping([(renderer.alt_field, alt.name), (renderer.value_field, alt.value)])
+        if isinstance(alt.value, Record):
+            return _Mapping(_nested_pairs(_record_pairs(alt.value), renderer.alt_field, alt.name))
+        if isinstance(alt.value, dict):
+            return _Mapping(_nested_pairs(alt.value.items(), renderer.alt_field, alt.name))
+    parent = {}
+    renderer(alt.name, render(alt.value), None, parent)
+    return parent[None]
+
+
+def _record_pairs(record):
+    "Yield the (key, value) pairs of the rendering of `record`"
+    for f in record._pydhall_fields:
+        value = f.__get__(record)
+        if isinstance(f, UnionField):
+            if value is None:
+                if f.optional != "omitNone":
+                    yield f.name, None
+                continue
+            yield f.name, _union_value(f.renderer, value)
+        elif f.optional != "omitNone" or not _renders_none(value):
+            yield f.name, value
+
+
+def _pairs(value):
+    "Return the (key, value) pairs of a mapping, or None if `value` is not one"
+    if isinstance(value, Record):
+        return _record_pairs(value)
+    if isinstance(value, _Mapping):
+        return value.pairs
+    if isinstance(value, dict):
+        return value.items()
+    return None
+
+
+class _Output:
+    "Buffer the written parts, flush them to `fp` by batches"
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.parts = []
+
+    def write(self, part):
+        parts = self.parts
+        parts.append(part)
+        if len(parts) >= 4096:
+            self.flush()
+
+    def flush(self):
+        self.fp.write("".join(self.parts))
+        self.parts = []
+
+
+def _json(out, value):
+    write = out.write
+    while isinstance(value, UnionAlternative):
+        value = value.value
+    if value is None or isinstance(value, (str, int, float)):
+        write(json_scalar(value))
+    elif isinstance(value, list):
+        write("[")
+        first = True
+        for item in value:
+            if not first:
+                write(", ")
+            first = False
+            _json(out, item)
+        write("]")
+    else:
+        pairs = _pairs(value)
+        if pairs is None:
+            raise TypeError(f"Can't render {value.__class__.__name__}")
+        write("{")
+        first = True
+        for k, v in pairs:
+            if not first:
+                write(", ")
+            first = False
+            write(json_scalar(k))
+            write(": ")
+            _json(out, v)
+        write("}")
+
+
+def _yaml(out, value, indent):
+    """
+    Write `value` after a "key:" or a "-". Scalars and empty collections
+    follow on the same line, other collections are written on the next
+    lines, at `indent`.
+    """
+    write = out.write
+    while isinstance(value, UnionAlternative):
+        value = value.value
+    if value is None or isinstance(value, (str, int, float)):
+        write(" ")
+        write(yaml_scalar(value))
+        write("\n")
+    elif isinstance(value, list):
+        if not value:
+            write(" []\n")
+            return
+        write("\n")
+        prefix = " " * indent + "-"
+        for item in value:
+            write(prefix)
+            _yaml(out, item, indent + 2)
+    else:
+        pairs = _pairs(value)
+        if pairs is None:
+            raise TypeError(f"Can't render {value.__class__.__name__}")
+        prefix = " " * indent
+        empty = True
+        for k, v in pairs:
+            if empty:
+                write("\n")
+                empty = False
+            write(prefix)
+            write(yaml_scalar(k))
+            write(":")
+            _yaml(out, v, indent + 2)
+        if empty:
+            write(" {}\n")
+
+
+def render_json(sh, fp=None):
+    """
+    Write the JSON rendering of the schema object `sh` to the text file
+    `fp`, or return it if `fp` is None.
+    """
+    result = StringIO() if fp is None else fp
+    out = _Output(result)
+    _json(out, sh)
+    out.flush()
+    if fp is None:
+        return result.getvalue()
+
+
+def render_yaml(sh, fp=None):
+    """
+    Write the YAML rendering of the schema object `sh` to the text file
+    `fp`, or return it if `fp` is None. The keys are written in the order
+    of the fields.
+    """
+    result = StringIO() if fp is None else fp
+    out = _Output(result)
+    pairs = _pairs(sh)
+    if pairs is None or isinstance(sh, list):
+        # a top-level scalar or list: write it as the value of a key and
+        # drop the key
+        out.write("---")
+        _yaml(out, sh, 0)
+    else:
+        empty = True
+        for k, v in pairs:
+            empty = False
+            out.write(yaml_scalar(k))
+            out.write(":")
+            _yaml(out, v, 2)
+        if empty:
+            out.write("{}\n")
+    out.flush()
+    if fp is None:
+        return result.getvalue()
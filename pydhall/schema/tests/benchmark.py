@@ -0,0 +1,68 @@
+#! /usr/bin/env python
+import gc
+import io
+import json
+import os
+from pathlib import Path
+from timeit import repeat
+
+from yaml import safe_dump
+
+from pydhall.schema import load_src
+from pydhall.schema.render import render, render_json, render_yaml
+from pydhall.examples.dhall_compose.schema import Compose
+
+
+EXAMPLES = Path(__file__).parent.parent.parent / "examples" / "dhall_compose"
+
+
+def benchit(fn, name):
+    NUMBER = 1
+    REPEAT = 5
+    gc.collect()
+    seconds = min(repeat(fn, lambda: gc.enable(), repeat=REPEAT, number=NUMBER))
+    print('%s: Took %.3fs' % (name, seconds / NUMBER))
+    return seconds
+
+
+def generate_compose(services):
+    "Return the source of a compose file with `services` services"
+    entries = []
+    for i in range(services):
+        entries.append(f"""
+      , service{i} = compose.Service::{{
+        , image = Some "registry.example.com/service{i}:1.{i}"
+        , command = Some (compose.StringOrList.List [ "run", "--port", "{8000 + i}" ])
+        , depends_on = Some [ "db", "cache" ]
+        , environment = compose.ListOrMap.Map (toMap {{ PORT = "{8000 + i}", NAME = "service{i}" }})
+        , ports = [ compose.Port.Text "{8000 + i}:80" ]
+        }}""")
+    return f"""
+let compose = pydhall+schema:pydhall.examples.dhall_compose.schema::Compose
+in  compose.Compose::{{
+    , services = toMap {{ {"".join(entries)[7:]}
+      }}
+    }}
+"""
+
+
+def bench_render(cfg, name):
+    benchit(lambda: safe_dump(render(cfg), io.StringIO()), f"{name}: render + safe_dump")
+    benchit(lambda: render_yaml(cfg, io.StringIO()), f"{name}: render_yaml")
+    benchit(lambda: json.dump(render(cfg), io.StringIO()), f"{name}: render + json.dump")
+    benchit(lambda: render_json(cfg, io.StringIO()), f"{name}: render_json")
+
+
+if __name__ == "__main__":
+    for path in sorted((EXAMPLES / "realworld").glob("**/*.dhall")):
+        try:
+            # the imports are relative to the current directory
+            os.chdir(path.parent)
+            with open(path) as f:
+                cfg = load_src(Compose, f.read())
+        except Exception as e:
+            # the realworld inputs import the Prelude of dhall-lang
+            print(f"{path}: skipped, {e.__class__.__name__}: {e}")
+            continue
+        bench_render(cfg, path.name)
+    bench_render(load_src(Compose, generate_compose(2000)), "2000 generated services")
@@ -0,0 +1,51 @@
+from pydhall.parser import parse
+from pydhall.schema import load_src
+from pydhall.schema.codegen import generate_module, generator_version, schema_module
+
+
+TYPE_SRC = """
+let Sub = { b : Natural, `if` : Text }
+in  { name : Text
+    , count : Optional Natural
+    , sub : Sub
+    , subs : List Sub
+    , env : List { mapKey : Text, mapValue : Text }
+    , kind : < A : Sub | B | `my-alt` : Natural >
+    }
+"""
+
+
+def _type():
+    return parse(TYPE_SRC).resolve().eval()
+
+
+def test_generate_module():
+    src = generate_module(_type())
+    assert "class Root(_schema.Record):" in src
+    assert "if_ = _schema.TextField(name='if')" in src
+    # the record type is defined once
+    assert src.count("(_schema.Record)") == 2
+
+
+def test_schema_module(tmp_path):
+    module = schema_module(_type(), cache_dir=tmp_path)
+    assert schema_module(_type(), cache_dir=tmp_path) is module
+    assert len(list(tmp_path.iterdir())) == 1
+    # the file name holds the version of the generator
+    assert generator_version()[:16] in next(tmp_path.iterdir()).name
+    cfg = load_src(module.Root, """
+        { name = "x"
+        , count = Some 1
+        , sub = { b = 1, `if` = "y" }
+        , subs = [ { b = 2, `if` = "z" } ]
+        , env = toMap { A = "a" }
+        , kind = < A : { b : Natural, `if` : Text } | B | `my-alt` : Natural >.`my-alt` 3
+        }
+    """)
+    assert cfg.name == "x"
+    assert cfg.count == 1
+    assert cfg.sub.if_ == "y"
+    assert cfg.subs[0].b == 2
+    assert cfg.env == {"A": "a"}
+    assert cfg.kind.name == "my-alt"
+    assert cfg.kind.value == 3
@@ -1,4 +1,7 @@
 import os
+from importlib import import_module
+
+import pytest
 
 from pydhall.schema import *
 
@@ -100,3 +103,99 @@ in  test.Config::{
     assert cfg.opt2 == 2
     assert cfg.opt3 == 6
     assert cfg.map1["k"] == 2
+
+
+def test_records_are_not_retained():
+    import gc
+    import weakref
+
+    cfg = load_src(SubConf1, "{ b = 1 }")
+    assert vars(cfg) == {"b": 1}
+    with pytest.raises(ValueError):
+        cfg.b = 2
+    ref = weakref.ref(cfg)
+    del cfg
+    gc.collect()
+    assert ref() is None
+
+
+def test_compiled_decoder():
+    from pydhall.parser import parse
+    from pydhall.schema._base import get_decoder
+
+    decode = get_decoder(Config)
+    assert get_decoder(Config) is decode
+    cfg = load_src(ListItemRecord, "{ c = 1 }")
+    assert isinstance(cfg, ListItemRecord)
+    assert get_decoder(ListItemRecord)(parse("{ c = 2 }").eval()).c == 2
+
+
+def test_load_many():
+    sources = ["{ c = %d }" % i for i in range(10)]
+    assert [r.c for r in load_many(ListItemRecord, sources)] == list(range(10))
+    assert [r.c for r in load_many(ListItemRecord, sources, jobs=2)] == list(range(10))
+
+
+def test_type_mismatch():
+    from pydhall.core.type_error import DhallTypeError
+
+    with pytest.raises(DhallTypeError):
+        load_src(ListItemRecord, '{ c = "1" }')
+
+
+def test_library_is_memoized():
+    from pydhall.core import PydhallSchema
+
+    imp = PydhallSchema("pydhall.schema.tests.test_example", "LibConfig", None, 0)
+    term = imp.fetch(None)
+    assert imp.fetch(None) is term
+    assert get_library(LibConfig).keys() == get_library(LibConfig).keys()
+
+    # a redefined class gets its own library
+    class LibConfig2(Record):
+        r = RecordField(SubConf1)
+    assert "_pydhall_library_term" not in vars(LibConfig2)
+    assert "LibConfig2" in get_library(LibConfig2)
+
+
+def test_library_disk_cache(tmp_path, monkeypatch):
+    from pydhall.core import PydhallSchema
+    from pydhall.core.import_ import base
+    from pydhall.core.import_.cache import FSCache
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(base, "CACHE", FSCache())
+    mod = import_module("pydhall.schema.tests.test_example")
+    cls = mod.SubConf1
+    if "_pydhall_library_term" in vars(cls):
+        del cls._pydhall_library_term
+    imp = PydhallSchema(mod.__name__, "SubConf1", None, 0)
+    term = imp.fetch(None)
+    # not in the dhall cache
+    assert list(tmp_path.joinpath("dhall").iterdir()) == []
+    assert [p.name for p in tmp_path.joinpath("pydhall/library").iterdir()] == [
+        library_key(cls)]
+    del cls._pydhall_library_term
+    assert imp.fetch(None) == term
+
+
+def test_library_key(tmp_path, monkeypatch):
+    tmp_path.joinpath("libdep.py").write_text(
+        "from pydhall.schema import *\n"
+        "class Dep(Record):\n"
+        "    a = NaturalField()\n")
+    tmp_path.joinpath("libmain.py").write_text(
+        "from pydhall.schema import *\n"
+        "from libdep import Dep\n"
+        "class Main(Record):\n"
+        "    d = RecordField(Dep)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    main = import_module("libmain").Main
+    key = library_key(main)
+    assert library_key(main) == key
+    # the schemas of the other modules are part of the key
+    tmp_path.joinpath("libdep.py").write_text(
+        "from pydhall.schema import *\n"
+        "class Dep(Record):\n"
+        "    a = TextField()\n")
+    assert library_key(main) != key
@@ -1,7 +1,9 @@
 import os
 
+import pytest
+
 from pydhall.schema import *
-from pydhall.schema.render import render
+from pydhall.schema.render import render, render_json, render_yaml
 
 
 # Define the schema.
@@ -40,8 +42,7 @@ class Config(Record):
     optmap5 = MapOfField(Natural, optional=True, default={"j": 5})
 
 
-def test_simple_render1():
-    cfg = load_src(Config, """
+CONFIG_SRC = """
         let test = pydhall+schema:pydhall.schema.tests.test_render::Config
         in
         test.Config::{
@@ -58,7 +59,11 @@ def test_simple_render1():
         , optmap2 = None ( List { mapKey: Text, mapValue: Natural })
         , optmap3 = None ( List { mapKey: Text, mapValue: Natural })
         }
-        """)
+        """
+
+
+def test_simple_render1():
+    cfg = load_src(Config, CONFIG_SRC)
 
     result = render(cfg)
     assert result == {
@@ -102,3 +107,13 @@ def test_regression_default_list_in_union():
         "lst2": [1, 2],
         "lst3": [1, 3],
     }
+
+
+def test_render_json_yaml():
+    import json
+    yaml = pytest.importorskip("yaml")
+
+    cfg = load_src(Config, CONFIG_SRC)
+    expected = render(cfg)
+    assert render_json(cfg) == json.dumps(expected)
+    assert yaml.safe_load(render_yaml(cfg)) == expected
@@ -30,3 +30,19 @@ def test_visitor_class():
     v = Vis()
     v.visit(Conf)
     assert v.found == ["Conf", "Conf_Sub1", "Conf_Sub1_Sub2", "Conf_Sub2"]
+
+
+def test_visitor_dispatch_table():
+
+    class Sub(Record):
+        n = NaturalField()
+
+    class Vis(SchemaVisitor):
+        pass
+
+    table = Vis.compile(Sub, NaturalField, int)
+    assert table[Sub] is SchemaVisitor.visit_record
+    assert table[NaturalField] is SchemaVisitor.visit_field
+    assert table[int] is SchemaVisitor.visit_generic
+    # the table is used by visit()
+    assert Vis.dispatch(Sub) is table[Sub]
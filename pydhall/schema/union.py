@@ -1,12 +1,15 @@
 from pydhall.core.union import UnionTypeValue, UnionVal
 
-from ._base import Schema
+from ._base import Schema, get_decoder
 from .list_ import List
 
 class UnionAlternative:
-    def __init__(self, alt, value):
+    def __init__(self, alt, value, decoded=False):
         self.alt = alt
-        self.value = alt.type(value) if alt.type is not None else None
+        if decoded or alt.type is None:
+            self.value = value
+        else:
+            self.value = get_decoder(alt.type)(value)
 
     @property
     def name(self):
@@ -47,10 +50,24 @@ class Union(Schema):
 
 
     def __call__(self, value):
-        if not isinstance(value, UnionVal):
-            raise ValueError(value)
-        alt = getattr(self, value.alternative)
-        return UnionAlternative(alt, value.val)
+        return get_decoder(self)(value)
+
+    def _pydhall_compile(self):
+        alts = {
+            alt.name: (alt, get_decoder(alt.type) if alt.type is not None else None)
+            for alt in self._pydhall_alternatives}
+
+        def decode(value):
+            if not isinstance(value, UnionVal):
+                raise ValueError(value)
+            try:
+                alt, decode_val = alts[value.alternative]
+            except KeyError:
+                raise ValueError(value) from None
+            if decode_val is None:
+                return UnionAlternative(alt, None, True)
+            return UnionAlternative(alt, decode_val(value.val), True)
+        return decode
 
     def _pydhall_as_value(self, value):
         return value._pydhall_as_value(value.value)
@@ -13,8 +13,6 @@ FAILURES = [
     # turns out that -0.0 ≠ 0.0 :/ figure how to handle that (hint: 1/math.inf == -1/math.inf
     # don't have the same repr)
     "dhall-lang/tests/type-inference/failure/unit/AssertDoubleZeros",
-    # rework the multiline WS algorithm
-    "dhall-lang/tests/parser/success/text/multilineCorruptedLeadingWhitespace",
 
 
     # WONT FIX.
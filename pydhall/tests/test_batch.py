@@ -0,0 +1,52 @@
+import pytest
+
+from pydhall.parser import Dhall
+from pydhall.batch import load_cbor, normal_form, run
+from pydhall.core.import_.base import LocalFile
+from pydhall.core.import_.cache import InMemoryCache
+from pydhall.instrument import Profiler
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / "lib.dhall").write_text("λ(x : Natural) → x + 1")
+    (tmp_path / "a.dhall").write_text("./lib.dhall 1")
+    (tmp_path / "b.dhall").write_text("./lib.dhall 2")
+    (tmp_path / "bad.dhall").write_text("1 + True")
+    return [str(tmp_path / n) for n in ["a.dhall", "b.dhall", "bad.dhall"]]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_batch_hash(files, jobs):
+    reports = list(run("hash", files, jobs, cache_class=InMemoryCache))
+    assert [r["file"] for r in reports] == files
+    assert reports[0]["result"] == Dhall.p_parse("2").sha256()
+    assert reports[1]["result"] == Dhall.p_parse("3").sha256()
+    assert "result" not in reports[2]
+    assert reports[2]["error"].startswith("DhallTypeError")
+    assert all(r["seconds"] >= 0 for r in reports)
+
+
+def test_batch_type(files):
+    reports = list(run("type", files[:1]))
+    assert reports[0]["result"] == "Natural"
+
+
+def test_batch_type_checks_once(files):
+    with Profiler() as prof:
+        reports = list(run("type", files, cache_class=InMemoryCache))
+    assert reports[2]["error"].startswith("DhallTypeError")
+    assert prof.phase_calls["type"] == len(files)
+
+
+def test_batch_cbor_input(files, tmp_path):
+    path = tmp_path / "a.dhallb"
+    path.write_bytes(Dhall.p_parse("./lib.dhall 1").cbor())
+    reports = list(run("normalize", [str(path)], input_format="cbor"))
+    assert reports[0]["result"] == "2"
+
+
+def test_load_cbor(tmp_path):
+    origin = LocalFile(tmp_path / "a.dhallb", None, 0)
+    expr = load_cbor(Dhall.p_parse("1 + 1").cbor(), origin)
+    assert normal_form(expr) == Dhall.p_parse("2")
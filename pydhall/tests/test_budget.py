@@ -0,0 +1,126 @@
+import threading
+
+import pytest
+
+from pydhall.parser import Dhall
+from pydhall.core.base import Term
+from pydhall.core.function.app import AppValue
+from pydhall import budget
+from pydhall.budget import EvalBudget, DhallBudgetExceeded
+from pydhall.instrument import Profiler
+
+
+def test_steps():
+    expr = Dhall.p_parse(
+        r"Natural/fold 100000000 Natural "
+        r"(\(x : Natural) -> if Natural/even x then x + 1 else x + 3) 0")
+    eval_ = Term.eval
+    build = AppValue.build.__func__
+    with pytest.raises(DhallBudgetExceeded) as exc:
+        with EvalBudget(steps=1000):
+            expr.eval()
+    assert exc.value.reason == "steps"
+    assert exc.value.stats["steps"] == 1001
+    assert exc.value.stats["applications"] > 0
+    assert Term.eval is eval_
+    assert AppValue.build.__func__ is build
+    assert budget.active() is None
+
+
+def test_deadline():
+    expr = Dhall.p_parse(
+        r"Natural/fold 100000000 Natural "
+        r"(\(x : Natural) -> if Natural/even x then x + 1 else x + 3) 0")
+    with pytest.raises(DhallBudgetExceeded) as exc:
+        with EvalBudget(seconds=0.05):
+            expr.eval()
+    assert exc.value.reason == "seconds"
+    assert exc.value.stats["seconds"] > 0.05
+
+
+def test_power_within_budget():
+    # the closed form of the fold would compute 2 ** 100000000
+    expr = Dhall.p_parse(r"Natural/fold 100000000 Natural (\(x : Natural) -> x * 2) 1")
+    with pytest.raises(DhallBudgetExceeded) as exc:
+        with EvalBudget(steps=1000):
+            expr.eval()
+    assert exc.value.reason == "steps"
+    expr = Dhall.p_parse(r"Natural/fold 10 Natural (\(x : Natural) -> x * 2) 3")
+    with EvalBudget(steps=1000):
+        assert expr.eval() == 3072
+
+
+@pytest.mark.skipif(budget.memory_usage() is None, reason="needs /proc or psutil")
+def test_memory():
+    expr = Dhall.p_parse(r"Natural/fold 3 Natural (\(x : Natural) -> x) 0")
+    with pytest.raises(DhallBudgetExceeded) as exc:
+        with EvalBudget(memory=1) as b:
+            b.check_interval = 1
+            b._next_check = 1
+            expr.eval()
+    assert exc.value.reason == "memory"
+
+
+def test_unknown_memory(monkeypatch):
+    import sys
+
+    def no_proc(*args, **kwargs):
+        raise OSError()
+    monkeypatch.setattr(budget, "open", no_proc, raising=False)
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    # not the peak memory, the limit isn't enforced
+    assert budget.memory_usage() is None
+    expr = Dhall.p_parse(r"Natural/fold 3 Natural (\(x : Natural) -> x) 0")
+    with EvalBudget(memory=1) as b:
+        b.check_interval = 1
+        b._next_check = 1
+        expr.eval()
+
+
+def test_within_budget():
+    expr = Dhall.p_parse(r"(\(x : Natural) -> Natural/even (x + 1)) 2")
+    with EvalBudget(steps=1000, seconds=10) as b:
+        assert not expr.eval()
+    assert 0 < b.stats()["steps"] < 1000
+
+
+def test_profiler_over_budget():
+    expr = Dhall.p_parse(r"(\(x : Natural) -> Natural/even (x + 1)) 2")
+    eval_ = Term.eval
+    with EvalBudget() as b:
+        expr.eval()
+    steps = b.steps
+
+    # the budget ends first: its wrappers are left under the profiler's
+    b, prof = EvalBudget(), Profiler()
+    b.__enter__()
+    prof.__enter__()
+    b.__exit__(None, None, None)
+    prof.__exit__(None, None, None)
+    # and they aren't wrapped again
+    with EvalBudget() as b:
+        expr.eval()
+    assert b.steps == steps
+    with Profiler():
+        with EvalBudget() as b:
+            expr.eval()
+    assert b.steps == steps
+    assert Term.eval is eval_
+
+
+def test_budget_is_per_thread():
+    expr = Dhall.p_parse(r"Natural/fold 2000 Natural (\(x : Natural) -> x) 0")
+    errors = []
+
+    def other():
+        # no budget in this thread
+        try:
+            expr.eval()
+        except Exception as e:
+            errors.append(e)
+
+    with EvalBudget(steps=10):
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+    assert errors == []
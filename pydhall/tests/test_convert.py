@@ -0,0 +1,73 @@
+from io import StringIO, BytesIO
+
+import pytest
+
+from pydhall.parser import Dhall
+from pydhall.convert import (
+    from_python, convert_json, iter_json_array, DhallConversionError)
+
+
+def dhall_type(src):
+    return Dhall.p_parse(src).eval()
+
+
+@pytest.mark.parametrize("obj,type_,expected", [
+    ("x", "Text", '"x"'),
+    (1, "Natural", "1"),
+    (-1, "Integer", "-1"),
+    (1, "Double", "1.0"),
+    (True, "Bool", "True"),
+    (None, "Optional Natural", "None Natural"),
+    (1, "Optional Natural", "Some 1"),
+    ([], "List Natural", "[] : List Natural"),
+    ({"k": 1}, "List { mapKey : Text, mapValue : Natural }", 'toMap { k = 1 }'),
+    ({"a": 1}, "{ a : Natural, b : Optional Text }", "{ a = 1, b = None Text }"),
+    ("A", "< A | B : Natural >", "< A | B : Natural >.A"),
+    (1, "< A | B : Natural >", "< A | B : Natural >.B 1"),
+])
+def test_from_python(obj, type_, expected):
+    value = from_python(obj, dhall_type(type_))
+    assert value @ Dhall.p_parse(expected).eval()
+
+
+@pytest.mark.parametrize("obj,type_", [
+    (-1, "Natural"),
+    (True, "Natural"),
+    ({"a": 1, "b": 2}, "{ a : Natural }"),
+    ({}, "{ a : Natural }"),
+    ("C", "< A | B : Natural >"),
+])
+def test_from_python_error(obj, type_):
+    with pytest.raises(DhallConversionError):
+        from_python(obj, dhall_type(type_))
+
+
+def test_error_path():
+    with pytest.raises(DhallConversionError) as exc:
+        from_python([{"a": 1}, {"a": "x"}], dhall_type("List { a : Natural }"))
+    assert exc.value.path == [1, "a"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_iter_json_array(chunk_size):
+    src = '[ {"a": 12345, "b": "x, y]"} , [], 1.5e3 ,"\\"" ]'
+    result = list(iter_json_array(StringIO(src), chunk_size))
+    assert result == [{"a": 12345, "b": "x, y]"}, [], 1.5e3, '"']
+
+
+def test_convert_json():
+    type_ = dhall_type("List { a : Natural, b : Text }")
+    src = '[{"a": 1, "b": "x"}, {"a": 2, "b": "${y}"}]'
+    out = StringIO()
+    convert_json(StringIO(src), type_, out)
+    expected = Dhall.p_parse(r'[{ a = 1, b = "x" }, { a = 2, b = "\${y}" }]')
+    assert Dhall.p_parse(out.getvalue()).sha256() == expected.sha256()
+    out = BytesIO()
+    convert_json(StringIO(src), type_, out, "cbor")
+    assert out.getvalue() == expected.cbor()
+
+
+def test_convert_json_empty_list():
+    out = StringIO()
+    convert_json(StringIO("[]"), dhall_type("List Natural"), out)
+    assert out.getvalue() == "[] : List Natural\n"
@@ -0,0 +1,40 @@
+from io import StringIO
+
+import pytest
+
+from pydhall.parser import Dhall
+from pydhall.export import dump_json, dump_yaml, DhallExportError
+
+
+@pytest.mark.parametrize("input,expected", [
+    ("{ a = 1, b = [True, False] }", '{"a":1,"b":[true,false]}'),
+    ('toMap { k = "v" }', '{"k":"v"}'),
+    ("[] : List { mapKey : Text, mapValue : Natural }", '{}'),
+    ("[] : List Natural", '[]'),
+    ("< A | B : Natural >.A", '"A"'),
+    ("< A | B : Natural >.B 2", '2'),
+    ("Some -1", "-1"),
+    ("None Natural", "null"),
+])
+def test_dump_json(input, expected):
+    out = StringIO()
+    dump_json(Dhall.p_parse(input).eval(), out)
+    assert out.getvalue() == expected
+
+
+def test_dump_json_omit_none():
+    out = StringIO()
+    dump_json(Dhall.p_parse("{ a = None Natural, b = Some 1 }").eval(), out, omit_none=True)
+    assert out.getvalue() == '{"b":1}'
+
+
+def test_dump_yaml():
+    out = StringIO()
+    src = '{ a = 1, b = [ { c = "x y" } ], d = toMap { e = True }, f = [] : List Natural }'
+    dump_yaml(Dhall.p_parse(src).eval(), out)
+    assert out.getvalue() == 'a: 1\nb:\n  - c: "x y"\nd:\n  e: true\nf: []\n'
+
+
+def test_dump_function():
+    with pytest.raises(DhallExportError):
+        dump_json(Dhall.p_parse(r"\(x : Natural) -> x").eval(), StringIO())
@@ -0,0 +1,25 @@
+from pydhall.parser import Dhall
+from pydhall.core.base import Term
+from pydhall import instrument
+from pydhall.instrument import Profiler
+
+
+def test_profiler():
+    expr = Dhall.p_parse(r"(\(x : Natural) -> Natural/even (x + 1)) 2")
+    eval_ = Term.eval
+    with Profiler() as prof:
+        with instrument.phase("eval"):
+            assert not expr.eval()
+    assert Term.eval is eval_
+    assert instrument.active() is None
+    assert prof.phase_calls["eval"] == 1
+    assert prof.counters["beta reductions"]["lambda"] == 1
+    assert prof.counters["builtin calls"]["Natural/even"] == 1
+    assert prof.counters["evaluated nodes"]["App"] == 2
+    assert "eval" in prof.summary()
+
+
+def test_phase_without_profiler():
+    with instrument.phase("parse"):
+        pass
+    instrument.count("evaluated nodes", "App")
@@ -1,7 +1,6 @@
 from io import BytesIO
 import struct
 
-import cbor
 import cbor2
 
 
@@ -18,20 +17,6 @@ def hash_all(o):
         return hash_list(o)
     return hash(o)
 
-def dict_to_cbor(d):
-    out = BytesIO()
-
-    length = list(cbor.dumps(len(d)))
-    length[0] = length[0] ^ b'\xa0'[0]
-    out.write(bytearray(length))
-    for k in sorted(d):
-        out.write(cbor.dumps(k))
-        try:
-            out.write(cbor.dumps(d[k].cbor()))
-        except AttributeError:
-            out.write(cbor.dumps(d[k]))
-    return out.getvalue()
-
 def cbor_dict(d):
     result = {}
     for k in sorted(d):
@@ -80,6 +65,14 @@ class visitor:
 
 
 class Visitor:
+    """
+    Dispatch `visit(sh)` to the method decorated with `@visitor(cls)` for the
+    first `cls` of the MRO of `sh` (or of its class), or to `visit_generic`.
+
+    The method found for a class is cached: the MRO is scanned once per
+    class, and `compile(*classes)` fills the cache beforehand. The
+    decorated methods are collected when the visitor class is created.
+    """
     _visitor = None
 
     def __init_subclass__(cls,**kwargs):
@@ -90,22 +83,47 @@ class Visitor:
             if hasattr(attr, "_visitor_class"):
                 for target in attr._visitor_class:
                     cls._visitor[target] = attr
+        # class -> method
+        cls._visitor_cache = {}
+        # targets that are not classes are matched by value
+        cls._visitor_values = [k for k in cls._visitor if not isinstance(k, type)]
+
+    @classmethod
+    def dispatch(cls, tp):
+        "Return the method visiting the class `tp` (or its instances)"
+        try:
+            return cls._visitor_cache[tp]
+        except KeyError:
+            pass
+        method = cls.visit_generic
+        for base in tp.__mro__[:-1]:
+            if base in cls._visitor:
+                method = cls._visitor[base]
+                break
+        cls._visitor_cache[tp] = method
+        return method
+
+    @classmethod
+    def compile(cls, *classes):
+        """
+        Resolve the methods visiting `classes` and return the flat dispatch
+        table of the visitor: a dict mapping classes to methods.
+        """
+        for tp in classes:
+            cls.dispatch(tp)
+        return cls._visitor_cache
 
     def visit(self, sh):
-        key = None
+        if self._visitor_values and not isinstance(sh, type):
+            try:
+                method = self._visitor.get(sh)
+            except TypeError:  # probably a dict or a list
+                method = None
+            if method is not None:
+                return method(self, sh)
+        tp = sh if isinstance(sh, type) else sh.__class__
         try:
-            if sh in self._visitor:
-                key = sh
-        except TypeError:  # probably a dict or a list
-            pass
-        if key is None:
-            if isinstance(sh, type):
-                tp = sh
-            else:
-                tp = sh.__class__
-            for cls in tp.__mro__[:-1]:
-                if cls in self._visitor:
-                    key = cls
-                    break
-        method = self._visitor.get(key, self.__class__.visit_generic)
+            method = self._visitor_cache[tp]
+        except KeyError:
+            method = self.dispatch(tp)
         return method(self, sh)
@@ -10,7 +10,7 @@ from setuptools import setup, find_packages
 # with open('HISTORY.rst') as history_file:
 #     history = history_file.read()
 
-requirements = ['cbor', ]
+requirements = ['cbor2', ]
 
 setup_requirements = ['pytest-runner', ]
 